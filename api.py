@@ -0,0 +1,170 @@
+# ====================
+# DETECTION API
+# ====================
+# Headless ASGI front end for the detection pipeline (service.py), for other
+# services and for running behind a load balancer:
+#   POST /detect         {"query": "...", "limit": 5, "analyze": true, "full_analysis": false}
+#   POST /detect/batch   {"queries": ["...", ...], "limit": 5, "full_analysis": false}
+# Answers carry a structured verdict (verdict, confidence, reasons); the
+# detailed analysis is generated only with full_analysis.
+#   GET  /health         component status
+#   GET  /metrics        Prometheus text format
+# The pipeline blocks (sync Neo4j driver, Groq client, numpy), so requests
+# run on a thread pool of API_CONCURRENCY threads sharing one service per
+# worker process. Up to API_QUEUE_SIZE more requests wait at most
+# API_QUEUE_TIMEOUT_SECONDS for a thread; anything beyond that is refused
+# with 503 + Retry-After rather than queued without bound. A request still
+# running after API_REQUEST_TIMEOUT_SECONDS (API_BATCH_TIMEOUT_SECONDS for
+# batches) is answered with 504; its thread keeps its slot until it ends,
+# and a batch stops making LLM calls as soon as it is no longer awaited.
+# API_MAX_BATCH defaults to what the LLM rate limit allows within the batch
+# timeout, so a full batch is not bound to time out.
+#
+# Usage:
+#   uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from config import *
+from metrics import METRICS
+from service import DetectionService
+from verdict import FULL_ANALYSIS, VERDICT_ONLY
+
+
+class DetectRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=API_MAX_QUERY_CHARS)
+    limit: int = Field(5, ge=1, le=50)
+    analyze: bool = True  # False: evidence and pre-screen score only, no LLM call
+    full_analysis: bool = False  # True: reasons plus a detailed analysis (slower, more tokens)
+
+
+class BatchRequest(BaseModel):
+    queries: List[str] = Field(min_length=1, max_length=API_MAX_BATCH)
+    limit: int = Field(5, ge=1, le=50)
+    full_analysis: bool = False
+
+
+def analysis_mode(full_analysis):
+    return FULL_ANALYSIS if full_analysis else VERDICT_ONLY
+
+
+class Overloaded(Exception):
+    pass
+
+
+class Admission:
+    """
+    `concurrency` requests run at once; up to `queue_size` more wait at most
+    `timeout` seconds for a slot, and the rest are refused immediately.
+    Only used from the event loop thread.
+    """
+
+    def __init__(self, concurrency, queue_size, timeout):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.capacity = concurrency + queue_size
+        self.timeout = timeout
+        self.admitted = 0
+
+    async def acquire(self):
+        if self.admitted >= self.capacity:
+            raise Overloaded()
+        self.admitted += 1
+        acquired = False
+        try:
+            await asyncio.wait_for(self.slots.acquire(), self.timeout)
+            acquired = True
+        except asyncio.TimeoutError:
+            raise Overloaded()
+        finally:
+            # Also on CancelledError, when the client disconnects while waiting
+            if not acquired:
+                self.admitted -= 1
+
+    def release(self):
+        self.slots.release()
+        self.admitted -= 1
+
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.service = await asyncio.to_thread(DetectionService.from_config)
+    app.state.pool = ThreadPoolExecutor(max_workers=API_CONCURRENCY, thread_name_prefix="detect")
+    app.state.admission = Admission(API_CONCURRENCY, API_QUEUE_SIZE, API_QUEUE_TIMEOUT_SECONDS)
+    yield
+    app.state.pool.shutdown(wait=False, cancel_futures=True)
+    app.state.service.close()
+
+
+app = FastAPI(title="GuardianAI Detection API", lifespan=lifespan)
+
+
+async def run_blocking(fn, *args, timeout=API_REQUEST_TIMEOUT_SECONDS, stop=None):
+    """
+    Run fn on the pool under admission control; 503 when full, 504 on
+    timeout. `stop` (a threading.Event fn watches) is set when the request
+    ends without the result, on timeout or client disconnect, so the work
+    stops spending LLM quota and frees its slot.
+    """
+    admission = app.state.admission
+    try:
+        await admission.acquire()
+    except Overloaded:
+        METRICS.increment("api_rejected")
+        raise HTTPException(503, "Detection service overloaded, retry later",
+                            headers={"Retry-After": str(API_RETRY_AFTER_SECONDS)})
+
+    future = asyncio.get_running_loop().run_in_executor(app.state.pool, functools.partial(fn, *args))
+    # The slot is freed when the work ends, not when we stop waiting for it,
+    # so timed-out requests still count against the limit
+    future.add_done_callback(lambda _: admission.release())
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        METRICS.increment("api_timeouts")
+        raise HTTPException(504, f"Detection did not finish within {timeout:.0f}s")
+    finally:
+        if stop is not None and not future.done():
+            stop.set()
+
+
+@app.post("/detect")
+async def detect(request: DetectRequest):
+    with METRICS.timer("api_detect"):
+        return await run_blocking(app.state.service.detect, request.query, request.limit, request.analyze,
+                                  analysis_mode(request.full_analysis))
+
+
+@app.post("/detect/batch")
+async def detect_batch(request: BatchRequest):
+    stop = threading.Event()
+
+    def run():
+        results = app.state.service.detect_batch(request.queries, request.limit,
+                                                 mode=analysis_mode(request.full_analysis), stop=stop)
+        return sorted(results, key=lambda r: r['index'])
+
+    with METRICS.timer("api_detect_batch"):
+        return {"results": await run_blocking(run, timeout=API_BATCH_TIMEOUT_SECONDS, stop=stop)}
+
+
+@app.get("/health")
+async def health():
+    admission = app.state.admission
+    return {**app.state.service.status(),
+            "in_flight": admission.admitted, "capacity": admission.capacity}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    admission = app.state.admission
+    return METRICS.prometheus_text(gauges={"api_in_flight": admission.admitted,
+                                           "api_capacity": admission.capacity})
@@ -1,20 +1,22 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from streamlit_option_menu import option_menu
-from neo4j import GraphDatabase
 import sys
 import os
-from datetime import datetime
-from groq import Groq
-from pyvis.network import Network
+import io
+import time
 import streamlit.components.v1 as components
 
 # Add the current directory to path to import config
 sys.path.append('.')
 from config import *
+from metrics import METRICS
+from llm_cache import LLMCache
+from connections import ConnectionCheck
+from verdict import FULL_ANALYSIS, VERDICT_ONLY, parse_analysis
+
+# pandas, matplotlib, the pipeline modules (numpy, neo4j, groq, torch) and
+# pyvis are imported by the pages that use them, so a cold start or the
+# About page does not pay for all of them (benchmarks/bench_startup.py)
 
 # ============================================
 # 1. PAGE SETUP & STYLING
@@ -70,117 +72,176 @@ st.markdown("""
 # ============================================
 
 @st.cache_resource
-def get_neo4j_driver():
-    try:
-        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-        # Verify connection
-        driver.verify_connectivity()
-        return driver
-    except Exception as e:
-        st.error(f"Failed to connect to Neo4j: {e}")
-        return None
+def get_connections():
+    # Neo4j is verified on a background thread; pages wait for it only when they need a client
+    return ConnectionCheck()
 
 @st.cache_resource
-def get_groq_client():
-    if not GROQ_API_KEY:
-        st.error("GROQ_API_KEY not found in environment variables.")
-        return None
-    return Groq(api_key=GROQ_API_KEY)
+def get_llm_cache():
+    return LLMCache()
+
+@st.cache_resource
+def get_service():
+    # One pipeline (pooled clients, indexes, cache) per process, shared with api.py's code path.
+    # Built on the first Detector visit: it loads the indexes, the embedder and the pre-screen
+    from service import DetectionService
+    return DetectionService.from_config(connections=get_connections(), cache=get_llm_cache())
 
-driver = get_neo4j_driver()
-client = get_groq_client()
+def get_driver():
+    """The Neo4j driver once the background check is done, None if it failed."""
+    connections = get_connections()
+    connections.wait()
+    return connections.driver
+
+connections = get_connections()
+llm_cache = get_llm_cache()
+
+# Dashboard data, cached across reruns and keyed on the source file's mtime
+DASHBOARD_SAMPLE_PATH = 'data/cleaned_news_sample.csv'
+
+def dashboard_source():
+    """Best available dashboard input and its mtime, which keys the caches below."""
+    for path in (DASHBOARD_AGGREGATES_PATH, CLEANED_NEWS_PARQUET, CLEANED_NEWS_CSV, DASHBOARD_SAMPLE_PATH):
+        if os.path.exists(path):
+            return path, os.path.getmtime(path)
+    return None, None
+
+@st.cache_data(show_spinner=False)
+def load_dashboard_aggregates(path, mtime):
+    import pandas as pd
+    from news_store import read_news, DashboardAggregates, load_aggregates
+
+    if path == DASHBOARD_AGGREGATES_PATH:
+        return load_aggregates(path)
+    # No precomputed file yet: aggregate the data once per file version
+    if path == DASHBOARD_SAMPLE_PATH:
+        df = pd.read_csv(path, usecols=DashboardAggregates.COLUMNS)
+    else:
+        df = read_news(DashboardAggregates.COLUMNS)
+    aggregates = DashboardAggregates()
+    aggregates.update(df)
+    return aggregates.result()
+
+def _figure_png(fig):
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight')
+    plt.close(fig)
+    return buffer.getvalue()
+
+@st.cache_data(show_spinner=False)
+def render_dashboard_charts(path, mtime):
+    """Render the two charts to PNG once per data version instead of on every rerun."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    aggregates = load_dashboard_aggregates(path, mtime)
+
+    fig1, ax1 = plt.subplots()
+    label_counts = aggregates['label_counts']
+    ax1.pie(list(label_counts.values()), labels=list(label_counts.keys()), autopct='%1.1f%%', colors=['#FF6B6B', '#4ECDC4'])
+
+    fig2, ax2 = plt.subplots()
+    subject_counts = list(aggregates['subject_counts'].items())[:10]
+    sns.barplot(x=[count for _, count in subject_counts], y=[name for name, _ in subject_counts], palette="viridis", ax=ax2)
+
+    return _figure_png(fig1), _figure_png(fig2)
+
+# Graph View data: counts from the Neo4j count store and the rendered
+# network, both shared across sessions and refreshed after a TTL
+EXPLORER_EXPAND_LIMIT = 200  # neighbours added per "Expand around" (hub entities have thousands)
+@st.cache_data(ttl=GRAPH_VIEW_TTL_SECONDS, show_spinner=False)
+def get_graph_stats():
+    import graph_view
+    return graph_view.graph_stats(get_driver())
+
+def graph_file_source():
+    if not os.path.exists(GRAPH_FILE):
+        return None, None
+    return GRAPH_FILE, os.path.getmtime(GRAPH_FILE)
+
+@st.cache_data(show_spinner=False)
+def get_graph_file_stats(path, mtime):
+    import graph_view
+    return graph_view.graph_file_stats(path) if path else None
+
+@st.cache_resource
+def get_graph_layout(path, mtime):
+    import graph_view
+    return graph_view.GraphLayout.load(path)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_explorer(mtime, strategy, n_nodes, focus):
+    """Explorer page for one sample + set of expanded nodes; keyed on the layout file's mtime."""
+    import graph_view
+    layout = get_graph_layout(GRAPH_LAYOUT_PATH, mtime)
+    nodes = layout.sample(n_nodes, strategy)
+    if focus:
+        # Server-side expansion: only the focus nodes' neighbourhoods are added
+        nodes = layout.expand(nodes, list(focus), k=EXPLORER_EXPAND_LIMIT)
+    return graph_view.render_explorer_html(layout, nodes, GRAPH_EXPLORER_NEIGHBOURS)
+
+@st.cache_data(ttl=GRAPH_VIEW_TTL_SECONDS, show_spinner=False)
+def render_graph(sample_size, expand):
+    """pyvis HTML rendered in memory, so concurrent sessions never share a file."""
+    import graph_view
+    return graph_view.render_graph_html(graph_view.sample_graph(get_driver(), sample_size, expand))
 
 # ============================================
-# 3. RAG LOGIC FUNCTIONS
+# 3. RAG LOGIC FUNCTIONS (see detector.py)
 # ============================================
 
-def find_similar_news(query_text, limit=5):
-    if not driver: return []
-    with driver.session() as session:
-        # Using simple keyword search as fallback if vector index isn't ready
-        # But optimized to look for content matches
-        keyword = query_text.split()[0] if query_text.split() else ""
-        result = session.run("""
-            MATCH (n:News)
-            WHERE n.embedding IS NOT NULL
-            AND (toLower(n.title) CONTAINS toLower($keyword) 
-                 OR toLower(n.text_preview) CONTAINS toLower($keyword))
-            RETURN n.id as id, n.title as title, n.label as label, 
-                   n.subject as subject, n.text_preview as text
-            LIMIT $limit
-        """, keyword=keyword, limit=limit)
-        return list(result)
-
-def get_related_entities(news_ids):
-    if not driver or not news_ids: return []
-    with driver.session() as session:
-        result = session.run("""
-            MATCH (n:News)-[:MENTIONS]->(e:Entity)
-            WHERE n.id IN $ids
-            RETURN e.name as entity, e.type as type, count(n) as mention_count
-            ORDER BY mention_count DESC
-            LIMIT 10
-        """, ids=news_ids)
-        return list(result)
-
-def analyze_with_groq(query, similar_articles, entities):
-    if not client: return "Groq client not initialized."
-    
-    # Prepare context
-    context_text = "\n".join([
-        f"Article {i+1}: {article['title']} (Label: {article['label']})\n{article['text'][:200]}..."
-        for i, article in enumerate(similar_articles)
-    ])
-    
-    entities_text = "\n".join([
-        f"- {entity['entity']} ({entity['type']}): Mentioned {entity['mention_count']} times"
-        for entity in entities
-    ])
-    
-    prompt = f"""
-    FAKE NEWS ANALYSIS TASK:
-    
-    USER QUERY: "{query}"
-    
-    CONTEXT FROM DATABASE:
-    
-    SIMILAR PAST ARTICLES:
-    {context_text}
-    
-    RELATED ENTITIES:
-    {entities_text}
-    
-    INSTRUCTIONS:
-    1. Analyze if the user's query/news is likely FAKE or REAL
-    2. Base your analysis on the similar articles and entities
-    3. If entities are frequently associated with fake news, mention this
-    4. Provide a confidence score (0-100%)
-    5. Give specific reasons for your verdict
-    
-    OUTPUT FORMAT:
-    Verdict: [FAKE/REAL]
-    Confidence: [X]%
-    Reasons:
-    1. [Reason 1]
-    2. [Reason 2]
-    
-    Analysis:
-    [Detailed Analysis]
-    """
-    
+@st.cache_resource
+def get_async_detector():
+    service = get_service()
+    if not service.driver or not service.client:
+        return None
+    from async_detector import AsyncDetector
     try:
-        response = client.chat.completions.create(
-            model=CHAT_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a fake news detection expert."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=800
-        )
-        return response.choices[0].message.content
+        # The embedder also serves near-duplicate cache lookups, with or without a vector index
+        return AsyncDetector(index=service.index, embedder=service.embedder, cache=llm_cache,
+                             lexical=service.lexical, prescreen=service.prescreen)
     except Exception as e:
-        return f"Error analyzing with Groq: {e}"
+        st.warning(f"Streaming pipeline unavailable, using blocking calls: {e}")
+        return None
+
+def run_detection(query, mode):
+    """Events for one query: streamed by the async pipeline, or from the blocking service as fallback."""
+    async_detector = get_async_detector()
+    if async_detector is not None:
+        yield from async_detector.stream(query, limit=5, mode=mode)
+        return
+    yield from get_service().events(query, limit=5, mode=mode)
+
+def render_analysis(confidence, reasons, analysis):
+    """The parsed verdict details (the raw response is shown while it streams)."""
+    if confidence is not None:
+        st.metric("Confidence", f"{confidence:.0f}%")
+    if reasons:
+        st.markdown("\n".join(f"{i}. {reason}" for i, reason in enumerate(reasons, 1)))
+    if analysis:
+        st.markdown(analysis)
+
+def render_verdict(verdict):
+    if verdict == "FAKE":
+        st.header("FAKE")
+        st.error("🚨 ALERT: FAKE NEWS DETECTED!")
+        st.markdown("""
+        <div style="background-color: #ff4b4b; padding: 20px; border-radius: 10px; color: white; text-align: center; margin-bottom: 20px;">
+            <h1 style="margin:0;">⚠️ FAKE NEWS ALERT ⚠️</h1>
+            <p style="font-size: 1.2em;">The system has high confidence that this information is misleading or fabricated.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    elif verdict == "REAL":
+        st.header("Real news")
+        st.success("🟢 Likely Authentic News")
+        st.markdown("""
+        <div style="background-color: #28a745; padding: 20px; border-radius: 10px; color: white; text-align: center; margin-bottom: 20px;">
+            <h1 style="margin:0;">✅ AUTHENTIC NEWS ✅</h1>
+            <p style="font-size: 1.2em;">The system has high confidence that this information is credible and authentic.</p>
+        </div>
+        """, unsafe_allow_html=True)
 
 # ============================================
 # 4. UI COMPONENTS
@@ -191,111 +252,128 @@ with st.sidebar:
     st.title("GuardianAI")
     selected = option_menu(
         menu_title=None,
-        options=["Dashboard", "Detector", "Graph View", "About"],
-        icons=["speedometer2", "shield-check", "diagram-3", "info-circle"],
+        options=["Dashboard", "Detector", "Graph View", "Metrics", "About"],
+        icons=["speedometer2", "shield-check", "diagram-3", "activity", "info-circle"],
         default_index=1,
     )
     
     st.markdown("---")
     st.markdown("### System Status")
-    if driver:
-        st.success("Neo4j: Connected")
-    else:
-        st.error("Neo4j: Disconnected")
-    
-    if client:
-        st.success("Groq: Connected")
-    else:
-        st.error("Groq: Disconnected")
+    # Both filled in at the end of the run: by then the connection check has
+    # usually finished, and this run's cache lookups are counted
+    connection_status = st.empty()
+    cache_status = st.empty()
+
+# Page renders are timed like the pipeline stages (see the Metrics page)
+page_start = time.perf_counter()
 
 if selected == "Dashboard":
     st.title("📊 News Dataset Analysis")
     
     try:
-        if os.path.exists('data/cleaned_news.csv'):
-            df = pd.read_csv('data/cleaned_news.csv')
-        elif os.path.exists('data/cleaned_news_sample.csv'):
-            df = pd.read_csv('data/cleaned_news_sample.csv')
-            st.info("Showing dashboard with sample data.")
-        else:
+        source_path, source_mtime = dashboard_source()
+        if source_path is None:
             st.error("Data file not found.")
             st.stop()
+        if source_path == DASHBOARD_SAMPLE_PATH:
+            st.info("Showing dashboard with sample data.")
+
+        aggregates = load_dashboard_aggregates(source_path, source_mtime)
+        label_counts = aggregates['label_counts']
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Articles", f"{len(df):,}")
+            st.metric("Total Articles", f"{aggregates['total']:,}")
         with col2:
-            st.metric("Fake News", f"{len(df[df['label'] == 'FAKE']):,}", delta="Fake", delta_color="inverse")
+            st.metric("Fake News", f"{label_counts.get('FAKE', 0):,}", delta="Fake", delta_color="inverse")
         with col3:
-            st.metric("Real News", f"{len(df[df['label'] == 'REAL']):,}", delta="Real")
+            st.metric("Real News", f"{label_counts.get('REAL', 0):,}", delta="Real")
             
         st.markdown("---")
         
+        label_png, subject_png = render_dashboard_charts(source_path, source_mtime)
         col_left, col_right = st.columns(2)
         
         with col_left:
             st.subheader("Distribution by Label")
-            fig1, ax1 = plt.subplots()
-            label_counts = df['label'].value_counts()
-            ax1.pie(label_counts, labels=label_counts.index, autopct='%1.1f%%', colors=['#FF6B6B', '#4ECDC4'])
-            st.pyplot(fig1)
+            st.image(label_png, use_column_width=True)
             
         with col_right:
             st.subheader("Top Subjects")
-            fig2, ax2 = plt.subplots()
-            subject_counts = df['subject'].value_counts().head(10)
-            sns.barplot(x=subject_counts.values, y=subject_counts.index, palette="viridis", ax=ax2)
-            st.pyplot(fig2)
+            st.image(subject_png, use_column_width=True)
+
+        import pandas as pd
+        st.subheader("Word Count Statistics")
+        st.table(pd.DataFrame(aggregates['word_count_stats']).round(1))
             
     except Exception as e:
         st.warning(f"Could not load analysis data: {e}. Please run data_cleaning.py first.")
 
 elif selected == "Detector":
+    import pandas as pd
+    import detector
+
     st.title("🛡️ Fake News Detector")
     st.markdown("Analyze news headlines or full articles using our **Graph RAG Pipeline**.")
+    with st.spinner("Loading the detection pipeline..."):
+        service = get_service()
+    client = service.client
+    for error in (service.errors.get("neo4j"), service.errors.get("groq")):
+        if error:
+            st.error(error)
     
-    query = st.text_area("Paste news headline or text here:", placeholder="Ex: Breaking news about election fraud...", height=150)
+    tab_single, tab_batch = st.tabs(["Single Article", "Batch Upload"])
     
-    if st.button("Analyze Credibility"):
-        if not query:
-            st.warning("Please enter some text to analyze.")
-        else:
-            with st.spinner("Searching knowledge graph and analyzing..."):
-                # Step 1: Find similar articles
-                similar = find_similar_news(query, limit=5)
-                
-                # Step 2: Get entities
-                news_ids = [a['id'] for a in similar] if similar else []
-                entities = get_related_entities(news_ids)
-                
-                # Step 3: Groq Analysis
-                analysis = analyze_with_groq(query, similar, entities)
-                
-                # UI Results
+    with tab_single:
+        query = st.text_area("Paste news headline or text here:", placeholder="Ex: Breaking news about election fraud...", height=150)
+        full_analysis = st.checkbox("Detailed analysis", value=ANALYSIS_MODE == FULL_ANALYSIS,
+                                    help="Off: verdict, confidence and reasons only, which is several times faster.")
+    
+        if st.button("Analyze Credibility"):
+            if not query:
+                st.warning("Please enter some text to analyze.")
+            else:
+                # UI Results, filled in as the pipeline streams its events
                 st.markdown("### 📊 Analysis Report")
+                verdict_area = st.empty()
+                analysis_area = st.empty()
+                verdict_area.info("Searching knowledge graph and analyzing...")
                 
-                if "Verdict: FAKE" in analysis:
-                    st.header("FAKE")
-                    st.error("🚨 ALERT: FAKE NEWS DETECTED!")
-                    st.markdown("""
-                    <div style="background-color: #ff4b4b; padding: 20px; border-radius: 10px; color: white; text-align: center; margin-bottom: 20px;">
-                        <h1 style="margin:0;">⚠️ FAKE NEWS ALERT ⚠️</h1>
-                        <p style="font-size: 1.2em;">The system has high confidence that this information is misleading or fabricated.</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                elif "Verdict: REAL" in analysis:
-                    st.header("Real news")
-                    st.success("🟢 Likely Authentic News")
-                    st.markdown("""
-                    <div style="background-color: #28a745; padding: 20px; border-radius: 10px; color: white; text-align: center; margin-bottom: 20px;">
-                        <h1 style="margin:0;">✅ AUTHENTIC NEWS ✅</h1>
-                        <p style="font-size: 1.2em;">The system has high confidence that this information is credible and authentic.</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.info("⚠️ Analysis Completed")
+                similar, entities, neighbours, analysis, verdict, timings = [], [], [], "", "UNKNOWN", {}
+                prescreen_score = prompt_tokens = confidence = None
+                reasons = []
+                for event in run_detection(query, FULL_ANALYSIS if full_analysis else VERDICT_ONLY):
+                    if event["type"] == "prescreen":
+                        prescreen_score = event["score"]
+                    elif event["type"] == "evidence":
+                        similar, entities, neighbours = event["similar"], event["entities"], event["neighbours"]
+                    elif event["type"] == "verdict":
+                        verdict = event["verdict"]
+                        with verdict_area.container():
+                            render_verdict(verdict)
+                    elif event["type"] == "token":
+                        analysis += event["text"]
+                        analysis_area.markdown(f"```\n{analysis}\n```")
+                    elif event["type"] == "done":
+                        analysis, timings = event["analysis"], event["timings"]
+                        confidence, reasons = event["confidence"], event["reasons"]
+                        prompt_tokens = event.get("prompt_tokens")
+                    elif event["type"] == "error":
+                        analysis = f"Error analyzing with Groq: {event['error']}"
                 
-                st.markdown(f"```\n{analysis}\n```")
+                if verdict == "UNKNOWN":
+                    verdict_area.info("⚠️ Analysis Completed")
+                if confidence is not None or reasons:
+                    with analysis_area.container():
+                        render_analysis(confidence, reasons, parse_analysis(analysis)["analysis"])
+                else:
+                    analysis_area.markdown(f"```\n{analysis}\n```")
+                if prescreen_score is not None:
+                    st.caption(f"Pre-screen P(fake): {prescreen_score:.3f}")
+                if timings:
+                    st.caption(" · ".join(f"{stage}: {ms:.0f} ms" for stage, ms in timings.items()))
+                if prompt_tokens is not None:
+                    st.caption(f"Prompt: {prompt_tokens:,} tokens (budget {PROMPT_TOKEN_BUDGET:,})")
                 
                 with st.expander("🔍 View Source Evidence from Graph"):
                     if similar:
@@ -311,69 +389,146 @@ elif selected == "Detector":
                         cols = st.columns(3)
                         for i, e in enumerate(entities[:6]):
                             cols[i % 3].info(f"{e['entity']} ({e['type']})")
+                    
+                    if neighbours:
+                        st.markdown("#### Related Articles via Shared Entities:")
+                        for a in neighbours:
+                            st.markdown(f"**[{a['label']}]** {a['title']}")
+                            st.caption(f"Subject: {a['subject']} · {a['shared_entities']} shared entities")
+
+    with tab_batch:
+        st.markdown("Upload a CSV or JSONL file with one headline per row (column `query`, `headline`, `title` or `text`).")
+        uploaded = st.file_uploader("Headlines file", type=["csv", "jsonl"])
+        column = st.text_input("Column name (optional)")
+        
+        if uploaded is not None and st.button("Run Batch Analysis"):
+            if not client:
+                st.error("Groq client not initialized.")
+                st.stop()
+            try:
+                queries = detector.load_batch_queries(uploaded.getvalue().decode('utf-8'), uploaded.name, column or None)
+            except ValueError as e:
+                st.error(str(e))
+                st.stop()
+            if not queries:
+                st.warning("No headlines found in the uploaded file.")
+                st.stop()
+            
+            progress = st.progress(0.0, text=f"0 / {len(queries)} analyzed")
+            output = io.StringIO()
+            writer = detector.ResultWriter(output, "results.jsonl")
+            results = []
+            for result in service.detect_batch(queries):
+                writer.write(result)
+                results.append(result)
+                progress.progress(len(results) / len(queries), text=f"{len(results)} / {len(queries)} analyzed")
+            
+            results_df = pd.DataFrame(results).sort_values("index")
+            st.dataframe(results_df[["query", "verdict", "confidence", "cached", "prescreen_score", "error"]],
+                         use_container_width=True)
+            st.download_button("Download results (JSONL)", output.getvalue(), file_name="detection_results.jsonl")
 
 elif selected == "Graph View":
     st.title("🕸️ Knowledge Graph Insights")
     st.markdown("This section visualizes the relationships between news articles and entities.")
     
-    if driver:
-        with driver.session() as session:
-            stats = session.run("""
-                MATCH (n) RETURN labels(n)[0] as label, count(*) as count
-            """)
-            st.write("### Graph Statistics")
-            cols = st.columns(3)
-            for i, record in enumerate(stats):
-                cols[i % 3].metric(record['label'], record['count'])
-                
-            # Create the interactive graph
-            st.markdown("### Interactive Knowledge Graph")
-            st.caption("Visualizing relationships between News Articles and Entities (Sample: Top 50 connections)")
-            
-            with st.spinner("Generating graph visualization..."):
-                query = """
-                MATCH (n:News)-[r:MENTIONS]->(e:Entity)
-                RETURN n.title as title, n.label as label, e.name as entity, e.type as type
-                LIMIT 50
-                """
-                results = session.run(query)
-                
-                # Setup Pyvis Network
-                net = Network(height='600px', width='100%', bgcolor='#ffffff', font_color='black', notebook=False)
-                
-                # Add nodes and edges
-                for record in results:
-                    news_title = record['title'][:30] + "..."
-                    entity_name = record['entity']
-                    
-                    # Add News Node
-                    news_color = '#FF6B6B' if record['label'] == 'FAKE' else '#4ECDC4'
-                    net.add_node(news_title, label=news_title, title=record['title'], color=news_color, size=25, shape='dot')
-                    
-                    # Add Entity Node
-                    entity_color = '#FFD93D'
-                    net.add_node(entity_name, label=entity_name, title=f"Type: {record['type']}", color=entity_color, size=15, shape='diamond')
-                    
-                    # Add Edge
-                    net.add_edge(news_title, entity_name)
-                
-                # Set physics for better layout
-                net.toggle_physics(True)
-                
-                # Save and display
-                try:
-                    path = "data/graph.html"
-                    os.makedirs(os.path.dirname(path), exist_ok=True)
-                    net.save_graph(path)
-                    
-                    with open(path, 'r', encoding='utf-8') as f:
-                        html_content = f.read()
-                    
-                    components.html(html_content, height=650)
-                except Exception as e:
-                    st.warning(f"Could not render interactive graph: {e}")
+    driver = get_driver()
+    stats = get_graph_stats() if driver else get_graph_file_stats(*graph_file_source())
+    if stats:
+        st.write("### Graph Statistics")
+        if not driver:
+            st.caption(f"Neo4j is disconnected: counts from {GRAPH_FILE}.")
+        cols = st.columns(3)
+        cols[0].metric("News", f"{stats['news']:,}", help=f"{stats['fake']:,} labelled FAKE")
+        cols[1].metric("Entity", f"{stats['entities']:,}", help=f"{stats['mentions']:,} MENTIONS relationships")
+        cols[2].metric("Source", f"{stats['sources']:,}", help=f"{stats['published_by']:,} PUBLISHED_BY relationships")
+    
+    st.markdown("### Interactive Knowledge Graph")
+    mode = st.radio("View", ["Sample", "Explorer"], horizontal=True,
+                    help="Explorer draws the full-corpus layout precomputed by scripts/build_graph_layout.py")
+    
+    if mode == "Explorer" and not os.path.exists(GRAPH_LAYOUT_PATH):
+        st.info("Run `python scripts/build_graph_layout.py` to precompute the explorer layout.")
+    
+    elif mode == "Explorer":
+        layout_mtime = os.path.getmtime(GRAPH_LAYOUT_PATH)
+        layout = get_graph_layout(GRAPH_LAYOUT_PATH, layout_mtime)
+        focus = st.session_state.setdefault("graph_focus", [])
+        
+        col_strategy, col_nodes = st.columns(2)
+        strategy = col_strategy.radio("Sampling", ["degree", "community"], horizontal=True,
+                                      format_func=lambda s: "Top degree" if s == "degree" else "Communities")
+        max_nodes = min(GRAPH_EXPLORER_MAX_NODES, len(layout))
+        n_nodes = col_nodes.slider("Nodes", min(100, max_nodes - 1), max_nodes,
+                                   min(GRAPH_EXPLORER_NODES, max_nodes), step=100)
+        
+        col_find, col_expand, col_reset = st.columns([3, 1, 1])
+        target = col_find.text_input("Expand around (article id or entity name)")
+        if col_expand.button("Expand") and target:
+            node = layout.find(target)
+            if node is None:
+                st.warning(f"No node matches '{target}'.")
+            elif node not in focus:
+                focus.append(node)
+        if col_reset.button("Reset"):
+            focus.clear()
+        
+        st.caption(f"{len(layout):,} nodes in {layout.n_communities:,} communities · click a node to add its "
+                   f"top {GRAPH_EXPLORER_NEIGHBOURS} neighbours · expanded: "
+                   f"{', '.join(str(layout.names[n]) for n in focus) or 'none'}")
+        with st.spinner("Rendering explorer..."):
+            components.html(render_explorer(layout_mtime, strategy, n_nodes, tuple(focus)), height=680)
+    
+    elif driver:
+        # Create the interactive graph
+        col_sample, col_expand = st.columns(2)
+        sample_size = col_sample.slider("Sampled connections", 10, GRAPH_VIEW_MAX_SAMPLE_SIZE,
+                                        min(GRAPH_VIEW_SAMPLE_SIZE, GRAPH_VIEW_MAX_SAMPLE_SIZE), step=10)
+        expand = col_expand.slider("Extra articles per entity", 0, 20, GRAPH_VIEW_EXPAND)
+        st.caption(f"Visualizing relationships between News Articles and Entities "
+                   f"(sample: {sample_size} connections, neighbourhood expansion: {expand})")
+        
+        with st.spinner("Generating graph visualization..."):
+            try:
+                components.html(render_graph(sample_size, expand), height=650)
+            except Exception as e:
+                st.warning(f"Could not render interactive graph: {e}")
+    else:
+        st.error("Connect to Neo4j to see the interactive graph.")
+
+elif selected == "Metrics":
+    st.title("📈 Pipeline Metrics")
+    st.markdown(f"Latency of each pipeline stage over its last {METRICS.window} calls in this server process, "
+                "with call and error counts. Refreshes on every rerun.")
+    
+    import pandas as pd
+
+    summary = METRICS.summary()
+    if summary:
+        st.dataframe(pd.DataFrame(summary).T.round(2), use_container_width=True)
     else:
-        st.error("Connect to Neo4j to see graph statistics.")
+        st.info("No calls recorded yet. Run a detection first.")
+    
+    counters = METRICS.counter_values()
+    cache_stats = llm_cache.summary()
+    col_llm, col_cache, col_prescreen = st.columns(3)
+    col_llm.metric("Groq tokens", f"{counters.get('groq_total_tokens', 0):,}",
+                   help=f"{counters.get('groq_prompt_tokens', 0):,} prompt · "
+                        f"{counters.get('groq_completion_tokens', 0):,} completion · "
+                        f"{counters.get('prompts_truncated', 0):,} of {counters.get('prompts_built', 0):,} "
+                        f"prompts trimmed to the budget")
+    cache_hits = cache_stats['hits'] + cache_stats['near_hits']
+    col_cache.metric("LLM cache hit rate", f"{cache_hits / max(1, cache_hits + cache_stats['misses']):.0%}")
+    col_prescreen.metric("Pre-screen decided", f"{counters.get('prescreen_decided', 0):,}",
+                         help=f"{counters.get('prescreen_escalated', 0):,} escalated to the LLM")
+    
+    prometheus = METRICS.prometheus_text(gauges={f"llm_cache_{k}": v for k, v in cache_stats.items()})
+    st.download_button("Export (Prometheus text format)", prometheus, file_name="metrics.prom", mime="text/plain")
+    with st.expander("Prometheus text"):
+        st.code(prometheus, language="text")
+    if st.button("Reset metrics"):
+        METRICS.reset()
+        st.rerun()
 
 elif selected == "About":
     st.title("ℹ️ About GuardianAI")
@@ -387,6 +542,26 @@ elif selected == "About":
     Developed as part of the Fake News Detection project.
     """)
 
+METRICS.observe(f"page_{selected.lower().replace(' ', '_')}", time.perf_counter() - page_start)
+
+status = connections.status()
+with connection_status.container():
+    for name, label in (("neo4j", "Neo4j"), ("groq", "Groq")):
+        if status[name] is None:
+            st.info(f"{label}: Checking...")
+        elif status[name]:
+            st.success(f"{label}: Connected")
+        else:
+            st.error(f"{label}: Disconnected")
+    if status["neo4j"] is False and os.path.exists(LEXICAL_INDEX_PATH):
+        st.caption("Detector falls back to the local BM25 index.")
+
+cache_stats = llm_cache.summary()
+cache_status.caption(
+    f"LLM cache: {cache_stats['hits']} hits · {cache_stats['near_hits']} near hits · "
+    f"{cache_stats['misses']} misses · {cache_stats['evictions']} evictions · {cache_stats['entries']} entries"
+)
+
 # Footer
 st.markdown("---")
 st.markdown("<p style='text-align: center; color: grey;'>GuardianAI © 2025 | Powered by Neo4j & Groq</p>", unsafe_allow_html=True)
\ No newline at end of file
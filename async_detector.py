@@ -0,0 +1,186 @@
+# ====================
+# ASYNC STREAMING DETECTION
+# ====================
+# Same pipeline as detector.py on the async Neo4j driver and the async LLM
+# client (inference.py). Retrieval is the single-round-trip context query,
+# the completion is streamed token by token, and the verdict is reported as
+# soon as its line has been generated, together with per-stage timings.
+
+import asyncio
+import queue
+import threading
+import time
+
+from config import *
+from detector import context_query, build_prompt, chat_request, cache_model, parse_verdict, verdict_fields
+from embeddings import embed_texts
+from metrics import METRICS
+from prescreen import prescreen_analysis
+
+
+class StageTimer:
+    """Milliseconds from request start at which each stage finished."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.timings = {}
+
+    def mark(self, stage):
+        self.timings[stage] = (time.perf_counter() - self.start) * 1000
+
+
+async def retrieve(driver, query_text, limit=5, index=None, query_vector=None, neighbours=RETRIEVAL_NEIGHBOURS,
+                   lexical=None):
+    """Return (similar_articles, entities, neighbours) from one read transaction."""
+    query, params = context_query(query_text, limit, index, query_vector, neighbours, lexical)
+
+    async def read(tx):
+        record = await (await tx.run(query, **params)).single()
+        return record['similar'], record['entities'], record['neighbours']
+
+    async with driver.session() as session:
+        return await session.execute_read(read)
+
+
+async def detect_stream(query, driver, client, index=None, embedder=None, cache=None, limit=5, lexical=None,
+                        prescreen=None, mode=ANALYSIS_MODE):
+    """
+    Async generator of events:
+      {"type": "prescreen", "score": 0.97}
+      {"type": "evidence", "similar": [...], "entities": [...], "neighbours": [...]}
+      {"type": "token", "text": "..."}
+      {"type": "verdict", "verdict": "FAKE" | "REAL"}
+      {"type": "done", "analysis": "...", "verdict": "...", "timings": {...}}
+    "done" also carries the parsed "confidence" and "reasons", and
+    "prompt_tokens" when a prompt was sent to the LLM.
+    """
+    timer = StageTimer()
+
+    decided = None
+    if prescreen is not None:
+        with METRICS.timer("prescreen"):
+            score = prescreen.score(query)
+        decided = prescreen.decide(score)
+        METRICS.increment("prescreen_decided" if decided is not None else "prescreen_escalated")
+        timer.mark("prescreen")
+        yield {"type": "prescreen", "score": score}
+
+    query_vector = None
+    if embedder is not None and (index is not None or (cache is not None and cache.near_duplicates)):
+        query_vector = (await asyncio.to_thread(embed_texts, [query], embedder))[0]
+        timer.mark("embed")
+
+    with METRICS.timer("retrieve_context"):
+        similar, entities, neighbours = await retrieve(driver, query, limit, index, query_vector, lexical=lexical)
+    timer.mark("retrieval")
+    yield {"type": "evidence", "similar": similar, "entities": entities, "neighbours": neighbours}
+
+    if decided is not None:
+        # Confident pre-screen: the evidence is still shown, the LLM is skipped
+        analysis = prescreen_analysis(score, decided)
+        yield {"type": "verdict", "verdict": decided}
+        yield {"type": "token", "text": analysis}
+        yield {"type": "done", "analysis": analysis, "timings": timer.timings, **verdict_fields(analysis)}
+        return
+
+    article_ids = [a['id'] for a in similar]
+    cached = None
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.lookup, query, article_ids, cache_model(mode), query_vector)
+        METRICS.increment("llm_cache_hits" if cached is not None else "llm_cache_misses")
+    if cached is not None:
+        timer.mark("cache_hit")
+        fields = verdict_fields(cached)
+        if fields["verdict"] != "UNKNOWN":
+            timer.mark("verdict")
+            yield {"type": "verdict", "verdict": fields["verdict"]}
+        yield {"type": "token", "text": cached}
+        yield {"type": "done", "analysis": cached, "timings": timer.timings, **fields}
+        return
+
+    context = build_prompt(query, similar, entities, mode)
+    # Timed by hand: a `with` block around yields would also count the consumer's time
+    llm_start = time.perf_counter()
+    try:
+        stream = await client.chat.completions.create(**chat_request(context["prompt"], mode, stream=True))
+    except Exception:
+        METRICS.observe("groq_stream", time.perf_counter() - llm_start, error=True)
+        raise
+    parts, verdict = [], "UNKNOWN"
+    async for chunk in stream:
+        # Groq reports token usage on the last chunk (x_groq.usage)
+        METRICS.record_usage(getattr(getattr(chunk, 'x_groq', None), 'usage', None) or getattr(chunk, 'usage', None))
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        if not parts:
+            timer.mark("first_token")
+            METRICS.observe("groq_first_token", time.perf_counter() - llm_start)
+        parts.append(delta)
+        yield {"type": "token", "text": delta}
+
+        if verdict == "UNKNOWN":
+            verdict = parse_verdict("".join(parts))
+            if verdict != "UNKNOWN":
+                timer.mark("verdict")
+                yield {"type": "verdict", "verdict": verdict}
+
+    analysis = "".join(parts)
+    timer.mark("llm")
+    METRICS.observe("groq_stream", time.perf_counter() - llm_start)
+    fields = verdict_fields(analysis)
+    if cache is not None and fields["verdict"] != "UNKNOWN":
+        await asyncio.to_thread(cache.store, query, article_ids, cache_model(mode), analysis, query_vector)
+    yield {"type": "done", "analysis": analysis, "timings": timer.timings, "prompt_tokens": context["prompt_tokens"],
+           **fields}
+
+
+class AsyncDetector:
+    """
+    Owns an event loop on a background thread plus the async clients bound
+    to it, so synchronous callers (the Streamlit script) can consume
+    detect_stream events from a plain iterator.
+    """
+
+    def __init__(self, index=None, embedder=None, cache=None, lexical=None, prescreen=None):
+        self.index = index
+        self.lexical = lexical
+        self.prescreen = prescreen
+        self.embedder = embedder
+        self.cache = cache
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.driver, self.client = self._call(self._connect())
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _connect(self):
+        from neo4j import AsyncGraphDatabase
+        from inference import create_async_client
+        driver = AsyncGraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), **NEO4J_DRIVER_OPTIONS)
+        await driver.verify_connectivity()
+        return driver, create_async_client()
+
+    def stream(self, query, limit=5, mode=ANALYSIS_MODE):
+        events = queue.Queue()
+
+        async def produce():
+            try:
+                async for event in detect_stream(query, self.driver, self.client, self.index,
+                                                 self.embedder, self.cache, limit, self.lexical,
+                                                 self.prescreen, mode):
+                    events.put(event)
+            except Exception as e:
+                METRICS.increment("detection_errors")
+                events.put({"type": "error", "error": str(e)})
+            finally:
+                events.put(None)
+
+        asyncio.run_coroutine_threadsafe(produce(), self.loop)
+        while (event := events.get()) is not None:
+            yield event
+
+    def close(self):
+        self._call(self.driver.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
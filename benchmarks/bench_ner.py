@@ -0,0 +1,69 @@
+# ====================
+# BENCHMARK: ENTITY EXTRACTION THROUGHPUT
+# ====================
+# Docs/sec of the spaCy stage: the full default pipeline (one doc at a time,
+# as a naive loop would run it) against the NER-only nlp.pipe setup used by
+# scripts/extract_entities.py, with one process and with several.
+#
+# Usage (from the project root):
+#   python benchmarks/bench_ner.py --docs 2000 [--processes 4] [--output results.json]
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append('.')
+sys.path.append('scripts')
+from config import *
+from news_store import read_news
+from extract_entities import load_ner_pipeline, extract_mentions
+
+
+def timed(name, fn, n_docs):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return {"strategy": name, "docs": n_docs, "seconds": elapsed, "docs_per_sec": n_docs / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='spaCy NER throughput')
+    parser.add_argument('--docs', type=int, default=2000)
+    parser.add_argument('--processes', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--batch-size', type=int, default=NER_BATCH_SIZE)
+    parser.add_argument('--output', help='write results as JSON')
+    args = parser.parse_args()
+
+    import spacy
+
+    texts = read_news(['text'])['text'].fillna('').astype(str).head(args.docs).tolist()
+    records = [(f"doc_{i}", text) for i, text in enumerate(texts)]
+    print(f"{len(records)} documents, model {SPACY_MODEL}")
+
+    full = spacy.load(SPACY_MODEL)
+    ner_only = load_ner_pipeline()
+
+    results = [
+        timed("full_pipeline_loop",
+              lambda: [full(text[:NER_MAX_CHARS]) for text in texts], len(texts)),
+        timed("ner_only_pipe_1_process",
+              lambda: extract_mentions(ner_only, records, args.batch_size, 1, progress=False), len(texts)),
+        timed(f"ner_only_pipe_{args.processes}_processes",
+              lambda: extract_mentions(ner_only, records, args.batch_size, args.processes, progress=False),
+              len(texts)),
+    ]
+
+    print(f"{'strategy':<32}{'seconds':>10}{'docs/sec':>12}")
+    for r in results:
+        print(f"{r['strategy']:<32}{r['seconds']:>10.2f}{r['docs_per_sec']:>12,.0f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Saved results to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
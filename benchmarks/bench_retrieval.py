@@ -0,0 +1,140 @@
+# ====================
+# BENCHMARK: RETRIEVAL LATENCY & RECALL@K
+# ====================
+# Compares the IVF vector index against the old first-keyword CONTAINS scan,
+# BM25, BM25 + IVF reciprocal rank fusion and exact brute-force search.
+# Ground truth is the exact cosine top-k.
+#
+# Usage (from the project root):
+#   python benchmarks/bench_retrieval.py --queries 200 --k 5
+#   python benchmarks/bench_retrieval.py --neo4j   # also time the real Cypher scan
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('.')
+from config import *
+from embeddings import load_embedder, embed_texts, news_document
+from vector_index import IVFIndex, exact_search
+from embedding_store import EmbeddingStore
+from lexical_index import BM25Index, reciprocal_rank_fusion
+
+
+def keyword_scan(news, query_text, k):
+    """Python replica of the old Cypher: first word, CONTAINS, LIMIT k."""
+    words = query_text.split()
+    keyword = words[0].lower() if words else ""
+    hits = []
+    for n in news:
+        if keyword in n['title'].lower() or keyword in n['text_preview'].lower():
+            hits.append(n['id'])
+            if len(hits) == k:
+                break
+    return hits
+
+
+def neo4j_keyword_scan(session, query_text, k):
+    keyword = query_text.split()[0] if query_text.split() else ""
+    result = session.run("""
+        MATCH (n:News)
+        WHERE toLower(n.title) CONTAINS toLower($keyword)
+             OR toLower(n.text_preview) CONTAINS toLower($keyword)
+        RETURN n.id as id
+        LIMIT $limit
+    """, keyword=keyword, limit=k)
+    return [r['id'] for r in result]
+
+
+def run(name, fn, queries, truth, k):
+    latencies, recalls = [], []
+    for q, expected in zip(queries, truth):
+        start = time.perf_counter()
+        ids = fn(q)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(set(ids) & expected) / k)
+    return {
+        "strategy": name,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        f"recall@{k}": float(np.mean(recalls)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Retrieval latency and recall@k benchmark')
+    parser.add_argument('--graph-file', default='data/graph_processed.json')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--neo4j', action='store_true', help='also time the Cypher keyword scan')
+    parser.add_argument('--output', help='write results as JSON')
+    args = parser.parse_args()
+
+    with open(args.graph_file, 'r', encoding='utf-8') as f:
+        news = json.load(f)['news']
+    ids = np.array([n['id'] for n in news])
+
+    model = load_embedder()
+    store = EmbeddingStore()
+    if store.model == EMBEDDING_MODEL and all(i in store.rows for i in ids):
+        # Reuse the precomputed store rather than embedding the corpus again
+        rows = np.array([store.rows[i] for i in ids])
+        vectors = np.asarray(store.vectors[rows], dtype=np.float32)
+    else:
+        vectors = embed_texts([news_document(n) for n in news], model)
+    index = IVFIndex.build(vectors, ids)
+
+    # Queries: headlines of a random subset (what users paste in practice)
+    rng = np.random.default_rng(42)
+    picked = rng.choice(len(news), min(args.queries, len(news)), replace=False)
+    query_texts = [news[i]['title'] for i in picked]
+    query_vectors = embed_texts(query_texts, model)
+    truth = [set(i for i, _ in exact_search(vectors, ids, v, args.k)) for v in query_vectors]
+
+    k = args.k
+    positions = range(len(query_texts))
+    results = [
+        run("keyword_scan", lambda i: keyword_scan(news, query_texts[i], k), positions, truth, k),
+        run("exact", lambda i: [x for x, _ in exact_search(vectors, ids, query_vectors[i], k)],
+            positions, truth, k),
+    ]
+    for nprobe in (1, 4, VECTOR_INDEX_NPROBE, 16):
+        results.append(run(f"ivf_nprobe={nprobe}",
+                           lambda i: [x for x, _ in index.search(query_vectors[i], k, nprobe)],
+                           positions, truth, k))
+
+    # BM25 over the same title + preview text, alone and fused with the IVF hits
+    lexical = BM25Index.build(ids, [n['title'] for n in news], [n['text_preview'] for n in news],
+                              [n['label'] for n in news], [n['subject'] for n in news])
+    results.append(run("bm25", lambda i: [x for x, _ in lexical.search(query_texts[i], k)],
+                       positions, truth, k))
+    results.append(run("rrf_bm25+ivf", lambda i: [x for x, _ in reciprocal_rank_fusion(
+                           [index.search(query_vectors[i], HYBRID_CANDIDATES, VECTOR_INDEX_NPROBE),
+                            lexical.search(query_texts[i], HYBRID_CANDIDATES)], limit=k)],
+                       positions, truth, k))
+
+    if args.neo4j:
+        from neo4j import GraphDatabase
+        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        with driver.session() as session:
+            results.append(run("neo4j_keyword_scan",
+                               lambda i: neo4j_keyword_scan(session, query_texts[i], k),
+                               positions, truth, k))
+        driver.close()
+
+    print(f"Corpus: {len(news)} articles, {index.n_lists} IVF lists, {len(query_texts)} queries")
+    print(f"{'strategy':<22}{'p50 ms':>10}{'p95 ms':>10}{f'recall@{k}':>12}")
+    for r in results:
+        print(f"{r['strategy']:<22}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r[f'recall@{k}']:>12.3f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Saved results to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
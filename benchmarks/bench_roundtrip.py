@@ -0,0 +1,97 @@
+# ====================
+# BENCHMARK: RETRIEVAL ROUND TRIPS
+# ====================
+# Detector retrieval against a local Neo4j: the old two-session path
+# (find_similar_news, then get_related_entities) against the single
+# retrieve_context read transaction.
+#
+# Usage (from the project root, with NEO4J_URI pointing at a local instance):
+#   python benchmarks/bench_roundtrip.py --queries 200 [--neighbours 5]
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('.')
+from config import *
+import detector
+from embedding_store import load_vector_index
+
+
+def timed(fn, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summary(name, latencies):
+    return {
+        "strategy": name,
+        "mean_ms": float(np.mean(latencies)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Two round trips vs one for Detector retrieval')
+    parser.add_argument('--graph-file', default=GRAPH_FILE)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--neighbours', type=int, default=0)
+    parser.add_argument('--output', help='write results as JSON')
+    args = parser.parse_args()
+
+    with open(args.graph_file, 'r', encoding='utf-8') as f:
+        news = json.load(f)['news']
+    rng = np.random.default_rng(42)
+    picked = rng.choice(len(news), min(args.queries, len(news)), replace=False)
+    queries = [news[i]['title'] for i in picked]
+
+    index, vectors = load_vector_index(), None
+    if index is not None:
+        from embeddings import load_embedder, embed_texts
+        vectors = dict(zip(queries, embed_texts(queries, load_embedder())))
+
+    def vector_for(query):
+        return vectors[query] if vectors is not None else None
+
+    def two_round_trips(query):
+        similar = detector.find_similar_news(driver, query, 5, index=index, query_vector=vector_for(query))
+        detector.get_related_entities(driver, [a['id'] for a in similar])
+
+    def one_round_trip(query):
+        detector.retrieve_context(driver, query, 5, index=index, query_vector=vector_for(query),
+                                  neighbours=args.neighbours)
+
+    driver = detector.create_driver()
+    # Warm up the connection pool and the query plans
+    for query in queries[:10]:
+        two_round_trips(query)
+        one_round_trip(query)
+
+    results = [
+        summary("two_round_trips", timed(two_round_trips, queries)),
+        summary("one_round_trip" + (f"+{args.neighbours}_neighbours" if args.neighbours else ""),
+                timed(one_round_trip, queries)),
+    ]
+    driver.close()
+
+    print(f"{len(queries)} queries, retrieval: {'vector index' if index is not None else 'keyword'}")
+    print(f"{'strategy':<32}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for r in results:
+        print(f"{r['strategy']:<32}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Saved results to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
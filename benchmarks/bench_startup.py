@@ -0,0 +1,118 @@
+# ====================
+# BENCHMARK: COLD-START IMPORT TIME
+# ====================
+# Import cost of app.py before and after the lazy-import change, measured
+# with `python -X importtime` in a fresh interpreter per run. "before" is the
+# import list the app used to run on every start; "after" is what app.py
+# imports at module level today (read from its AST) plus what each page
+# imports when it is opened. The old startup also waited for Neo4j's
+# verify_connectivity, which is not included here: it now runs on a
+# background thread (connections.py).
+#
+# Usage (from the project root):
+#   python benchmarks/bench_startup.py [--runs 5] [--output startup.json]
+
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+
+# Module-level imports of app.py before the change, in order
+BEFORE_IMPORTS = [
+    "streamlit", "pandas", "numpy", "matplotlib.pyplot", "seaborn", "streamlit_option_menu",
+    "streamlit.components.v1", "config", "embeddings", "embedding_store", "lexical_index", "prescreen",
+    "news_store", "llm_cache", "metrics", "detector", "graph_view", "async_detector",
+    # create_driver / create_groq_client ran at startup too
+    "neo4j", "groq",
+]
+
+# What each page imports on first use now
+PAGE_IMPORTS = {
+    "About": [],
+    "Dashboard": ["pandas", "news_store", "matplotlib.pyplot", "seaborn"],
+    "Detector": ["pandas", "detector", "service", "async_detector"],
+    "Graph View": ["graph_view"],
+    "Metrics": ["pandas", "numpy"],
+}
+
+
+def app_imports(path='app.py'):
+    """Modules imported at the top level of app.py."""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return modules
+
+
+def import_time(modules):
+    """(total ms, {top-level module: cumulative ms}) from one fresh interpreter."""
+    code = "; ".join(f"import {m}" for m in modules) or "pass"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # Nested imports are indented; keep the ones made by the -c code itself,
+    # not the interpreter's own startup (site, encodings, ...)
+    roots = {m.split('.')[0] for m in modules}
+    modules_ms = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' ') and name.strip().split('.')[0] in roots:
+            modules_ms[name.strip()] = int(cumulative) / 1000
+    return sum(modules_ms.values()), modules_ms
+
+
+def measure(modules, runs):
+    totals, breakdown = [], None
+    for _ in range(runs):
+        total, modules_ms = import_time(modules)
+        totals.append(total)
+        breakdown = breakdown or modules_ms
+    return {
+        "median_ms": statistics.median(totals),
+        "min_ms": min(totals),
+        "slowest": dict(sorted(breakdown.items(), key=lambda item: -item[1])[:8]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start import time of app.py, before and after')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help='write results as JSON')
+    args = parser.parse_args()
+
+    startup = app_imports()
+    scenarios = {"before (every page)": BEFORE_IMPORTS}
+    for page, extra in PAGE_IMPORTS.items():
+        scenarios[f"after: {page}"] = startup + [m for m in extra if m not in startup]
+
+    results = {}
+    for name, modules in scenarios.items():
+        try:
+            results[name] = measure(modules, args.runs)
+        except RuntimeError as e:
+            print(f"[WARN] {name}: {e}")
+
+    print(f"{'scenario':<26}{'median ms':>12}{'min ms':>10}  slowest imports")
+    for name, r in results.items():
+        slowest = ", ".join(f"{m} {ms:.0f}" for m, ms in list(r['slowest'].items())[:4])
+        print(f"{name:<26}{r['median_ms']:>12.0f}{r['min_ms']:>10.0f}  {slowest}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Saved results to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,411 @@
+# ====================
+# BENCHMARK SUITE: INGESTION, RETRIEVAL & DETECTION
+# ====================
+# End-to-end regression benchmark on synthetic corpora (benchmarks/synthetic.py)
+# of 1k / 10k / 100k articles. For every size it measures:
+#   preparation  - scripts/stream_pipeline.py's read / label / clean / write pass
+#   cleaning     - clean_frame and clean_frame_parallel (rows/sec)
+#   graph_load   - batched upserts of graph_processed.json into the embedded
+#                  SQLite stand-in, or a local Neo4j with --neo4j
+#   retrieval    - per strategy (keyword scan, BM25, exact, IVF, RRF): search
+#                  latency, search + graph context latency and recall@k
+#   dashboard    - DashboardAggregates over the cleaned frame
+#   detection    - detect_batch with the deterministic StubGroq client
+# Embeddings come from hash_embed unless --embedder model is given, and the
+# LLM is the in-process stub unless --llm-backend is given ("stub" for
+# llm_stub_server.py over HTTP, "local" for the CPU model, both offline),
+# so runs are offline and repeatable. Results are written as JSON (tagged
+# with the git commit); --compare prints the ratios against an earlier file
+# and exits non-zero on a regression.
+#
+# Usage (from the project root):
+#   python benchmarks/bench_suite.py
+#   python benchmarks/bench_suite.py --sizes 1000,10000 --queries 100
+#   python benchmarks/bench_suite.py --neo4j   # scratch database only: it is cleared first
+#   python benchmarks/bench_suite.py --llm-backend stub   # with llm_stub_server.py running
+#   python benchmarks/bench_suite.py --compare benchmarks/results/suite_613c973.json
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+sys.path.append('scripts')
+sys.path.append('benchmarks')
+from config import *
+from data_cleaning import clean_frame, clean_frame_parallel
+from detector import (detect_batch, first_keyword, _read_context,
+                      CONTEXT_BY_IDS_QUERY, CONTEXT_BY_KEYWORD_QUERY)
+from inference import BACKENDS, create_client
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from load_graph import SCHEMA, UPSERT_QUERIES, pending_batches, write_batch
+from metrics import METRICS
+from news_store import DashboardAggregates
+from stream_pipeline import ReservoirSample, clean_chunks, read_labelled_chunks, write_cleaned
+from vector_index import IVFIndex, exact_search
+from synthetic import make_corpus, make_graph
+from standins import StubGroq, SQLiteGraph, hash_embed
+
+DEFAULT_SIZES = "1000,10000,100000"
+RESULTS_DIR = "benchmarks/results"
+KAGGLE_COLUMNS = ['title', 'text', 'subject', 'date']
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def latency_ms(fn, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": float(np.percentile(latencies, 50)), "p95_ms": float(np.percentile(latencies, 95)),
+            "mean_ms": float(np.mean(latencies))}
+
+
+def throughput(name, rows, seconds):
+    return {"name": name, "seconds": seconds, "rows_per_sec": rows / seconds if seconds else None}
+
+
+# ============================================
+# STAGES
+# ============================================
+
+def bench_preparation(raw, workers):
+    """
+    scripts/stream_pipeline.py's full pass over Fake.csv / True.csv written
+    from the synthetic frame: chunked read and label, cleaning on `workers`
+    processes, CSV + Parquet output, sample and dashboard aggregates.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        fake_path, true_path = os.path.join(workdir, 'Fake.csv'), os.path.join(workdir, 'True.csv')
+        raw.loc[raw['label'] == 'FAKE', KAGGLE_COLUMNS].to_csv(fake_path, index=False)
+        raw.loc[raw['label'] == 'REAL', KAGGLE_COLUMNS].to_csv(true_path, index=False)
+
+        inputs = [(fake_path, 'FAKE'), (true_path, 'REAL')]
+
+        def prepare():
+            chunks = clean_chunks(read_labelled_chunks(CLEAN_CHUNK_SIZE, {}, inputs), workers)
+            return write_cleaned(chunks, os.path.join(workdir, 'cleaned_news.csv'),
+                                 os.path.join(workdir, 'cleaned_news.parquet'),
+                                 ReservoirSample(SAMPLE_SIZE), DashboardAggregates(), verbose=False)
+
+        _, seconds = timed(prepare)
+    return throughput(f"stream_pipeline_{workers}_workers", len(raw), seconds)
+
+
+def bench_cleaning(raw, workers):
+    clean, seconds = timed(clean_frame, raw)
+    results = [throughput("clean_frame", len(raw), seconds)]
+    if workers > 1:
+        _, seconds = timed(clean_frame_parallel, raw, workers=workers)
+        results.append(throughput(f"clean_frame_parallel_{workers}_workers", len(raw), seconds))
+    return clean, results
+
+
+def clear_neo4j(driver):
+    with driver.session() as session:
+        session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+
+
+def load_neo4j(driver, graph, batch_size):
+    """scripts/load_graph.py without the checkpoint: {section: rows}."""
+    written = {}
+    with driver.session() as session:
+        for statement in SCHEMA:
+            session.run(statement).consume()
+        for section, batch in pending_batches(graph, {}, batch_size):
+            session.execute_write(write_batch, UPSERT_QUERIES[section], [row for _, _, row in batch])
+            written[section] = written.get(section, 0) + len(batch)
+    return written
+
+
+def bench_graph_load(graph, batch_size, driver=None):
+    if driver is not None:
+        clear_neo4j(driver)
+        written, seconds = timed(load_neo4j, driver, graph, batch_size)
+        backend, store = "neo4j", None
+    else:
+        store = SQLiteGraph()
+        written, seconds = timed(store.load, graph, batch_size)
+        backend = "sqlite"
+    rows = sum(written.values())
+    return store, {"backend": backend, "batch_size": batch_size, "rows": rows, "written": written,
+                   "seconds": seconds, "rows_per_sec": rows / seconds if seconds else None}
+
+
+def bench_retrieval(graph, store, driver, embed, n_queries, k, neighbours):
+    news = graph['news']
+    ids = np.array([n['id'] for n in news])
+
+    (lexical, vectors), build_seconds = timed(lambda: (
+        BM25Index.build(ids, [n['title'] for n in news], [n['text_preview'] for n in news],
+                        [n['label'] for n in news], [n['subject'] for n in news]),
+        embed([f"{n['title']}. {n['text_preview']}" for n in news])))
+    index, ivf_seconds = timed(IVFIndex.build, vectors, ids)
+
+    # Queries: headlines of a fixed subset (what users paste in practice)
+    rng = np.random.default_rng(42)
+    picked = rng.choice(len(news), min(n_queries, len(news)), replace=False)
+    query_texts = [news[i]['title'] for i in picked]
+    query_vectors = embed(query_texts)
+    truth = [set(i for i, _ in exact_search(vectors, ids, v, k)) for v in query_vectors]
+    positions = range(len(query_texts))
+
+    if driver is not None:
+        session = driver.session()
+        keyword_search = None
+
+        def context(i, hits):
+            if hits is None:
+                query, params = CONTEXT_BY_KEYWORD_QUERY, {"keyword": first_keyword(query_texts[i]),
+                                                           "limit": k, "neighbours": neighbours}
+            else:
+                query, params = CONTEXT_BY_IDS_QUERY, {"hits": [{"id": x, "score": s} for x, s in hits],
+                                                       "neighbours": neighbours}
+            return session.execute_read(_read_context, query, params)
+    else:
+        session = None
+
+        def keyword_search(i):
+            return store.keyword_search(first_keyword(query_texts[i]), k)
+
+        def context(i, hits):
+            return store.context(keyword_search(i) if hits is None else hits, neighbours)
+
+    strategies = {
+        "keyword_scan": keyword_search,
+        "bm25": lambda i: lexical.search(query_texts[i], k),
+        "exact": lambda i: exact_search(vectors, ids, query_vectors[i], k),
+        f"ivf_nprobe={VECTOR_INDEX_NPROBE}": lambda i: index.search(query_vectors[i], k, VECTOR_INDEX_NPROBE),
+        "rrf_bm25+ivf": lambda i: reciprocal_rank_fusion(
+            [index.search(query_vectors[i], HYBRID_CANDIDATES, VECTOR_INDEX_NPROBE),
+             lexical.search(query_texts[i], HYBRID_CANDIDATES)], limit=k),
+    }
+
+    results = []
+    for name, search in strategies.items():
+        row = {"name": name}
+        if search is not None:
+            row["search"] = latency_ms(search, positions)
+            row[f"recall@{k}"] = float(np.mean([len({x for x, _ in search(i)} & truth[i]) / k
+                                                for i in positions]))
+        # The keyword scan runs inside the Cypher query on Neo4j
+        row["with_context"] = latency_ms(lambda i: context(i, search(i) if search else None), positions)
+        results.append(row)
+
+    if session is not None:
+        session.close()
+    return lexical, query_texts, {
+        "queries": len(query_texts),
+        "k": k,
+        "neighbours": neighbours,
+        "build_seconds": {"bm25_and_embeddings": build_seconds, "ivf": ivf_seconds},
+        "ivf_lists": index.n_lists,
+        "strategies": results,
+    }
+
+
+def bench_dashboard(clean):
+    def aggregate():
+        aggregates = DashboardAggregates()
+        aggregates.update(clean)
+        return aggregates.result()
+
+    _, seconds = timed(aggregate)
+    return throughput("dashboard_aggregates", len(clean), seconds)
+
+
+def bench_detection(query_texts, lexical, latency, workers, backend=None):
+    """
+    detect_batch over the retrieval queries, BM25-only, with the in-process
+    stub LLM, or with inference backend `backend` ("stub" for
+    llm_stub_server.py, "local" for the CPU model).
+    """
+    client = StubGroq(latency) if backend is None else create_client(backend)
+    METRICS.reset()
+    results, seconds = timed(lambda: sorted(
+        detect_batch(query_texts, None, client, lexical=lexical, workers=workers, requests_per_minute=0),
+        key=lambda r: r['index']))
+
+    verdicts = [r['verdict'] for r in results]
+    # Identical across runs unless retrieval or the prompt changed
+    digest = hashlib.sha1("\n".join(verdicts).encode('utf-8')).hexdigest()
+    return {
+        "queries": len(results),
+        "llm_backend": backend or "in-process stub",
+        "llm_calls": getattr(client, 'calls', None),
+        "stub_latency_s": latency if backend is None else None,
+        "workers": workers,
+        "seconds": seconds,
+        "queries_per_sec": len(results) / seconds if seconds else None,
+        "errors": sum(r['error'] is not None for r in results),
+        "verdict_digest": digest,
+        "stages": METRICS.summary(),
+    }
+
+
+# ============================================
+# RESULTS
+# ============================================
+
+def environment():
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git('rev-parse', '--short', 'HEAD'),
+        "dirty": bool(git('status', '--porcelain', '--untracked-files=no')),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def flatten(value, prefix=""):
+    """{"10000.retrieval.strategies.bm25.search.p50_ms": 0.41, ...}; list items by their name."""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list) and all(isinstance(v, dict) and 'name' in v for v in value):
+        items = ((v['name'], v) for v in value)
+    else:
+        return {prefix: value} if isinstance(value, (int, float)) and not isinstance(value, bool) else {}
+    flat = {}
+    for key, item in items:
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def compare(previous, current, threshold):
+    """Print timings that changed by more than `threshold`; True if any got slower."""
+    before, after = flatten(previous['results']), flatten(current['results'])
+    timings = [key for key in after if key in before and key.endswith(('seconds', '_ms'))
+               and '.stages.' not in key and not key.endswith('generate_seconds') and before[key] > 0]
+    print(f"\nAgainst {previous['environment'].get('commit')} (threshold {threshold:.0%}):")
+    regressed = False
+    for key in timings:
+        ratio = after[key] / before[key]
+        if abs(ratio - 1) > threshold:
+            flag = "SLOWER" if ratio > 1 else "faster"
+            regressed |= ratio > 1
+            print(f"  {flag:<7}{ratio:>7.2f}x  {key}  ({before[key]:.4g} -> {after[key]:.4g})")
+    if not regressed:
+        print("  no regressions")
+    return regressed
+
+
+def print_size(size, result):
+    print(f"\n=== {size:,} articles ===")
+    for row in [result['preparation'], *result['cleaning'], result['dashboard']]:
+        print(f"{row['name']:<34}{row['seconds']:>9.2f}s{row['rows_per_sec']:>12,.0f} rows/s")
+    load = result['graph_load']
+    print(f"{'graph_load (' + load['backend'] + ')':<34}{load['seconds']:>9.2f}s{load['rows_per_sec']:>12,.0f} rows/s")
+
+    retrieval = result['retrieval']
+    k = retrieval['k']
+    print(f"{'strategy':<22}{'search p50':>12}{'p95':>9}{'+context p50':>14}{'p95':>9}{f'recall@{k}':>11}")
+    for row in retrieval['strategies']:
+        search = row.get('search', {})
+        print(f"{row['name']:<22}{search.get('p50_ms', float('nan')):>12.3f}{search.get('p95_ms', float('nan')):>9.3f}"
+              f"{row['with_context']['p50_ms']:>14.3f}{row['with_context']['p95_ms']:>9.3f}"
+              f"{row.get(f'recall@{k}', float('nan')):>11.3f}")
+
+    detection = result['detection']
+    print(f"detect_batch: {detection['queries']} queries in {detection['seconds']:.2f}s "
+          f"({detection['queries_per_sec']:,.1f}/s), verdicts {detection['verdict_digest'][:12]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingestion, retrieval and detection benchmark suite')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated corpus sizes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--neighbours', type=int, default=RETRIEVAL_NEIGHBOURS)
+    parser.add_argument('--workers', type=int, default=CLEAN_WORKERS, help='cleaning processes')
+    parser.add_argument('--batch-size', type=int, default=GRAPH_BATCH_SIZE)
+    parser.add_argument('--embedder', choices=['hash', 'model'], default='hash',
+                        help='hash: offline stand-in; model: EMBEDDING_MODEL')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='seconds per stub completion')
+    parser.add_argument('--llm-workers', type=int, default=BATCH_LLM_WORKERS)
+    parser.add_argument('--llm-backend', choices=list(BACKENDS),
+                        help='detect through this inference backend instead of the in-process stub')
+    parser.add_argument('--neo4j', action='store_true', help='load into NEO4J_URI (cleared first!)')
+    parser.add_argument('--output', help=f'results file (default {RESULTS_DIR}/suite_<commit>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative change reported by --compare')
+    args = parser.parse_args()
+
+    if args.embedder == 'model':
+        from embeddings import load_embedder, embed_texts
+        model = load_embedder()
+        embed = lambda texts: embed_texts(texts, model)
+    else:
+        embed = hash_embed
+
+    driver = None
+    if args.neo4j:
+        from neo4j import GraphDatabase
+        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), **NEO4J_DRIVER_OPTIONS)
+        driver.verify_connectivity()
+        print(f"[WARN] Benchmarking against {NEO4J_URI}: its contents are deleted before every size")
+
+    report = {"environment": environment(), "config": vars(args), "results": {}}
+    for size in (int(s) for s in args.sizes.split(',')):
+        (raw, mentions, entity_types), generate_seconds = timed(make_corpus, size, args.seed)
+        result = {"generate_seconds": generate_seconds}
+        result["preparation"] = bench_preparation(raw, args.workers)
+        clean, result["cleaning"] = bench_cleaning(raw, args.workers)
+        graph = make_graph(clean, mentions, entity_types)
+        result["graph"] = {"news": len(graph['news']), "entities": len(graph['entities']),
+                           "sources": len(graph['sources']), "relationships": len(graph['relationships'])}
+        store, result["graph_load"] = bench_graph_load(graph, args.batch_size, driver)
+        lexical, query_texts, result["retrieval"] = bench_retrieval(graph, store, driver, embed,
+                                                                    args.queries, args.k, args.neighbours)
+        result["dashboard"] = bench_dashboard(clean)
+        result["detection"] = bench_detection(query_texts, lexical, args.llm_latency, args.llm_workers,
+                                              args.llm_backend)
+        if store is not None:
+            store.close()
+
+        report["results"][str(size)] = result
+        print_size(size, result)
+
+    if driver is not None:
+        driver.close()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite_{report['environment']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[OK] Saved results to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if compare(previous, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+# ====================
+# BENCHMARK: STAND-INS
+# ====================
+# Offline replacements for the external services, so the suite runs the
+# same way on any machine and its numbers only move when our code does:
+#   StubGroq     - deterministic chat.completions.create with a fixed latency
+#                  (llm_stub_server.py serves the same answers over HTTP)
+#   SQLiteGraph  - embedded stand-in for Neo4j: the same load batches and
+#                  the same context retrieval (similar + entities + 2-hop
+#                  neighbours) in an in-memory SQLite database
+#   hash_embed   - feature-hashing random projection in place of the
+#                  sentence-transformers model (no download, no GPU)
+
+import functools
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append('.')
+sys.path.append('scripts')
+from config import EMBEDDING_DIMENSION
+from inference import completion_response, stub_content, usage
+from load_graph import pending_batches
+
+
+# ============================================
+# GROQ
+# ============================================
+
+class StubGroq:
+    """
+    Same interface as groq.Groq for non-streaming completions, in process.
+    The verdict depends only on the prompt (inference.stub_content, as in
+    llm_stub_server.py), so repeated runs produce identical results.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        prompt = messages[-1]['content']
+        content = stub_content(prompt, model, kwargs.get('max_tokens', 0))
+        if self.latency:
+            time.sleep(self.latency)
+        return completion_response(content, usage(len(prompt) // 4, len(content) // 4))
+
+
+# ============================================
+# NEO4J
+# ============================================
+
+class SQLiteGraph:
+
+    SCHEMA = [
+        "CREATE TABLE sources (name TEXT PRIMARY KEY, article_count INTEGER)",
+        "CREATE TABLE entities (name TEXT PRIMARY KEY, type TEXT, mention_count INTEGER)",
+        """CREATE TABLE news (id TEXT PRIMARY KEY, title TEXT, label TEXT, subject TEXT,
+                              date TEXT, text_preview TEXT)""",
+        "CREATE TABLE published_by (news_id TEXT, source TEXT, PRIMARY KEY (news_id, source))",
+        "CREATE TABLE mentions (news_id TEXT, entity TEXT, count INTEGER, PRIMARY KEY (news_id, entity))",
+        "CREATE INDEX mentions_entity ON mentions (entity)",
+        "CREATE INDEX news_label ON news (label)",
+    ]
+
+    # MERGE ... SET as upserts; relationships need both endpoints, like MATCH
+    UPSERT_QUERIES = {
+        "sources": """
+            INSERT INTO sources VALUES (:name, :count)
+            ON CONFLICT (name) DO UPDATE SET article_count = excluded.article_count
+        """,
+        "entities": """
+            INSERT INTO entities VALUES (:name, :type, :count)
+            ON CONFLICT (name) DO UPDATE SET type = excluded.type, mention_count = excluded.mention_count
+        """,
+        "news": """
+            INSERT INTO news VALUES (:id, :title, :label, :subject, :date, :text_preview)
+            ON CONFLICT (id) DO UPDATE SET title = excluded.title, label = excluded.label,
+                subject = excluded.subject, date = excluded.date, text_preview = excluded.text_preview
+        """,
+        "PUBLISHED_BY": """
+            INSERT OR IGNORE INTO published_by
+            SELECT :from, :to WHERE EXISTS (SELECT 1 FROM news WHERE id = :from)
+                                AND EXISTS (SELECT 1 FROM sources WHERE name = :to)
+        """,
+        "MENTIONS": """
+            INSERT INTO mentions
+            SELECT :from, :to, :count WHERE EXISTS (SELECT 1 FROM news WHERE id = :from)
+                                        AND EXISTS (SELECT 1 FROM entities WHERE name = :to)
+            ON CONFLICT (news_id, entity) DO UPDATE SET count = excluded.count
+        """,
+    }
+
+    NEWS_COLUMNS = ["id", "title", "label", "subject", "text_preview"]
+
+    def __init__(self, path=":memory:"):
+        self.conn = sqlite3.connect(path)
+        for statement in self.SCHEMA:
+            self.conn.execute(statement)
+
+    def load(self, graph, batch_size):
+        """Upsert every batch of pending_batches in its own transaction; {section: rows}."""
+        written = {}
+        for section, batch in pending_batches(graph, {}, batch_size):
+            with self.conn:
+                self.conn.executemany(self.UPSERT_QUERIES[section], [row for _, _, row in batch])
+            written[section] = written.get(section, 0) + len(batch)
+        return written
+
+    def _news(self, ids):
+        marks = ",".join("?" * len(ids))
+        rows = self.conn.execute(f"SELECT {', '.join(self.NEWS_COLUMNS)} FROM news WHERE id IN ({marks})", ids)
+        return {row[0]: dict(zip(["id", "title", "label", "subject", "text"], row)) for row in rows}
+
+    def keyword_search(self, keyword, limit=5):
+        """The old CONTAINS scan: [(id, 0.0)]."""
+        pattern = f"%{keyword.lower()}%"
+        rows = self.conn.execute("""
+            SELECT id FROM news WHERE lower(title) LIKE ? OR lower(text_preview) LIKE ? LIMIT ?
+        """, (pattern, pattern, limit))
+        return [(row[0], 0.0) for row in rows]
+
+    def context(self, hits, neighbours=0):
+        """(similar, entities, neighbours) for [(id, score)] hits, as CONTEXT_QUERY returns them."""
+        ids = [news_id for news_id, _ in hits]
+        if not ids:
+            return [], [], []
+        marks = ",".join("?" * len(ids))
+        found = self._news(ids)
+        similar = [{**found[news_id], "score": score} for news_id, score in hits if news_id in found]
+
+        entities = [
+            {"entity": name, "type": kind, "mention_count": count}
+            for name, kind, count in self.conn.execute(f"""
+                SELECT e.name, e.type, count(*) AS c FROM mentions m JOIN entities e ON e.name = m.entity
+                WHERE m.news_id IN ({marks}) GROUP BY e.name ORDER BY c DESC LIMIT 10
+            """, ids)
+        ]
+
+        related = []
+        if neighbours > 0:
+            shared = self.conn.execute(f"""
+                SELECT m2.news_id, count(*) AS c FROM mentions m1 JOIN mentions m2 ON m1.entity = m2.entity
+                WHERE m1.news_id IN ({marks}) AND m2.news_id NOT IN ({marks})
+                GROUP BY m2.news_id ORDER BY c DESC LIMIT ?
+            """, ids + ids + [neighbours]).fetchall()
+            articles = self._news([news_id for news_id, _ in shared])
+            related = [{**articles[news_id], "shared_entities": count} for news_id, count in shared]
+        return similar, entities, related
+
+    def close(self):
+        self.conn.close()
+
+
+# ============================================
+# EMBEDDINGS
+# ============================================
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@functools.lru_cache(maxsize=4)
+def _projection(buckets, dimension, seed):
+    return np.random.default_rng(seed).standard_normal((buckets, dimension)).astype(np.float32)
+
+
+def hash_embed(texts, dimension=EMBEDDING_DIMENSION, buckets=1 << 14, seed=42):
+    """Unit vectors from hashed token counts times a fixed Gaussian projection."""
+    projection = _projection(buckets, dimension, seed)
+    vectors = np.zeros((len(texts), dimension), dtype=np.float32)
+    for i, text in enumerate(texts):
+        tokens = [zlib.crc32(t.encode('utf-8')) % buckets for t in TOKEN_PATTERN.findall(text.lower())]
+        if tokens:
+            vectors[i] = projection[tokens].sum(axis=0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
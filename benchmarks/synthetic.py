@@ -0,0 +1,173 @@
+# ====================
+# BENCHMARK: SYNTHETIC CORPORA
+# ====================
+# Deterministic Fake.csv / True.csv-shaped frames of any size, and the
+# graph_processed.json that the pipeline would build from them (news,
+# entities, sources, PUBLISHED_BY and MENTIONS). Word and entity frequencies
+# are Zipf-distributed, so BM25 postings and entity hubs look like the real
+# corpus. The same seed always produces the same corpus.
+#
+# Usage (from the project root):
+#   python benchmarks/synthetic.py --articles 10000 --output data/synthetic_10k.json
+
+import argparse
+import json
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+sys.path.append('scripts')
+
+SYLLABLES = ["ba", "ce", "di", "fo", "gu", "ha", "je", "ki", "lo", "mu", "na", "pe", "qui", "ro",
+             "sa", "te", "vi", "wo", "xa", "ye", "zu", "an", "el", "is", "or", "un", "tra", "ster"]
+FIRST_NAMES = ["Anna", "Boris", "Carla", "David", "Elena", "Frank", "Greta", "Hugo", "Irene", "James",
+               "Karin", "Louis", "Maria", "Nikos", "Olga", "Peter", "Rosa", "Samuel", "Tanya", "Victor"]
+LAST_NAMES = ["Adler", "Brandt", "Costa", "Duval", "Engel", "Fischer", "Garcia", "Hansen", "Ivanov",
+              "Jensen", "Keller", "Lopez", "Moreau", "Novak", "Ortiz", "Petrov", "Quinn", "Romero"]
+ORG_SUFFIXES = ["Party", "Institute", "Council", "Bank", "Agency", "Group"]
+PLACE_SUFFIXES = ["ville", "burg", "stan", "land"]
+
+# Subject names of the Kaggle files
+FAKE_SUBJECTS = ["News", "politics", "left-news", "Government News", "US_News", "Middle-east"]
+REAL_SUBJECTS = ["politicsNews", "worldnews"]
+DATE_FORMATS = ["%B %d, %Y", "%b %d, %Y", "%d-%b-%y", "%Y-%m-%d"]
+
+
+def zipf_weights(n, exponent=1.1):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def make_vocabulary(rng, size=5000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES, rng.integers(1, 4))))
+    return sorted(words, key=lambda w: zlib.crc32(w.encode('utf-8')))
+
+
+def make_entities(rng, size=400):
+    """[(name, type)]: people, organisations and places."""
+    entities = set()
+    while len(entities) < size:
+        kind = rng.choice(["PERSON", "ORG", "GPE"], p=[0.5, 0.3, 0.2])
+        if kind == "PERSON":
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        elif kind == "ORG":
+            name = f"{rng.choice(LAST_NAMES)} {rng.choice(ORG_SUFFIXES)}"
+        else:
+            name = f"{rng.choice(LAST_NAMES)}{rng.choice(PLACE_SUFFIXES)}"
+        entities.add((name, kind))
+    return sorted(entities)
+
+
+def make_corpus(n, seed=42, min_words=50, max_words=300):
+    """
+    (raw frame, mentions, entity types): the frame has the Kaggle columns plus
+    `label` and `id`; mentions[i] is {entity name: count} for the i-th article.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary(rng)
+    entities = make_entities(rng)
+    entity_weights = zipf_weights(len(entities))
+    entity_types = dict(entities)
+
+    labels = np.where(rng.random(n) < 0.52, "FAKE", "REAL")
+    lengths = rng.integers(min_words, max_words, n)
+    title_lengths = rng.integers(6, 15, n)
+    words = rng.choice(len(vocabulary), int(lengths.sum() + title_lengths.sum()),
+                       p=zipf_weights(len(vocabulary))).tolist()
+    n_entities = rng.integers(0, 6, n)
+    picked = rng.choice(len(entities), int(n_entities.sum()), p=entity_weights).tolist()
+    days = rng.integers(0, 3 * 365, n)
+    formats = rng.integers(0, len(DATE_FORMATS), n)
+    with_url = rng.random(n) < 0.15
+
+    titles, texts, subjects, dates, mentions = [], [], [], [], []
+    position = entity_position = 0
+    start_date = pd.Timestamp("2015-03-31")
+    for i in range(n):
+        title = [vocabulary[w] for w in words[position:position + title_lengths[i]]]
+        position += title_lengths[i]
+        body = [vocabulary[w] for w in words[position:position + lengths[i]]]
+        position += lengths[i]
+
+        counts = {}
+        for e in picked[entity_position:entity_position + n_entities[i]]:
+            name = entities[e][0]
+            counts[name] = counts.get(name, 0) + 1
+            body.insert(int(rng.integers(0, len(body))), name)
+        entity_position += n_entities[i]
+        if counts:
+            title[0] = next(iter(counts))
+
+        text = " ".join(body).capitalize() + "."
+        if with_url[i]:
+            text += f" Read more: https://example.com/{body[-1]}"
+        titles.append(" ".join(title).upper() if labels[i] == "FAKE" and i % 3 == 0 else " ".join(title).title())
+        texts.append(text)
+        subjects.append(FAKE_SUBJECTS[i % len(FAKE_SUBJECTS)] if labels[i] == "FAKE"
+                        else REAL_SUBJECTS[i % len(REAL_SUBJECTS)])
+        dates.append((start_date + pd.Timedelta(days=int(days[i]))).strftime(DATE_FORMATS[formats[i]]))
+        mentions.append(counts)
+
+    df = pd.DataFrame({"title": titles, "text": texts, "subject": subjects, "date": dates, "label": labels})
+    df.insert(0, 'id', [f"news_{i}" for i in range(n)])
+    return df, mentions, entity_types
+
+
+def make_graph(clean_df, mentions, entity_types, min_articles=1):
+    """graph_processed.json built from a cleaned synthetic frame."""
+    news = [
+        {
+            "id": row.id,
+            "title": row.clean_title,
+            "label": row.label,
+            "subject": row.subject,
+            "date": row.clean_date,
+            "text_preview": row.clean_text[:200],
+        }
+        for row in clean_df.itertuples(index=False)
+    ]
+    n_articles = {}
+    for counts in mentions:
+        for name in counts:
+            n_articles[name] = n_articles.get(name, 0) + 1
+    entities = {name: {"type": entity_types[name], "count": count}
+                for name, count in n_articles.items() if count >= min_articles}
+
+    relationships = [{"from": n['id'], "to": n['subject'], "type": "PUBLISHED_BY"} for n in news]
+    relationships += [
+        {"from": n['id'], "to": name, "type": "MENTIONS", "count": count}
+        for n, counts in zip(news, mentions)
+        for name, count in counts.items() if name in entities
+    ]
+    return {
+        "news": news,
+        "entities": entities,
+        "sources": {k: int(v) for k, v in clean_df['subject'].value_counts(sort=False).items()},
+        "relationships": relationships,
+    }
+
+
+def main():
+    from data_cleaning import clean_frame
+
+    parser = argparse.ArgumentParser(description='Write a synthetic graph_processed.json')
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    df, mentions, entity_types = make_corpus(args.articles, args.seed)
+    graph = make_graph(clean_frame(df), mentions, entity_types)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(graph, f)
+    print(f"[OK] {len(graph['news']):,} news, {len(graph['entities']):,} entities, "
+          f"{len(graph['relationships']):,} relationships -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
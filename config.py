@@ -11,18 +11,147 @@ load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "30"))  # seconds
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))  # seconds
+NEO4J_DRIVER_OPTIONS = dict(
+    max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+    connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+    max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+)
 
 # Groq Configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "llama-3.3-70b-versatile")
 CHAT_MODEL = os.getenv("CHAT_MODEL", "llama-3.3-70b-versatile")
 
+# Inference Backend Configuration (inference.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")  # "groq", "stub" (llm_stub_server.py) or "local" (CPU model)
+LLM_STUB_URL = os.getenv("LLM_STUB_URL", "http://127.0.0.1:8100")
+LLM_STUB_LATENCY_SECONDS = float(os.getenv("LLM_STUB_LATENCY_SECONDS", "0.2"))  # per request, before tokens
+LLM_STUB_TOKEN_SECONDS = float(os.getenv("LLM_STUB_TOKEN_SECONDS", "0.002"))  # per generated token
+LLM_STUB_ERROR_RATE = float(os.getenv("LLM_STUB_ERROR_RATE", "0.0"))  # fraction of requests answered with an error
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")  # hub name or local directory
+LOCAL_LLM_THREADS = int(os.getenv("LOCAL_LLM_THREADS", str(os.cpu_count() or 1)))
+
+# Analysis Output Configuration (verdict.py)
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "verdict")  # "verdict": JSON verdict + reasons, "full": plus analysis
+LLM_VERDICT_MAX_TOKENS = int(os.getenv("LLM_VERDICT_MAX_TOKENS", "150"))
+LLM_FULL_MAX_TOKENS = int(os.getenv("LLM_FULL_MAX_TOKENS", "800"))
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() == "true"  # response_format json_object (non-streaming)
+
+# Prompt Configuration (prompt_context.py)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1200"))  # whole user prompt, template included
+PROMPT_ARTICLE_TOKENS = int(os.getenv("PROMPT_ARTICLE_TOKENS", "60"))  # text per evidence article
+PROMPT_QUERY_TOKENS = int(os.getenv("PROMPT_QUERY_TOKENS", "400"))  # longer queries are cut
+PROMPT_MAX_ENTITIES = int(os.getenv("PROMPT_MAX_ENTITIES", "10"))
+PROMPT_TOKENIZER = os.getenv("PROMPT_TOKENIZER", "cl100k_base")  # tiktoken encoding used for counting
+
 # App Configuration
 SAMPLE_SIZE = int(os.getenv("SAMPLE_SIZE", "1000"))
 DATA_PATH = "data"
 
-# Model Configuration
-EMBEDDING_DIMENSION = 4096  # Llama 3 context size
+# Cleaned Dataset Storage
+CLEANED_NEWS_CSV = os.path.join(DATA_PATH, "cleaned_news.csv")
+CLEANED_NEWS_PARQUET = os.path.join(DATA_PATH, "cleaned_news.parquet")  # columnar copy, read with column projection
+DASHBOARD_AGGREGATES_PATH = os.path.join(DATA_PATH, "dashboard_aggregates.json")  # precomputed at cleaning time
+PIPELINE_MANIFEST_PATH = os.path.join(DATA_PATH, "pipeline_manifest.json")  # per-stage article hashes, tombstones
+
+# Cleaning Configuration
+CLEAN_WORKERS = int(os.getenv("CLEAN_WORKERS", str(os.cpu_count() or 1)))  # processes for text cleaning
+CLEAN_CHUNK_SIZE = int(os.getenv("CLEAN_CHUNK_SIZE", "5000"))  # rows per worker task
+
+# Near-Duplicate Detection Configuration (MinHash + LSH over clean_text)
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))  # words per shingle
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))  # MinHash signature length
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))  # LSH bands of DEDUP_NUM_PERM / DEDUP_BANDS rows
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))  # estimated Jaccard to join a cluster
+NEWS_CLUSTERS_PATH = os.path.join(DATA_PATH, "news_clusters.csv")  # id, cluster_id, cluster_size, is_canonical
+DEDUP_REPORT_PATH = os.path.join(DATA_PATH, "dedup_report.json")
+
+# Entity Extraction Configuration
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "64"))
+NER_PROCESSES = int(os.getenv("NER_PROCESSES", str(os.cpu_count() or 1)))
+NER_MAX_CHARS = int(os.getenv("NER_MAX_CHARS", "5000"))  # only the start of each article is tagged
+NER_ENTITY_TYPES = ["PERSON", "ORG", "GPE", "NORP", "LOC", "EVENT"]
+NER_MIN_ARTICLES = int(os.getenv("NER_MIN_ARTICLES", "2"))  # drop entities seen in fewer articles
+NER_CACHE_PATH = os.path.join(DATA_PATH, "ner_mentions.json")  # per-article entities, reused on reruns
+
+# Graph Loading Configuration
+GRAPH_FILE = os.path.join(DATA_PATH, "graph_processed.json")
+GRAPH_BATCH_SIZE = int(os.getenv("GRAPH_BATCH_SIZE", "1000"))  # rows per UNWIND transaction
+GRAPH_CHECKPOINT_PATH = os.path.join(DATA_PATH, "graph_load_checkpoint.json")
+
+# Graph View Configuration
+GRAPH_VIEW_SAMPLE_SIZE = int(os.getenv("GRAPH_VIEW_SAMPLE_SIZE", "50"))  # MENTIONS edges sampled
+GRAPH_VIEW_MAX_SAMPLE_SIZE = int(os.getenv("GRAPH_VIEW_MAX_SAMPLE_SIZE", "1000"))
+GRAPH_VIEW_EXPAND = int(os.getenv("GRAPH_VIEW_EXPAND", "0"))  # extra articles per sampled entity
+GRAPH_VIEW_TTL_SECONDS = int(os.getenv("GRAPH_VIEW_TTL_SECONDS", "600"))
+GRAPH_LAYOUT_PATH = os.path.join(DATA_PATH, "graph_layout.npz")  # precomputed by build_graph_layout.py
+GRAPH_EXPLORER_NODES = int(os.getenv("GRAPH_EXPLORER_NODES", "2000"))  # nodes drawn initially
+GRAPH_EXPLORER_MAX_NODES = int(os.getenv("GRAPH_EXPLORER_MAX_NODES", "20000"))
+GRAPH_EXPLORER_NEIGHBOURS = int(os.getenv("GRAPH_EXPLORER_NEIGHBOURS", "10"))  # added per click, by degree
+
+# LLM Response Cache Configuration
+LLM_CACHE_PATH = os.path.join(DATA_PATH, "llm_cache.sqlite")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+LLM_CACHE_NEAR_DUPLICATES = os.getenv("LLM_CACHE_NEAR_DUPLICATES", "true").lower() == "true"
+LLM_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD", "0.95"))  # cosine
+
+# Retrieval Configuration
+RETRIEVAL_NEIGHBOURS = int(os.getenv("RETRIEVAL_NEIGHBOURS", "0"))  # 2-hop articles via shared entities, 0 = off
+
+# Batch Detection Configuration
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "64"))  # queries per retrieval round trip
+BATCH_LLM_WORKERS = int(os.getenv("BATCH_LLM_WORKERS", "4"))  # concurrent Groq calls
+BATCH_LLM_REQUESTS_PER_MINUTE = int(os.getenv("BATCH_LLM_REQUESTS_PER_MINUTE", "30"))
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "3"))
+
+# Vector Search Configuration
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")  # local sentence-transformers model
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384"))  # output size of EMBEDDING_MODEL
+EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float32")  # float16 halves the store on disk and in RAM
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CHUNK_SIZE = int(os.getenv("EMBEDDING_CHUNK_SIZE", "4096"))  # rows committed per resumable step
+EMBEDDING_STORE_PATH = os.path.join(DATA_PATH, "news_embeddings.npy")  # ids and text hashes in news_embeddings.json
+VECTOR_INDEX_PATH = os.path.join(DATA_PATH, "news_vector_index.npz")
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))  # IVF lists scanned per query
+
+# Lexical Search Configuration
+LEXICAL_INDEX_PATH = os.path.join(DATA_PATH, "news_lexical_index.npz")
+BM25_K1 = float(os.getenv("BM25_K1", "1.5"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "false").lower() == "true"  # fuse BM25 with vector hits
+RRF_K = int(os.getenv("RRF_K", "60"))  # reciprocal rank fusion constant
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # hits per ranking before fusion
+
+# Metrics Configuration
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1000"))  # latency samples kept per stage
+
+# Pre-screen Classifier Configuration
+PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "true").lower() == "true"
+PRESCREEN_MODEL_PATH = os.path.join(DATA_PATH, "prescreen.joblib")
+PRESCREEN_REPORT_PATH = os.path.join(DATA_PATH, "prescreen_report.json")
+# P(fake) inside [LOW, HIGH] is uncertain and escalates to the LLM
+PRESCREEN_LOW = float(os.getenv("PRESCREEN_LOW", "0.1"))
+PRESCREEN_HIGH = float(os.getenv("PRESCREEN_HIGH", "0.9"))
+
+# Detection API Configuration (api.py, per worker process)
+API_CONCURRENCY = int(os.getenv("API_CONCURRENCY", "32"))  # pipeline threads; keep <= NEO4J_MAX_POOL_SIZE
+API_QUEUE_SIZE = int(os.getenv("API_QUEUE_SIZE", "256"))  # requests allowed to wait for a thread
+API_QUEUE_TIMEOUT_SECONDS = float(os.getenv("API_QUEUE_TIMEOUT_SECONDS", "2"))
+API_REQUEST_TIMEOUT_SECONDS = float(os.getenv("API_REQUEST_TIMEOUT_SECONDS", "30"))
+API_BATCH_TIMEOUT_SECONDS = float(os.getenv("API_BATCH_TIMEOUT_SECONDS", "300"))
+API_RETRY_AFTER_SECONDS = int(os.getenv("API_RETRY_AFTER_SECONDS", "1"))
+# Queries per /detect/batch request. By default as many as the LLM rate allows
+# within nine tenths of the batch timeout (any query may need a call), so a
+# full batch can finish before it is answered with 504
+API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", str(
+    max(1, int(BATCH_LLM_REQUESTS_PER_MINUTE * API_BATCH_TIMEOUT_SECONDS * 0.9 / 60))
+    if BATCH_LLM_REQUESTS_PER_MINUTE > 0 else 1000)))
+API_MAX_QUERY_CHARS = int(os.getenv("API_MAX_QUERY_CHARS", "20000"))
 
 def validate_config():
     """Validate all required configurations"""
@@ -32,7 +161,7 @@ def validate_config():
         errors.append("NEO4J_URI not set in .env")
     if not NEO4J_PASSWORD:
         errors.append("NEO4J_PASSWORD not set in .env")
-    if not GROQ_API_KEY:
+    if LLM_BACKEND == "groq" and not GROQ_API_KEY:
         errors.append("GROQ_API_KEY not set in .env")
     
     if errors:
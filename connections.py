@@ -0,0 +1,63 @@
+# ====================
+# BACKGROUND CONNECTION CHECK
+# ====================
+# Creating the Neo4j driver means importing it and a verify_connectivity
+# round trip (seconds when the database is down); the LLM client costs an
+# import (and loading the model, for LLM_BACKEND=local). ConnectionCheck does both on a background thread, so a page that
+# does not need the clients (About, Dashboard) renders without waiting, and
+# the sidebar shows the status once it is known.
+
+import threading
+
+
+def connect_clients():
+    """(driver, client, errors): verified Neo4j driver and LLM_BACKEND client, None where unavailable."""
+    import detector
+    import inference
+
+    errors = {}
+    try:
+        driver = detector.create_driver()
+    except Exception as e:
+        driver, errors["neo4j"] = None, str(e)
+
+    missing = inference.missing_credentials()
+    if missing:
+        client, errors["groq"] = None, missing
+    else:
+        try:
+            client = detector.create_llm_client()
+        except Exception as e:
+            client, errors["groq"] = None, str(e)
+    return driver, client, errors
+
+
+class ConnectionCheck:
+
+    def __init__(self):
+        self.driver = None
+        self.client = None
+        self.errors = {}
+        self.ready = threading.Event()
+        threading.Thread(target=self._run, name="connection-check", daemon=True).start()
+
+    def _run(self):
+        try:
+            self.driver, self.client, self.errors = connect_clients()
+        finally:
+            self.ready.set()
+
+    def wait(self, timeout=None):
+        """Block until the check has finished (or timeout); True if it has."""
+        return self.ready.wait(timeout)
+
+    def clients(self):
+        """(driver, client, errors) once known."""
+        self.wait()
+        return self.driver, self.client, dict(self.errors)
+
+    def status(self):
+        """{"neo4j": bool, "groq": bool}, with None for both while still checking."""
+        if not self.ready.is_set():
+            return {"neo4j": None, "groq": None}
+        return {"neo4j": self.driver is not None, "groq": self.client is not None}
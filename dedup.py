@@ -0,0 +1,132 @@
+# ====================
+# NEAR-DUPLICATE DETECTION
+# ====================
+# MinHash signatures over word shingles of clean_text, bucketed with LSH
+# banding: two articles become candidates when all rows of at least one band
+# agree, and a candidate joins a cluster when its estimated Jaccard
+# similarity to the bucket's first article reaches the threshold. Each
+# article is hashed once and each bucket scanned once, so the cost grows
+# linearly with the corpus instead of with the number of pairs.
+
+import zlib
+
+import numpy as np
+
+from config import DEDUP_SHINGLE_SIZE, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_THRESHOLD
+
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingle_hashes(text, k=DEDUP_SHINGLE_SIZE):
+    """uint32 hashes of the distinct k-word shingles; texts shorter than k words are one shingle."""
+    words = np.fromiter((zlib.crc32(w.encode('utf-8')) for w in text.split()), dtype=np.uint64)
+    if len(words) == 0:
+        return np.empty(0, dtype=np.uint64)
+    k = min(k, len(words))
+    # Polynomial combination of k consecutive word hashes, wrapping mod 2^64
+    combined = np.zeros(len(words) - k + 1, dtype=np.uint64)
+    for offset in range(k):
+        combined = combined * np.uint64(1000003) + words[offset:len(words) - k + 1 + offset]
+    return np.unique(combined >> np.uint64(32))
+
+
+class MinHasher:
+    """Multiply-shift hash family: h_i(x) = (a_i * x + b_i) >> 32, mod 2^64."""
+
+    def __init__(self, num_perm=DEDUP_NUM_PERM, seed=42):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    @property
+    def num_perm(self):
+        return len(self.a)
+
+    def signatures(self, shingle_sets, chunk_size=16384):
+        """(n, num_perm) uint32 signatures; documents without shingles get all-max rows."""
+        signatures = np.full((len(shingle_sets), self.num_perm), MAX_HASH, dtype=np.uint64)
+        lengths = np.array([len(s) for s in shingle_sets])
+        docs = np.flatnonzero(lengths)
+
+        # Hash many documents per numpy call: concatenate their shingles and
+        # take the per-document minimum with reduceat
+        start = 0
+        while start < len(docs):
+            end, total = start, 0
+            while end < len(docs) and (end == start or total + lengths[docs[end]] <= chunk_size):
+                total += lengths[docs[end]]
+                end += 1
+            batch = docs[start:end]
+            values = np.concatenate([shingle_sets[d] for d in batch])
+            offsets = np.concatenate([[0], np.cumsum(lengths[batch])[:-1]])
+            hashed = (self.a[:, None] * values[None, :] + self.b[:, None]) >> np.uint64(32)
+            signatures[batch] = np.minimum.reduceat(hashed, offsets, axis=1).T
+            start = end
+        return signatures.astype(np.uint32)
+
+
+def _find(parent, i):
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+    return root
+
+
+def lsh_clusters(signatures, bands=DEDUP_BANDS, threshold=DEDUP_THRESHOLD, groups=None):
+    """
+    Cluster label per row (the smallest row index in its cluster). Rows with
+    different `groups` values (e.g. labels) are never clustered together.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    parent = np.arange(n)
+    empty = (signatures == np.uint32(MAX_HASH)).all(axis=1)
+    group_codes = np.unique(groups, return_inverse=True)[1].astype(np.uint32) if groups is not None \
+        else np.zeros(n, dtype=np.uint32)
+
+    for band in range(bands):
+        # Rows of the band folded into one uint64 key; colliding keys only
+        # cost a similarity check, they cannot merge dissimilar articles
+        key = group_codes.astype(np.uint64)
+        for column in signatures[:, band * rows:(band + 1) * rows].T:
+            key = key * np.uint64(0x100000001B3) + column
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        starts = np.flatnonzero(np.concatenate([[True], key[1:] != key[:-1]]))
+        ends = np.append(starts[1:], n)
+        for start, end in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+            bucket = order[start:end]
+            if empty[bucket[0]]:
+                continue
+            first = bucket[0]
+            # Fraction of agreeing signature rows estimates the Jaccard similarity
+            similarity = (signatures[bucket[1:]] == signatures[first]).mean(axis=1)
+            for other in bucket[1:][similarity >= threshold]:
+                a, b = _find(parent, first), _find(parent, other)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+
+    return np.array([_find(parent, i) for i in range(n)])
+
+
+def canonical_rows(clusters, lengths):
+    """Per cluster, the row with the longest text (first one on ties); boolean mask."""
+    order = np.lexsort((np.arange(len(clusters)), -np.asarray(lengths), clusters))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = clusters[order][1:] != clusters[order][:-1]
+    canonical = np.zeros(len(clusters), dtype=bool)
+    canonical[order[first]] = True
+    return canonical
+
+
+def deduplicate(texts, groups=None, shingle_size=DEDUP_SHINGLE_SIZE, num_perm=DEDUP_NUM_PERM,
+                bands=DEDUP_BANDS, threshold=DEDUP_THRESHOLD):
+    """(cluster_id, cluster_size, is_canonical) arrays for a list of cleaned texts."""
+    hasher = MinHasher(num_perm)
+    signatures = hasher.signatures([shingle_hashes(t, shingle_size) for t in texts])
+    clusters = lsh_clusters(signatures, bands, threshold, groups)
+    _, cluster_id, sizes = np.unique(clusters, return_inverse=True, return_counts=True)
+    canonical = canonical_rows(cluster_id, [len(t) for t in texts])
+    return cluster_id, sizes[cluster_id], canonical
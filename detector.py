@@ -0,0 +1,519 @@
+# ====================
+# RAG DETECTION PIPELINE
+# ====================
+# find_similar_news -> get_related_entities -> analyze_with_groq, without
+# any Streamlit dependency so the app, the batch CLI and benchmarks share it.
+# The batch variants retrieve a whole batch of queries per Cypher round trip
+# and fan the LLM calls out over a rate-limited thread pool.
+
+import csv
+import io
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import *
+from lexical_index import reciprocal_rank_fusion
+from metrics import METRICS, instrumented
+from prescreen import prescreen_analysis
+from prompt_context import build_context
+from verdict import FULL_ANALYSIS, parse_analysis, parse_verdict
+
+
+# ============================================
+# CLIENTS
+# ============================================
+
+def create_driver():
+    from neo4j import GraphDatabase
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), **NEO4J_DRIVER_OPTIONS)
+    driver.verify_connectivity()
+    return driver
+
+def create_llm_client():
+    """Chat-completions client for LLM_BACKEND (see inference.py)."""
+    import inference
+    return inference.create_client()
+
+
+# ============================================
+# RETRIEVAL
+# ============================================
+
+NEWS_FIELDS = """n.id as id, n.title as title, n.label as label,
+                 n.subject as subject, n.text_preview as text"""
+
+SIMILAR_BY_IDS_QUERY = f"""
+    UNWIND $hits AS hit
+    MATCH (n:News {{id: hit.id}})
+    RETURN {NEWS_FIELDS}, hit.score as score
+    ORDER BY score DESC
+"""
+
+# Simple first-keyword scan, only used until the vector or BM25 index is built
+KEYWORD_QUERY = f"""
+    MATCH (n:News)
+    WHERE toLower(n.title) CONTAINS toLower($keyword)
+         OR toLower(n.text_preview) CONTAINS toLower($keyword)
+    RETURN {NEWS_FIELDS}
+    LIMIT $limit
+"""
+
+ENTITIES_QUERY = """
+    MATCH (n:News)-[:MENTIONS]->(e:Entity)
+    WHERE n.id IN $ids
+    RETURN e.name as entity, e.type as type, count(n) as mention_count
+    ORDER BY mention_count DESC
+    LIMIT 10
+"""
+
+# Similar articles, their aggregated entities and (optionally) 2-hop
+# neighbours through shared entities, in one round trip. {seed} produces
+# the matched articles as `n` plus a `score`.
+CONTEXT_QUERY = """
+    {seed}
+    WITH n, score ORDER BY score DESC
+    WITH collect(n) AS nodes,
+         collect({{id: n.id, title: n.title, label: n.label, subject: n.subject,
+                  text: n.text_preview, score: score}}) AS similar
+    CALL {{
+        WITH nodes
+        UNWIND nodes AS n
+        MATCH (n)-[:MENTIONS]->(e:Entity)
+        WITH e, count(n) AS mention_count
+        ORDER BY mention_count DESC
+        LIMIT 10
+        RETURN collect({{entity: e.name, type: e.type, mention_count: mention_count}}) AS entities
+    }}
+    CALL {{
+        WITH nodes
+        WITH nodes WHERE $neighbours > 0
+        UNWIND nodes AS n
+        MATCH (n)-[:MENTIONS]->(:Entity)<-[:MENTIONS]-(m:News)
+        WHERE NOT m IN nodes
+        WITH m, count(*) AS shared_entities
+        ORDER BY shared_entities DESC
+        LIMIT $neighbours
+        RETURN collect({{id: m.id, title: m.title, label: m.label, subject: m.subject,
+                        text: m.text_preview, shared_entities: shared_entities}}) AS neighbours
+    }}
+    RETURN similar, entities, neighbours
+"""
+
+CONTEXT_BY_IDS_QUERY = CONTEXT_QUERY.format(seed="""
+    UNWIND $hits AS hit
+    MATCH (n:News {id: hit.id})
+    WITH n, hit.score AS score""")
+
+CONTEXT_BY_KEYWORD_QUERY = CONTEXT_QUERY.format(seed="""
+    MATCH (n:News)
+    WHERE toLower(n.title) CONTAINS toLower($keyword)
+         OR toLower(n.text_preview) CONTAINS toLower($keyword)
+    WITH n, 0.0 AS score
+    LIMIT $limit""")
+
+def first_keyword(query_text):
+    words = query_text.split()
+    return words[0] if words else ""
+
+@instrumented("search_hits")
+def search_hits(query_text, limit=5, index=None, query_vector=None, lexical=None):
+    """
+    [(id, score)] from the vector index, the BM25 index, or both fused by
+    reciprocal rank (HYBRID_RETRIEVAL). None when neither index is available.
+    """
+    has_vectors = index is not None and query_vector is not None
+    if has_vectors and lexical is not None and HYBRID_RETRIEVAL:
+        depth = max(limit, HYBRID_CANDIDATES)
+        return reciprocal_rank_fusion([index.search(query_vector, k=depth, nprobe=VECTOR_INDEX_NPROBE),
+                                       lexical.search(query_text, k=depth)], limit=limit)
+    if has_vectors:
+        return index.search(query_vector, k=limit, nprobe=VECTOR_INDEX_NPROBE)
+    if lexical is not None:
+        return lexical.search(query_text, k=limit)
+    return None
+
+@instrumented("find_similar_news")
+def find_similar_news(driver, query_text, limit=5, index=None, query_vector=None, lexical=None):
+    hits = search_hits(query_text, limit, index, query_vector, lexical)
+    if not driver:
+        # Graph unavailable: serve the articles straight from the BM25 index
+        return lexical.articles(hits) if lexical is not None else []
+    if hits is None:
+        # No index built yet (scripts/build_vector_index.py, build_lexical_index.py)
+        return keyword_search_news(driver, query_text, limit)
+
+    with driver.session() as session:
+        result = session.run(SIMILAR_BY_IDS_QUERY,
+                             hits=[{"id": news_id, "score": score} for news_id, score in hits])
+        return [record.data() for record in result]
+
+@instrumented("keyword_search_news")
+def keyword_search_news(driver, query_text, limit=5):
+    if not driver: return []
+    with driver.session() as session:
+        result = session.run(KEYWORD_QUERY, keyword=first_keyword(query_text), limit=limit)
+        return [record.data() for record in result]
+
+@instrumented("get_related_entities")
+def get_related_entities(driver, news_ids):
+    if not driver or not news_ids: return []
+    with driver.session() as session:
+        result = session.run(ENTITIES_QUERY, ids=news_ids)
+        return [record.data() for record in result]
+
+def context_query(query_text, limit=5, index=None, query_vector=None, neighbours=RETRIEVAL_NEIGHBOURS,
+                  lexical=None):
+    """(cypher, params) for retrieve_context; shared with async_detector.py."""
+    hits = search_hits(query_text, limit, index, query_vector, lexical)
+    if hits is None:
+        return CONTEXT_BY_KEYWORD_QUERY, {"keyword": first_keyword(query_text), "limit": limit,
+                                          "neighbours": neighbours}
+    return CONTEXT_BY_IDS_QUERY, {"hits": [{"id": news_id, "score": score} for news_id, score in hits],
+                                  "neighbours": neighbours}
+
+def _read_context(tx, query, params):
+    record = tx.run(query, **params).single()
+    return record['similar'], record['entities'], record['neighbours']
+
+@instrumented("retrieve_context")
+def retrieve_context(driver, query_text, limit=5, index=None, query_vector=None, neighbours=RETRIEVAL_NEIGHBOURS,
+                     lexical=None):
+    """
+    Similar articles + aggregated entities (+ 2-hop neighbours) in a single
+    managed read transaction. Returns (similar, entities, neighbours).
+    Without a driver only the BM25 articles (if any) are returned.
+    """
+    if not driver:
+        return find_similar_news(None, query_text, limit, index, query_vector, lexical), [], []
+    query, params = context_query(query_text, limit, index, query_vector, neighbours, lexical)
+    with driver.session() as session:
+        return session.execute_read(_read_context, query, params)
+
+@instrumented("find_similar_news_batch")
+def find_similar_news_batch(driver, query_texts, limit=5, index=None, query_vectors=None, lexical=None):
+    """One Cypher round trip for a whole batch; returns one list per query."""
+    results = [[] for _ in query_texts]
+    if not query_texts: return results
+    if not driver:
+        return [find_similar_news(None, q, limit, index, None if query_vectors is None else query_vectors[i],
+                                  lexical)
+                for i, q in enumerate(query_texts)]
+
+    with driver.session() as session:
+        if (index is not None and query_vectors is not None) or lexical is not None:
+            hits = [
+                {"query": i, "id": news_id, "score": score}
+                for i, query_text in enumerate(query_texts)
+                for news_id, score in search_hits(query_text, limit, index,
+                                                  None if query_vectors is None else query_vectors[i], lexical)
+            ]
+            records = session.run(f"""
+                UNWIND $hits AS hit
+                MATCH (n:News {{id: hit.id}})
+                RETURN hit.query as query, {NEWS_FIELDS}, hit.score as score
+                ORDER BY query, score DESC
+            """, hits=hits)
+        else:
+            keywords = [first_keyword(q) for q in query_texts]
+            records = session.run(f"""
+                UNWIND range(0, size($keywords) - 1) AS query
+                CALL {{
+                    WITH query
+                    MATCH (n:News)
+                    WHERE toLower(n.title) CONTAINS toLower($keywords[query])
+                         OR toLower(n.text_preview) CONTAINS toLower($keywords[query])
+                    RETURN n
+                    LIMIT $limit
+                }}
+                RETURN query, {NEWS_FIELDS}
+            """, keywords=keywords, limit=limit)
+
+        for record in records:
+            row = record.data()
+            results[row.pop('query')].append(row)
+    return results
+
+@instrumented("get_related_entities_batch")
+def get_related_entities_batch(driver, news_id_lists):
+    """Top-10 entities for every id list, in one Cypher round trip."""
+    results = [[] for _ in news_id_lists]
+    if not driver or not any(news_id_lists): return results
+
+    with driver.session() as session:
+        records = session.run("""
+            UNWIND range(0, size($id_lists) - 1) AS query
+            CALL {
+                WITH query
+                MATCH (n:News)-[:MENTIONS]->(e:Entity)
+                WHERE n.id IN $id_lists[query]
+                RETURN e.name as entity, e.type as type, count(n) as mention_count
+                ORDER BY mention_count DESC
+                LIMIT 10
+            }
+            RETURN query, entity, type, mention_count
+        """, id_lists=news_id_lists)
+        for record in records:
+            row = record.data()
+            results[row.pop('query')].append(row)
+    return results
+
+
+# ============================================
+# LLM ANALYSIS
+# ============================================
+
+def build_prompt(query, similar_articles, entities, mode=ANALYSIS_MODE):
+    """
+    prompt_context.build_context under PROMPT_TOKEN_BUDGET: a dict with the
+    "prompt" text and its "prompt_tokens", recorded in METRICS.
+    """
+    context = build_context(query, similar_articles, entities, mode)
+    METRICS.increment("prompts_built")
+    METRICS.increment("prompt_tokens_built", context["prompt_tokens"])
+    METRICS.increment("prompts_truncated", int(context["truncated"]))
+    return context
+
+def chat_request(prompt, mode=ANALYSIS_MODE, stream=False):
+    """Keyword arguments for chat.completions.create (sync and async clients)."""
+    request = dict(
+        model=CHAT_MODEL,
+        messages=[
+            {"role": "system", "content": "You are a fake news detection expert. You answer in JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.1,
+        max_tokens=LLM_FULL_MAX_TOKENS if mode == FULL_ANALYSIS else LLM_VERDICT_MAX_TOKENS,
+    )
+    if stream:
+        request["stream"] = True
+    elif LLM_JSON_MODE:
+        # JSON mode guarantees a parseable object but is not available for streams
+        request["response_format"] = {"type": "json_object"}
+    return request
+
+def cache_model(mode=ANALYSIS_MODE):
+    """LLM cache key component: a verdict-only answer must not be served for a full analysis."""
+    from inference import model_name
+    return f"{model_name()}:{mode}"
+
+@instrumented("groq_completion")
+def complete(client, prompt, mode=ANALYSIS_MODE):
+    """One chat completion; raises on API errors so callers can retry."""
+    response = client.chat.completions.create(**chat_request(prompt, mode))
+    METRICS.record_usage(getattr(response, 'usage', None))
+    return response.choices[0].message.content
+
+@instrumented("analyze_with_groq")
+def analyze_with_groq(client, query, similar_articles, entities, cache=None, query_vector=None, stats=None,
+                      mode=ANALYSIS_MODE):
+    """
+    The raw response (read it with parse_analysis); `stats`, if given,
+    receives prompt_tokens when a prompt is sent.
+    """
+    if not client: return "Groq client not initialized."
+
+    # Repeat (or near-identical) queries over the same evidence skip the LLM
+    article_ids = [article['id'] for article in similar_articles]
+    if cache is not None:
+        cached = cache.lookup(query, article_ids, cache_model(mode), embedding=query_vector)
+        METRICS.increment("llm_cache_hits" if cached is not None else "llm_cache_misses")
+        if cached is not None:
+            return cached
+
+    context = build_prompt(query, similar_articles, entities, mode)
+    if stats is not None:
+        stats["prompt_tokens"] = context["prompt_tokens"]
+    try:
+        analysis = complete(client, context["prompt"], mode)
+    except Exception as e:
+        return f"Error analyzing with Groq: {e}"
+
+    # Only answers with a verdict are cached, so a malformed one is retried next time
+    if cache is not None and parse_verdict(analysis) != "UNKNOWN":
+        cache.store(query, article_ids, cache_model(mode), analysis, embedding=query_vector)
+    return analysis
+
+
+# ============================================
+# BATCH DETECTION
+# ============================================
+
+class RateLimiter:
+    """Spaces calls evenly so at most `per_minute` start in any minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+class Cancelled(Exception):
+    """The batch was stopped before this query reached the LLM."""
+
+def with_retries(fn, max_retries, base_delay=1.0):
+    """Call fn, retrying with exponential backoff and jitter."""
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Cancelled:
+            raise
+        except Exception:
+            if attempt == max_retries:
+                raise
+            time.sleep(base_delay * 2 ** attempt + random.uniform(0, base_delay))
+
+def verdict_fields(analysis):
+    """verdict, confidence and reasons of a response, for result dicts."""
+    parsed = parse_analysis(analysis)
+    return {"verdict": parsed["verdict"], "confidence": parsed["confidence"], "reasons": parsed["reasons"]}
+
+def _analyze_one(position, query, similar, entities, client, cache, query_vector, limiter, max_retries,
+                 prescreen=None, prescreen_score=None, mode=ANALYSIS_MODE, stop=None):
+    result = {
+        "index": position,
+        "query": query,
+        "verdict": "UNKNOWN",
+        "confidence": None,
+        "reasons": [],
+        "similar_ids": [a['id'] for a in similar],
+        "analysis": "",
+        "cached": False,
+        "prescreen_score": prescreen_score,
+        "prompt_tokens": None,
+        "error": None,
+    }
+    # Confident pre-screen scores skip the LLM entirely
+    if prescreen is not None:
+        decided = prescreen.decide(prescreen_score)
+        METRICS.increment("prescreen_decided" if decided is not None else "prescreen_escalated")
+        if decided is not None:
+            analysis = prescreen_analysis(prescreen_score, decided)
+            result.update(analysis=analysis, **verdict_fields(analysis))
+            return result
+
+    if cache is not None:
+        cached = cache.lookup(query, result["similar_ids"], cache_model(mode), embedding=query_vector)
+        METRICS.increment("llm_cache_hits" if cached is not None else "llm_cache_misses")
+        if cached is not None:
+            result.update(analysis=cached, cached=True, **verdict_fields(cached))
+            return result
+
+    context = build_prompt(query, similar, entities, mode)
+    result["prompt_tokens"] = context["prompt_tokens"]
+
+    def call():
+        limiter.wait()
+        if stop is not None and stop.is_set():
+            raise Cancelled()
+        return complete(client, context["prompt"], mode)
+
+    try:
+        analysis = with_retries(call, max_retries)
+    except Cancelled:
+        result["error"] = "cancelled"
+        return result
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+
+    result.update(analysis=analysis, **verdict_fields(analysis))
+    if result["verdict"] == "UNKNOWN":
+        METRICS.increment("unparsed_verdicts")
+    elif cache is not None:
+        cache.store(query, result["similar_ids"], cache_model(mode), analysis, embedding=query_vector)
+    return result
+
+def detect_batch(queries, driver, client, index=None, embedder=None, cache=None, limit=5, lexical=None, prescreen=None,
+                 batch_size=BATCH_SIZE, workers=BATCH_LLM_WORKERS,
+                 requests_per_minute=BATCH_LLM_REQUESTS_PER_MINUTE, max_retries=BATCH_MAX_RETRIES,
+                 mode=ANALYSIS_MODE, limiter=None, stop=None):
+    """
+    Run the RAG pipeline over many queries. Yields one result dict per query
+    as soon as its analysis finishes (not in input order; see "index").
+    Retrieval for the next batch overlaps with the LLM calls of the previous one.
+    mode: verdict.VERDICT_ONLY (short JSON verdicts) or FULL_ANALYSIS.
+    limiter: a RateLimiter shared by concurrent batches, so together they stay
+    under one rate; without it the batch gets its own at requests_per_minute.
+    stop: a threading.Event; once set, no further LLM calls are made, queries
+    already submitted come back with error "cancelled" and later batches are
+    not started.
+    """
+    from embeddings import embed_texts
+
+    limiter = limiter or RateLimiter(requests_per_minute)
+    previous = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(queries), batch_size):
+            if stop is not None and stop.is_set():
+                break
+            batch = queries[start:start + batch_size]
+            vectors = embed_texts(batch, embedder) if embedder is not None else [None] * len(batch)
+            similar_lists = find_similar_news_batch(
+                driver, batch, limit, index=index,
+                query_vectors=vectors if embedder is not None else None, lexical=lexical)
+            entity_lists = get_related_entities_batch(
+                driver, [[a['id'] for a in similar] for similar in similar_lists])
+            scores = prescreen.scores(batch).tolist() if prescreen is not None else [None] * len(batch)
+
+            current = [
+                pool.submit(_analyze_one, start + i, query, similar_lists[i], entity_lists[i],
+                            client, cache, vectors[i], limiter, max_retries, prescreen, scores[i], mode, stop)
+                for i, query in enumerate(batch)
+            ]
+            for future in as_completed(previous):
+                yield future.result()
+            previous = current
+
+        for future in as_completed(previous):
+            yield future.result()
+
+
+# ============================================
+# BATCH INPUT / OUTPUT
+# ============================================
+
+QUERY_COLUMNS = ['query', 'headline', 'title', 'text']
+RESULT_FIELDS = ['index', 'query', 'verdict', 'confidence', 'reasons', 'cached', 'prescreen_score', 'prompt_tokens',
+                 'error', 'similar_ids', 'analysis']
+
+def load_batch_queries(text, filename, column=None):
+    """Read queries from CSV or JSONL content; picks the first known column by default."""
+    if filename.endswith('.jsonl') or filename.endswith('.json'):
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+    if not rows:
+        return []
+
+    if column is None:
+        column = next((c for c in QUERY_COLUMNS if c in rows[0]), None)
+    if column is None or column not in rows[0]:
+        raise ValueError(f"No query column found; expected one of {QUERY_COLUMNS} or pass a column name")
+    return [str(row[column]) for row in rows if row.get(column)]
+
+class ResultWriter:
+    """Streams results to .jsonl or .csv as they arrive."""
+
+    def __init__(self, file, filename):
+        self.file = file
+        self.csv = None
+        if filename.endswith('.csv'):
+            self.csv = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, result):
+        if self.csv is not None:
+            self.csv.writerow({**result, "similar_ids": " ".join(result["similar_ids"]),
+                               "reasons": " | ".join(result["reasons"])})
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
@@ -0,0 +1,149 @@
+# ====================
+# EMBEDDING STORE
+# ====================
+# Article embeddings live in one row-major .npy matrix that is opened with
+# mmap_mode, so readers (the vector index, the Detector) share the OS page
+# cache instead of each holding a copy. A JSON sidecar records the model,
+# dimension and dtype plus, per row, the article id and the hash of the text
+# that was embedded; the precompute job uses it to skip unchanged articles
+# and to resume after an interruption.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from config import EMBEDDING_STORE_PATH, EMBEDDING_MODEL, EMBEDDING_DTYPE, VECTOR_INDEX_PATH
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Row i of `vectors` belongs to ids[i]. Rows of removed articles are
+    tombstoned (id None) and new articles are always appended, never given a
+    tombstoned row, so row numbers held by a vector index keep pointing at
+    the article they were built for until the matrix is rebuilt with --full.
+    """
+
+    def __init__(self, path=EMBEDDING_STORE_PATH):
+        self.path = path
+        self.meta_path = os.path.splitext(path)[0] + '.json'
+        self.meta = {}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+        self.ids = self.meta.get('ids', [])
+        self.hashes = self.meta.get('hashes', [])
+        self.rows = {news_id: row for row, news_id in enumerate(self.ids) if news_id is not None}
+        self.vectors = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def dimension(self):
+        return self.meta.get('dimension')
+
+    @property
+    def model(self):
+        return self.meta.get('model')
+
+    def live_rows(self):
+        """(rows, ids) of every stored article, in row order."""
+        rows = np.fromiter(sorted(self.rows.values()), dtype=np.int64, count=len(self.rows))
+        return rows, np.array([self.ids[row] for row in rows], dtype=str)
+
+    def get(self, news_ids):
+        """Vectors for the given ids (None for ids without a stored vector)."""
+        return [None if (row := self.rows.get(news_id)) is None else self.vectors[row] for news_id in news_ids]
+
+    # ----- writing (scripts/build_embeddings.py) -----
+
+    def compatible(self, model=EMBEDDING_MODEL, dimension=None, dtype=EMBEDDING_DTYPE):
+        return (self.vectors is not None and self.model == model and self.meta.get('dtype') == dtype
+                and (dimension is None or self.dimension == dimension))
+
+    def reset(self, model, dimension, dtype=EMBEDDING_DTYPE):
+        """Drop every row, e.g. when the model or the dtype changes."""
+        self.meta = {"model": model, "dimension": dimension, "dtype": dtype}
+        self.ids, self.hashes, self.rows = [], [], {}
+        self.vectors = np.empty((0, dimension), dtype=dtype)  # the file is created by reserve()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.save_meta()
+
+    def plan(self, documents):
+        """
+        documents: {news_id: text}. Tombstones articles that disappeared and
+        returns [(row, news_id, text, hash)] for new or changed ones. Changed
+        articles keep their row; new ones are appended after every existing
+        row, tombstones included.
+        """
+        for news_id in [i for i in self.rows if i not in documents]:
+            row = self.rows.pop(news_id)
+            self.ids[row] = self.hashes[row] = None
+        next_row = len(self.ids)
+
+        pending = []
+        for news_id, text in documents.items():
+            digest = text_hash(text)
+            row = self.rows.get(news_id)
+            if row is not None and self.hashes[row] == digest:
+                continue
+            if row is None:
+                row, next_row = next_row, next_row + 1
+            pending.append((row, news_id, text, digest))
+        return pending
+
+    def reserve(self, n_rows):
+        """
+        Grow the matrix to at least n_rows, copying the existing rows over, and
+        the row lists with it. The file may already be long enough when an
+        earlier run grew it and stopped before its first write saved the
+        sidecar; the lists are extended all the same.
+        """
+        if len(self.vectors) < n_rows:
+            tmp_path = self.path + '.tmp.npy'
+            grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=self.vectors.dtype,
+                                              shape=(n_rows, self.vectors.shape[1]))
+            grown[:len(self.vectors)] = self.vectors
+            grown.flush()
+            del grown
+            self.vectors = None
+            os.replace(tmp_path, self.path)
+            self.vectors = np.load(self.path, mmap_mode='r+')
+        extra = n_rows - len(self.ids)
+        if extra > 0:
+            self.ids += [None] * extra
+            self.hashes += [None] * extra
+
+    def write(self, batch, vectors):
+        """Store one embedded chunk: vectors first, then the sidecar, so a crash never marks a row done early."""
+        if not self.vectors.flags.writeable:
+            self.vectors = np.load(self.path, mmap_mode='r+')
+        rows = np.array([row for row, _, _, _ in batch])
+        self.vectors[rows] = vectors.astype(self.vectors.dtype, copy=False)
+        self.vectors.flush()
+        for row, news_id, _, digest in batch:
+            self.ids[row], self.hashes[row] = news_id, digest
+            self.rows[news_id] = row
+        self.save_meta()
+
+    def save_meta(self):
+        self.meta.update(ids=self.ids, hashes=self.hashes, rows=len(self.rows))
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+
+def load_vector_index(index_path=VECTOR_INDEX_PATH, store_path=EMBEDDING_STORE_PATH):
+    """IVF index whose vectors are read straight from the memory-mapped store, or None."""
+    from vector_index import IVFIndex
+    if not (os.path.exists(index_path) and os.path.exists(store_path)):
+        return None
+    return IVFIndex.load(index_path, EmbeddingStore(store_path).vectors)
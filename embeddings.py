@@ -0,0 +1,38 @@
+# ====================
+# LOCAL EMBEDDINGS
+# ====================
+
+import numpy as np
+
+from config import EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE
+from metrics import instrumented
+
+
+def load_embedder(model_name=EMBEDDING_MODEL):
+    """Load the local sentence-transformers model (CPU is fine)."""
+    # Imported here so the rest of the app does not pay for torch at startup
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def news_document(record):
+    """Text we embed for one article: title plus the stored preview."""
+    title = record.get('title') or ''
+    preview = record.get('text_preview') or record.get('text') or ''
+    return f"{title}. {preview}".strip()
+
+
+@instrumented("embed")
+def embed_texts(texts, model, batch_size=EMBEDDING_BATCH_SIZE, show_progress=False):
+    """
+    Encode texts in batches into L2-normalised float32 vectors,
+    so that a dot product is the cosine similarity.
+    """
+    vectors = model.encode(
+        list(texts),
+        batch_size=batch_size,
+        show_progress_bar=show_progress,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    return np.ascontiguousarray(vectors, dtype=np.float32)
@@ -0,0 +1,362 @@
+# ====================
+# GRAPH VIEW
+# ====================
+# Queries and rendering behind the Graph View page, without any Streamlit
+# dependency so the app can wrap them in its TTL caches. Node and
+# relationship counts come from Neo4j's count store (a bare
+# `MATCH (n:Label) RETURN count(n)` is answered from metadata, not by a
+# scan), and the pyvis network is rendered to an HTML string in memory.
+
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+from config import GRAPH_FILE
+
+# Single-label / single-type counts are answered from the count store; the
+# FAKE split is an index seek on news_label
+GRAPH_STATS_QUERY = """
+    CALL { MATCH (n:News) RETURN count(n) AS news }
+    CALL { MATCH (n:News {label: 'FAKE'}) RETURN count(n) AS fake }
+    CALL { MATCH (e:Entity) RETURN count(e) AS entities }
+    CALL { MATCH (s:Source) RETURN count(s) AS sources }
+    CALL { MATCH ()-[r:MENTIONS]->() RETURN count(r) AS mentions }
+    CALL { MATCH ()-[r:PUBLISHED_BY]->() RETURN count(r) AS published_by }
+    RETURN news, fake, entities, sources, mentions, published_by
+"""
+
+# `$sample` MENTIONS edges, then up to `$expand` more articles around every
+# sampled entity so the view shows neighbourhoods rather than isolated pairs
+GRAPH_SAMPLE_QUERY = """
+    MATCH (n:News)-[:MENTIONS]->(e:Entity)
+    WITH n, e LIMIT $sample
+    WITH collect({news: n, entity: e}) AS sampled, collect(DISTINCT e) AS seeds
+    CALL {
+        WITH seeds
+        UNWIND seeds AS e
+        CALL {
+            WITH e
+            MATCH (m:News)-[:MENTIONS]->(e)
+            RETURN m LIMIT $expand
+        }
+        RETURN collect({news: m, entity: e}) AS expanded
+    }
+    UNWIND sampled + expanded AS pair
+    WITH DISTINCT pair.news AS n, pair.entity AS e
+    RETURN n.id AS id, n.title AS title, n.label AS label, e.name AS entity, e.type AS type
+"""
+
+
+def graph_stats(driver):
+    """Node / relationship counts from the Neo4j count store."""
+    with driver.session() as session:
+        return session.execute_read(lambda tx: tx.run(GRAPH_STATS_QUERY).single().data())
+
+
+def graph_file_stats(path=GRAPH_FILE):
+    """The same counts from graph_processed.json, for when Neo4j is unavailable."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        graph = json.load(f)
+    relationship_types = Counter(r['type'] for r in graph.get('relationships', []))
+    return {
+        "news": len(graph.get('news', [])),
+        "fake": sum(1 for n in graph.get('news', []) if n.get('label') == 'FAKE'),
+        "entities": len(graph.get('entities', {})),
+        "sources": len(graph.get('sources', {})),
+        "mentions": relationship_types.get('MENTIONS', 0),
+        "published_by": relationship_types.get('PUBLISHED_BY', 0),
+    }
+
+
+def sample_graph(driver, sample=50, expand=0):
+    """[{id, title, label, entity, type}] edges of the sampled neighbourhood."""
+    with driver.session() as session:
+        return session.execute_read(
+            lambda tx: [r.data() for r in tx.run(GRAPH_SAMPLE_QUERY, sample=sample, expand=expand)])
+
+
+def render_graph_html(edges, height='600px'):
+    """pyvis network for sampled edges, returned as an HTML string (nothing is written to disk)."""
+    from pyvis.network import Network
+
+    net = Network(height=height, width='100%', bgcolor='#ffffff', font_color='black', notebook=False)
+    for edge in edges:
+        # News nodes are keyed by id: truncated titles used to merge distinct articles
+        news_title = (edge['title'] or '')[:30] + "..."
+        news_color = '#FF6B6B' if edge['label'] == 'FAKE' else '#4ECDC4'
+        net.add_node(edge['id'], label=news_title, title=edge['title'], color=news_color, size=25, shape='dot')
+        entity_node = f"entity:{edge['entity']}"
+        net.add_node(entity_node, label=edge['entity'], title=f"Type: {edge['type']}",
+                     color='#FFD93D', size=15, shape='diamond')
+        net.add_edge(edge['id'], entity_node)
+
+    net.toggle_physics(True)
+    return net.generate_html(notebook=False)
+
+
+# ====================
+# GRAPH EXPLORER
+# ====================
+# For the full corpus the page draws a degree- or community-based sample
+# at positions computed offline (scripts/build_graph_layout.py), with
+# physics off, so 10k+ nodes stay interactive. Clicking a node adds its
+# highest-degree neighbours, which are shipped with the page; "expand
+# around" requests add a node's neighbourhood server-side.
+
+NODE_NEWS, NODE_ENTITY = 0, 1
+GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+GROUP_COLORS = {"FAKE": '#FF6B6B', "REAL": '#4ECDC4'}
+ENTITY_COLOR = '#FFD93D'
+
+
+def _spiral(n, spacing=1.0):
+    """Vogel spiral: n evenly spread points, the first ones at the centre."""
+    i = np.arange(n)
+    radius = spacing * np.sqrt(i)
+    return np.stack([radius * np.cos(i * GOLDEN_ANGLE), radius * np.sin(i * GOLDEN_ANGLE)], axis=1)
+
+
+def label_propagation(offsets, targets, degree, max_iter=10, seed=42):
+    """
+    Community id per node. Votes are weighted by 1 / degree of the voting
+    neighbour, so hub entities do not pull the whole graph into one community.
+    """
+    n = len(offsets) - 1
+    labels = list(range(n))
+    weights = (1.0 / np.maximum(degree, 1)).tolist()
+    offsets, targets = offsets.tolist(), targets.tolist()
+    rng = np.random.default_rng(seed)
+    for _ in range(max_iter):
+        changed = 0
+        for node in rng.permutation(n).tolist():
+            votes = {}
+            for neighbour in targets[offsets[node]:offsets[node + 1]]:
+                label = labels[neighbour]
+                votes[label] = votes.get(label, 0.0) + weights[neighbour]
+            if votes:
+                best = max(votes, key=lambda label: (votes[label], -label))
+                if best != labels[node]:
+                    labels[node] = best
+                    changed += 1
+        if changed == 0:
+            break
+    # Renumber by community size, largest first
+    _, inverse, counts = np.unique(np.array(labels), return_inverse=True, return_counts=True)
+    rank = np.empty(len(counts), dtype=np.int32)
+    rank[np.argsort(-counts, kind='stable')] = np.arange(len(counts))
+    return rank[inverse]
+
+
+def community_layout(community, degree, spacing=10.0):
+    """Communities on a spiral by size; inside each, hubs in the middle."""
+    positions = np.zeros((len(community), 2), dtype=np.float32)
+    sizes = np.bincount(community)
+    # Each community gets a disc of area ~ its size; centres sit on a spiral
+    # whose radius grows with the area already placed
+    radii = spacing * np.sqrt(sizes)
+    placed = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    angles = np.arange(len(sizes)) * GOLDEN_ANGLE
+    distance = spacing * 1.6 * np.sqrt(placed) + radii
+    distance[0] = 0.0
+    centres = np.stack([distance * np.cos(angles), distance * np.sin(angles)], axis=1)
+
+    order = np.lexsort((-degree, community))  # by community, then degree descending
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    for c in range(len(sizes)):
+        members = order[starts[c]:starts[c + 1]]
+        positions[members] = centres[c] + _spiral(len(members), spacing)
+    return positions
+
+
+def build_layout(graph):
+    """Arrays for GraphLayout from a graph_processed.json dict (News + Entity nodes, MENTIONS edges)."""
+    news = graph.get('news', [])
+    entities = graph.get('entities', {})
+    ids = [n['id'] for n in news] + [f"entity:{name}" for name in entities]
+    names = [(n.get('title') or '')[:40] for n in news] + list(entities)
+    groups = [n.get('label') or 'UNKNOWN' for n in news] + [
+        (info.get('type') if isinstance(info, dict) else None) or 'ENTITY' for info in entities.values()]
+    kinds = np.array([NODE_NEWS] * len(news) + [NODE_ENTITY] * len(entities), dtype=np.uint8)
+
+    position = {node_id: i for i, node_id in enumerate(ids)}
+    pairs = [(position[r['from']], position[f"entity:{r['to']}"])
+             for r in graph.get('relationships', [])
+             if r['type'] == 'MENTIONS' and r['from'] in position and f"entity:{r['to']}" in position]
+    edges = np.array(pairs, dtype=np.int32).reshape(-1, 2)
+
+    # Undirected CSR adjacency
+    src = np.concatenate([edges[:, 0], edges[:, 1]])
+    dst = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.argsort(src, kind='stable')
+    offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(ids)), out=offsets[1:])
+    targets = dst[order].astype(np.int32)
+    degree = np.diff(offsets).astype(np.int32)
+
+    community = label_propagation(offsets, targets, degree)
+    xy = community_layout(community, degree)
+
+    group_names, group_codes = np.unique(np.array(groups, dtype=str), return_inverse=True)
+    return {
+        "ids": np.array(ids, dtype=str), "names": np.array(names, dtype=str), "kinds": kinds,
+        "group_names": group_names, "groups": group_codes.astype(np.int16),
+        "offsets": offsets, "targets": targets, "degree": degree,
+        "community": community.astype(np.int32), "x": xy[:, 0], "y": xy[:, 1],
+    }
+
+
+class GraphLayout:
+    """Precomputed node positions, degrees, communities and CSR adjacency."""
+
+    def __init__(self, arrays):
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.position = {node_id: i for i, node_id in enumerate(self.ids.tolist())}
+        self.n_communities = int(self.community.max()) + 1 if len(self.community) else 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def save(self, path):
+        np.savez(path, **{name: getattr(self, name) for name in (
+            "ids", "names", "kinds", "group_names", "groups", "offsets", "targets",
+            "degree", "community", "x", "y")})
+
+    def neighbours(self, node, k=None):
+        """Neighbours of a node, highest degree first."""
+        found = self.targets[self.offsets[node]:self.offsets[node + 1]]
+        found = found[np.argsort(-self.degree[found], kind='stable')]
+        return found if k is None else found[:k]
+
+    def find(self, text):
+        """Node index for an article id or an entity name (case-insensitive), or None."""
+        text = text.strip()
+        for candidate in (text, f"entity:{text}"):
+            if candidate in self.position:
+                return self.position[candidate]
+        matches = np.flatnonzero(np.char.lower(self.names) == text.lower())
+        return int(matches[np.argmax(self.degree[matches])]) if len(matches) else None
+
+    def sample(self, n_nodes, strategy="degree"):
+        """
+        'degree': the n highest-degree nodes. 'community': the same budget
+        split over communities in proportion to their size (at least one
+        node each, largest communities first), highest degree within each.
+        """
+        n_nodes = min(n_nodes, len(self))
+        if strategy != "community":
+            return np.sort(np.argpartition(-self.degree, n_nodes - 1)[:n_nodes]) if n_nodes else np.empty(0, int)
+
+        sizes = np.bincount(self.community)
+        quota = np.maximum(1, np.floor(sizes / sizes.sum() * n_nodes)).astype(int)
+        order = np.lexsort((-self.degree, self.community))
+        starts = np.concatenate([[0], np.cumsum(sizes)])
+        picked, budget = [], n_nodes
+        for c in range(len(sizes)):
+            if budget <= 0:
+                break
+            take = min(quota[c], budget)
+            picked.append(order[starts[c]:starts[c] + take])
+            budget -= take
+        return np.sort(np.concatenate(picked)) if picked else np.empty(0, int)
+
+    def expand(self, nodes, focus, k=None):
+        """Add the neighbourhood of every focus node to `nodes`."""
+        extra = [np.array([f]) for f in focus] + [self.neighbours(f, k) for f in focus]
+        return np.unique(np.concatenate([np.asarray(nodes)] + extra).astype(np.int64))
+
+    def induced_edges(self, nodes):
+        """(source, target) index pairs of edges with both ends in `nodes`, each edge once."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[nodes] = True
+        counts = np.diff(self.offsets)[nodes]
+        src = np.repeat(nodes, counts)
+        dst = np.concatenate([self.targets[self.offsets[n]:self.offsets[n + 1]] for n in nodes]) \
+            if len(nodes) else np.empty(0, dtype=np.int32)
+        keep = mask[dst] & (src < dst)
+        return src[keep], dst[keep]
+
+
+EXPLORER_TEMPLATE = """<!DOCTYPE html>
+<html><head>
+<script src="https://unpkg.com/vis-network@9.1.9/standalone/umd/vis-network.min.js"></script>
+<style>#graph {{ width: 100%; height: {height}px; border: 1px solid #eee; }}</style>
+</head><body>
+<div id="graph"></div>
+<script>
+const data = {payload};
+const nodeRecord = (i) => {{
+  const news = data.kinds[i] === 0;
+  const group = data.group_names[data.groups[i]];
+  return {{
+    id: i, x: data.x[i], y: data.y[i], label: data.names[i],
+    title: (news ? "Article " : "Entity ") + group + " | degree " + data.degree[i],
+    color: news ? (data.colors[group] || "#999999") : "{entity_color}",
+    shape: news ? "dot" : "diamond",
+    size: 6 + 4 * Math.log2(1 + data.degree[i]),
+  }};
+}};
+const nodes = new vis.DataSet(data.visible.map(nodeRecord));
+const edges = new vis.DataSet(data.src.map((s, k) => ({{ id: s + "-" + data.dst[k], from: s, to: data.dst[k] }})));
+const network = new vis.Network(document.getElementById("graph"), {{ nodes, edges }}, {{
+  physics: false,
+  layout: {{ improvedLayout: false }},
+  edges: {{ smooth: false, color: {{ opacity: 0.35 }} }},
+  nodes: {{ font: {{ size: 10 }} }},
+  interaction: {{ hideEdgesOnDrag: true, hideEdgesOnZoom: true, tooltipDelay: 150 }},
+}});
+// Click: add the node's top neighbours (shipped with the page) and their edges
+network.on("click", (params) => {{
+  if (!params.nodes.length) return;
+  const node = params.nodes[0];
+  for (const other of (data.neighbours[node] || [])) {{
+    if (!nodes.get(other)) nodes.add(nodeRecord(other));
+    const key = Math.min(node, other) + "-" + Math.max(node, other);
+    if (!edges.get(key)) edges.add({{ id: key, from: node, to: other }});
+  }}
+}});
+</script>
+</body></html>
+"""
+
+
+def render_explorer_html(layout, nodes, neighbours=10, height=650):
+    """
+    Self-contained vis-network page for `nodes` at their precomputed
+    positions. Data is sent columnar and indexed by node number; only the
+    rows of visible nodes and of their top neighbours are included.
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    click_lists = {int(n): layout.neighbours(n, neighbours) for n in nodes}
+    shipped = np.unique(np.concatenate([nodes] + list(click_lists.values()))) if len(nodes) else nodes
+    src, dst = layout.induced_edges(nodes)
+
+    # Renumber to positions in `shipped` so every array stays dense
+    local = {int(n): i for i, n in enumerate(shipped.tolist())}
+    payload = {
+        "names": layout.names[shipped].tolist(),
+        "kinds": layout.kinds[shipped].tolist(),
+        "groups": layout.groups[shipped].tolist(),
+        "group_names": layout.group_names.tolist(),
+        "degree": layout.degree[shipped].tolist(),
+        "x": np.round(layout.x[shipped], 1).tolist(),
+        "y": np.round(layout.y[shipped], 1).tolist(),
+        "colors": GROUP_COLORS,
+        "visible": [local[int(n)] for n in nodes],
+        "src": [local[int(n)] for n in src],
+        "dst": [local[int(n)] for n in dst],
+        "neighbours": {local[n]: [local[int(m)] for m in found] for n, found in click_lists.items()},
+    }
+    # "</" inside a title must not close the <script> element
+    return EXPLORER_TEMPLATE.format(payload=json.dumps(payload, separators=(',', ':')).replace('</', '<\\/'),
+                                    height=height, entity_color=ENTITY_COLOR)
@@ -0,0 +1,185 @@
+# ====================
+# INFERENCE BACKENDS
+# ====================
+# The pipeline only needs an object with chat.completions.create(...) that
+# answers like the Groq SDK: .choices[0].message.content and .usage, or with
+# stream=True an iterator of chunks carrying .choices[0].delta.content.
+# LLM_BACKEND picks the implementation:
+#   groq   - Groq cloud (GROQ_API_KEY)
+#   stub   - the Groq SDK pointed at llm_stub_server.py (LLM_STUB_URL):
+#            deterministic answers, configurable latency and injected errors,
+#            over real HTTP, so load tests exercise the client without quota
+#   local  - a small instruction-tuned model on the CPU via transformers
+#            (LOCAL_LLM_MODEL, a hub name or a directory for air-gapped boxes)
+# A new backend is a pair of factories in BACKENDS.
+
+import asyncio
+import hashlib
+import json
+import threading
+from types import SimpleNamespace
+
+from config import (LLM_BACKEND, GROQ_API_KEY, CHAT_MODEL, LLM_STUB_URL, LLM_VERDICT_MAX_TOKENS,
+                    LOCAL_LLM_MODEL, LOCAL_LLM_THREADS)
+
+STUB_API_KEY = "stub"  # the SDK insists on a key; the stub server ignores it
+
+
+def stub_content(prompt, model=CHAT_MODEL, max_tokens=LLM_VERDICT_MAX_TOKENS):
+    """Deterministic JSON verdict for `prompt`: the same prompt always gets the same answer."""
+    digest = hashlib.sha1(prompt.encode('utf-8')).digest()
+    response = {"verdict": "FAKE" if digest[0] % 2 else "REAL", "confidence": 50 + digest[1] % 50,
+                "reasons": [f"Deterministic benchmark stub ({model})."]}
+    if max_tokens > LLM_VERDICT_MAX_TOKENS:
+        response["analysis"] = f"Prompt digest {digest.hex()[:12]}."
+    return json.dumps(response)
+
+
+def usage(prompt_tokens, completion_tokens):
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                           total_tokens=prompt_tokens + completion_tokens)
+
+
+def completion_response(content, token_usage):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=token_usage)
+
+
+def stream_chunks(content, token_usage):
+    """A whole completion as a stream: one content chunk, then an empty one carrying usage."""
+    yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))], usage=None)
+    yield SimpleNamespace(choices=[], usage=token_usage)
+
+
+# ============================================
+# LOCAL MODEL
+# ============================================
+
+class LocalChatClient:
+    """
+    Same interface as groq.Groq, backed by a causal LM from transformers on
+    the CPU. Streams arrive in one piece, after generation. Generation is
+    serialised: torch already uses LOCAL_LLM_THREADS cores for one call.
+    """
+
+    def __init__(self, model_name=LOCAL_LLM_MODEL, threads=LOCAL_LLM_THREADS):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        torch.set_num_threads(threads)
+        self.torch = torch
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+        self.model.eval()
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model=None, messages=(), max_tokens=LLM_VERDICT_MAX_TOKENS, temperature=0.0, stream=False,
+               **kwargs):
+        # `model` names the remote model; response_format has no local equivalent,
+        # the prompt already asks for JSON and parse_analysis tolerates prose
+        inputs = self.tokenizer.apply_chat_template(list(messages), add_generation_prompt=True, return_tensors="pt")
+        sampling = dict(do_sample=True, temperature=temperature) if temperature else dict(do_sample=False)
+        with self.lock, self.torch.inference_mode():
+            output = self.model.generate(inputs, max_new_tokens=max_tokens,
+                                         pad_token_id=self.tokenizer.eos_token_id, **sampling)
+        generated = output[0, inputs.shape[1]:]
+        content = self.tokenizer.decode(generated, skip_special_tokens=True).strip()
+        token_usage = usage(int(inputs.shape[1]), int(generated.shape[0]))
+        if stream:
+            return stream_chunks(content, token_usage)
+        return completion_response(content, token_usage)
+
+
+class AsyncChatAdapter:
+    """The async client interface (groq.AsyncGroq) over a blocking client, one thread per call."""
+
+    def __init__(self, client):
+        self.client = client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, stream=False, **request):
+        response = await asyncio.to_thread(self.client.chat.completions.create, **request)
+        if not stream:
+            return response
+        content = response.choices[0].message.content
+
+        async def chunks():
+            for chunk in stream_chunks(content, getattr(response, 'usage', None)):
+                yield chunk
+        return chunks()
+
+
+_local_client = None
+_local_lock = threading.Lock()
+
+
+def local_client():
+    """One model per process, however many clients ask for it."""
+    global _local_client
+    with _local_lock:
+        if _local_client is None:
+            _local_client = LocalChatClient()
+        return _local_client
+
+
+# ============================================
+# BACKENDS
+# ============================================
+
+def _groq():
+    from groq import Groq
+    return Groq(api_key=GROQ_API_KEY)
+
+
+def _async_groq():
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=GROQ_API_KEY)
+
+
+def _stub():
+    from groq import Groq
+    return Groq(api_key=STUB_API_KEY, base_url=LLM_STUB_URL)
+
+
+def _async_stub():
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=STUB_API_KEY, base_url=LLM_STUB_URL)
+
+
+# name -> (client factory, async client factory)
+BACKENDS = {
+    "groq": (_groq, _async_groq),
+    "stub": (_stub, _async_stub),
+    "local": (local_client, lambda: AsyncChatAdapter(local_client())),
+}
+
+
+def _factories(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[backend]
+
+
+def create_client(backend=LLM_BACKEND):
+    return _factories(backend)[0]()
+
+
+def create_async_client(backend=LLM_BACKEND):
+    return _factories(backend)[1]()
+
+
+def missing_credentials(backend=LLM_BACKEND):
+    """Why `backend` cannot be used as configured, or None."""
+    if backend == "groq" and not GROQ_API_KEY:
+        return "GROQ_API_KEY not found in environment variables."
+    return None
+
+
+def model_name(backend=LLM_BACKEND):
+    """The model that actually answers, so cached answers are not shared between backends."""
+    if backend == "local":
+        return f"local:{LOCAL_LLM_MODEL}"
+    if backend == "groq":
+        return CHAT_MODEL
+    return f"{backend}:{CHAT_MODEL}"
@@ -0,0 +1,155 @@
+# ====================
+# BM25 LEXICAL INDEX
+# ====================
+# In-process inverted index over clean_title + clean_text. Postings are
+# stored CSR-style in flat numpy arrays (term t owns postings
+# offsets[t]:offsets[t + 1]), so a query is a handful of array slices and
+# answers in milliseconds without Neo4j. The index also carries the fields
+# the Detector shows for an article, so it can serve results on its own
+# when the graph is unavailable.
+
+import re
+from collections import Counter
+
+import numpy as np
+
+from config import BM25_K1, BM25_B, RRF_K
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have he her his i in is it its
+    of on or our she that the their they this to was we were will with you
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _pack(strings):
+    """Many strings as one UTF-8 byte array plus offsets (no fixed-width padding)."""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack(blob, offsets, i):
+    return blob[offsets[i]:offsets[i + 1]].tobytes().decode('utf-8')
+
+
+class BM25Index:
+    # Article fields kept for results, named like the Cypher NEWS_FIELDS
+    FIELDS = ['title', 'label', 'subject', 'text']
+
+    def __init__(self, terms, offsets, postings, tfs, doc_lengths, ids, fields, k1=BM25_K1, b=BM25_B):
+        self.terms = terms  # term id -> term
+        self.vocab = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.postings = postings
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.ids = ids
+        self.positions = {news_id: i for i, news_id in enumerate(ids.tolist())}
+        self.fields = fields  # {name: (blob, offsets)}
+        self.k1 = k1
+
+        n_docs = len(ids)
+        doc_freq = np.diff(offsets)
+        self.idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        avg_length = doc_lengths.mean() if n_docs else 1.0
+        # k1 * (1 - b + b * |d| / avgdl), precomputed once per document
+        self.length_norm = (k1 * (1 - b + b * doc_lengths / max(avg_length, 1e-9))).astype(np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids, titles, texts, labels, subjects, preview_chars=200):
+        """Title tokens are counted twice, a cheap field boost over the body."""
+        vocab = {}
+        term_chunks, tf_chunks = [], []
+        doc_lengths = np.zeros(len(ids), dtype=np.int32)
+        for doc, (title, text) in enumerate(zip(titles, texts)):
+            title_tokens = tokenize(title)
+            counts = Counter(title_tokens + title_tokens + tokenize(text))
+            term_chunks.append(np.fromiter((vocab.setdefault(t, len(vocab)) for t in counts),
+                                           dtype=np.int32, count=len(counts)))
+            tf_chunks.append(np.fromiter(counts.values(), dtype=np.int32, count=len(counts)))
+            doc_lengths[doc] = sum(counts.values())
+
+        terms = np.concatenate(term_chunks) if term_chunks else np.empty(0, dtype=np.int32)
+        tfs = np.concatenate(tf_chunks) if tf_chunks else np.empty(0, dtype=np.int32)
+        docs = np.repeat(np.arange(len(ids), dtype=np.int32), [len(c) for c in term_chunks])
+
+        order = np.argsort(terms, kind='stable')  # documents stay ascending within a term
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(vocab)), out=offsets[1:])
+
+        fields = {
+            'title': _pack(titles),
+            'label': _pack(labels),
+            'subject': _pack(subjects),
+            'text': _pack([t[:preview_chars] for t in texts]),
+        }
+        return cls(list(vocab), offsets, docs[order],
+                   np.minimum(tfs[order], np.iinfo(np.uint16).max).astype(np.uint16),
+                   doc_lengths, np.asarray(ids).astype(str), fields)
+
+    def search(self, query_text, k=5):
+        """Return [(id, bm25 score), ...] for the k best matches."""
+        term_ids = {self.vocab[t] for t in tokenize(query_text) if t in self.vocab}
+        if not term_ids:
+            return []
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for t in term_ids:
+            start, end = self.offsets[t], self.offsets[t + 1]
+            docs = self.postings[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            scores[docs] += self.idf[t] * tf * (self.k1 + 1) / (tf + self.length_norm[docs])
+
+        matched = np.count_nonzero(scores)
+        k = min(k, matched)
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(str(self.ids[i]), float(scores[i])) for i in top]
+
+    def article(self, position):
+        record = {"id": str(self.ids[position])}
+        record.update({name: _unpack(*self.fields[name], position) for name in self.FIELDS})
+        return record
+
+    def articles(self, hits):
+        """Result dicts (as returned by the Cypher queries) for [(id, score)] hits; unknown ids are skipped."""
+        return [dict(self.article(self.positions[news_id]), score=score)
+                for news_id, score in hits if news_id in self.positions]
+
+    def save(self, path):
+        packed = dict(self.fields, terms=_pack(self.terms))
+        arrays = {f"{name}_{part}": array
+                  for name, (blob, offsets) in packed.items()
+                  for part, array in (("blob", blob), ("offsets", offsets))}
+        np.savez(path, offsets=self.offsets, postings=self.postings, tfs=self.tfs,
+                 doc_lengths=self.doc_lengths, ids=self.ids, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        fields = {name: (data[f"{name}_blob"], data[f"{name}_offsets"]) for name in cls.FIELDS}
+        terms_blob, terms_offsets = data['terms_blob'].tobytes(), data['terms_offsets'].tolist()
+        terms = [terms_blob[start:end].decode('utf-8') for start, end in zip(terms_offsets, terms_offsets[1:])]
+        return cls(terms, data['offsets'], data['postings'], data['tfs'],
+                   data['doc_lengths'], data['ids'], fields)
+
+
+def reciprocal_rank_fusion(rankings, limit=5, k=RRF_K):
+    """Fuse several [(id, score)] rankings by sum of 1 / (k + rank)."""
+    fused = Counter()
+    for ranking in rankings:
+        for rank, (news_id, _) in enumerate(ranking, start=1):
+            fused[news_id] += 1.0 / (k + rank)
+    return [(news_id, score) for news_id, score in fused.most_common(limit)]
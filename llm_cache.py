@@ -0,0 +1,218 @@
+# ====================
+# LLM RESPONSE CACHE
+# ====================
+# Persistent SQLite cache for Groq analyses. Entries are keyed on the
+# normalised query, the retrieved article ids and the chat model, expire
+# after a TTL and are evicted least-recently-used once the cache grows past
+# its entry or byte limit. Optionally a query whose embedding is close enough
+# to a cached one reuses that verdict (near-duplicate mode). The embeddings
+# for that are read from SQLite once per model and then kept in memory, in
+# step with stores and evictions, so a miss costs one matrix product rather
+# than a table scan. Entries stored by another process sharing the file
+# become near-duplicate candidates once this process reloads (restart).
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from config import (LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_BYTES,
+                    LLM_CACHE_NEAR_DUPLICATES, LLM_CACHE_SIMILARITY_THRESHOLD)
+
+
+class EmbeddingMatrix:
+    """Unit-length embeddings of one model's entries, in a matrix grown by doubling; removal swaps in the last row."""
+
+    def __init__(self, dimension):
+        import numpy as np
+        self.keys = []
+        self.positions = {}
+        self.matrix = np.empty((16, dimension), dtype=np.float32)
+
+    def add(self, key, vector):
+        import numpy as np
+        position = self.positions.get(key)
+        if position is None:
+            position = len(self.keys)
+            if position == len(self.matrix):
+                self.matrix = np.concatenate([self.matrix, np.empty_like(self.matrix)])
+            self.keys.append(key)
+            self.positions[key] = position
+        self.matrix[position] = vector
+
+    def remove(self, key):
+        position = self.positions.pop(key, None)
+        if position is None:
+            return
+        last = len(self.keys) - 1
+        if position != last:
+            moved = self.keys[last]
+            self.matrix[position] = self.matrix[last]
+            self.keys[position] = moved
+            self.positions[moved] = position
+        self.keys.pop()
+
+    def nearest(self, vector):
+        """(key, cosine score) of the closest entry, or None when empty."""
+        if not self.keys:
+            return None
+        scores = self.matrix[:len(self.keys)] @ vector
+        best = int(scores.argmax())
+        return self.keys[best], float(scores[best])
+
+
+def _unit(embedding):
+    import numpy as np
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+class LLMCache:
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL_SECONDS,
+                 max_entries=LLM_CACHE_MAX_ENTRIES, max_bytes=LLM_CACHE_MAX_BYTES,
+                 near_duplicates=LLM_CACHE_NEAR_DUPLICATES,
+                 similarity_threshold=LLM_CACHE_SIMILARITY_THRESHOLD):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.near_duplicates = near_duplicates
+        self.similarity_threshold = similarity_threshold
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0, "evictions": 0}
+        self.embeddings = {}  # (model, dimension) -> EmbeddingMatrix, loaded on first near-duplicate lookup
+
+        # Streamlit serves sessions from several threads
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                embedding BLOB,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self.conn.commit()
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(text.lower().split())
+
+    @classmethod
+    def make_key(cls, query, article_ids, model):
+        payload = json.dumps([cls.normalize(query), sorted(article_ids), model])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, query, article_ids, model, embedding=None):
+        """Return the cached response or None (exact key first, then near-duplicates)."""
+        key = self.make_key(query, article_ids, model)
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            row = self.conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._touch(key, now)
+                self.stats["hits"] += 1
+                return row[0]
+
+            if embedding is not None and self.near_duplicates:
+                match = self._nearest(embedding, model)
+                if match is not None:
+                    self._touch(match[0], now)
+                    self.stats["near_hits"] += 1
+                    return match[1]
+
+            self.stats["misses"] += 1
+            return None
+
+    def store(self, query, article_ids, model, response, embedding=None):
+        # Imported here: the app opens the cache on every page, numpy is only needed for embeddings
+        import numpy as np
+
+        key = self.make_key(query, article_ids, model)
+        blob = None if embedding is None else np.asarray(embedding, dtype=np.float32).tobytes()
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, response, blob, len(response.encode('utf-8')), now, now),
+            )
+            for matrix in self.embeddings.values():
+                matrix.remove(key)  # a replaced entry may have had another embedding
+            if embedding is not None and (model, len(blob) // 4) in self.embeddings:
+                self.embeddings[(model, len(blob) // 4)].add(key, _unit(embedding))
+            self._evict()
+            self.conn.commit()
+
+    def _touch(self, key, now):
+        self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+
+    def _forget(self, keys):
+        for matrix in self.embeddings.values():
+            for key in keys:
+                matrix.remove(key)
+
+    def _expire(self, now):
+        if self.embeddings:
+            self._forget([key for key, in self.conn.execute(
+                "SELECT key FROM responses WHERE created_at < ?", (now - self.ttl,))])
+        cursor = self.conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        if cursor.rowcount:
+            self.stats["evictions"] += cursor.rowcount
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until both limits hold."""
+        count, total_bytes = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        victims = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total_bytes -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._forget([key for key, in victims])
+        self.stats["evictions"] += len(victims)
+
+    def _matrix(self, model, dimension):
+        """The in-memory embeddings of `model`'s entries, read from SQLite the first time."""
+        matrix = self.embeddings.get((model, dimension))
+        if matrix is None:
+            import numpy as np
+            matrix = EmbeddingMatrix(dimension)
+            rows = self.conn.execute(
+                "SELECT key, embedding FROM responses WHERE model = ? AND length(embedding) = ?",
+                (model, dimension * 4),  # vectors written by a different embedding model are skipped
+            )
+            for key, blob in rows:
+                matrix.add(key, _unit(np.frombuffer(blob, dtype=np.float32)))
+            self.embeddings[(model, dimension)] = matrix
+        return matrix
+
+    def _nearest(self, embedding, model):
+        embedding = _unit(embedding)
+        match = self._matrix(model, len(embedding)).nearest(embedding)
+        if match is None or match[1] < self.similarity_threshold:
+            return None
+        row = self.conn.execute("SELECT response FROM responses WHERE key = ?", (match[0],)).fetchone()
+        if row is None:
+            # Removed by another process sharing the file
+            self._forget([match[0]])
+            return None
+        return match[0], row[0]
+
+    def summary(self):
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {**self.stats, "entries": entries}
@@ -0,0 +1,138 @@
+# ====================
+# LOCAL CHAT-COMPLETIONS STUB SERVER
+# ====================
+# Stands in for the Groq API (POST /openai/v1/chat/completions, also served
+# at /v1/chat/completions) so load tests and benchmarks of the whole
+# pipeline run offline and cost no quota. Answers come from
+# inference.stub_content: the same prompt always gets the same verdict.
+#   latency        - seconds before the first token, +/- jitter (a fraction)
+#   token latency  - seconds per generated token, so long answers are slower
+#                    and streams (stream=true, server-sent events) trickle in
+#   error rate     - fraction of requests answered with --error-status (429
+#                    comes with Retry-After), to exercise retries and backoff
+# The random draws are seeded, so a run with the same requests in the same
+# order sees the same latencies and errors. GET /stats reports the counts.
+#
+# Usage:
+#   python llm_stub_server.py [--port 8100] [--latency 0.2] [--token-latency 0.002]
+#                             [--jitter 0.25] [--error-rate 0.05] [--error-status 429]
+#   LLM_BACKEND=stub python scripts/batch_detect.py ...
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from config import *
+from inference import stub_content
+from prompt_context import count_tokens
+
+PIECE_PATTERN = re.compile(r"\S+\s*|\s+")
+ERROR_TYPES = {429: "rate_limit_exceeded", 500: "internal_server_error", 503: "service_unavailable"}
+
+
+def create_app(latency=LLM_STUB_LATENCY_SECONDS, token_latency=LLM_STUB_TOKEN_SECONDS, jitter=0.0,
+               error_rate=LLM_STUB_ERROR_RATE, error_status=429, seed=42):
+    app = FastAPI(title="Chat-completions stub")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "streams": 0, "errors": 0, "completion_tokens": 0}
+
+    def delay():
+        return max(0.0, latency * (1 + jitter * (2 * rng.random() - 1)))
+
+    def error_response():
+        stats["errors"] += 1
+        headers = {"retry-after": "1"} if error_status == 429 else None
+        error = {"message": f"Injected error ({error_status}) from the stub server.",
+                 "type": ERROR_TYPES.get(error_status, "server_error"), "code": error_status}
+        return JSONResponse({"error": error}, status_code=error_status, headers=headers)
+
+    def chunk(completion_id, created, model, delta, finish_reason=None, **extra):
+        body = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "system_fingerprint": None,
+                "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}],
+                **extra}
+        return f"data: {json.dumps(body)}\n\n"
+
+    async def stream_events(completion_id, created, model, content, token_usage, wait):
+        await asyncio.sleep(wait)
+        yield chunk(completion_id, created, model, {"role": "assistant", "content": ""})
+        for piece in PIECE_PATTERN.findall(content):
+            await asyncio.sleep(token_latency * count_tokens(piece))
+            yield chunk(completion_id, created, model, {"content": piece})
+        # Groq reports usage on the last chunk, under x_groq
+        yield chunk(completion_id, created, model, {}, "stop", x_groq={"id": completion_id, "usage": token_usage})
+        yield "data: [DONE]\n\n"
+
+    @app.post("/openai/v1/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        if error_rate and rng.random() < error_rate:
+            await asyncio.sleep(delay())
+            return error_response()
+
+        model = body.get("model", CHAT_MODEL)
+        messages = body.get("messages") or [{"content": ""}]
+        content = stub_content(messages[-1].get("content") or "", model,
+                               body.get("max_tokens", LLM_VERDICT_MAX_TOKENS))
+        prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+        completion_tokens = count_tokens(content)
+        stats["completion_tokens"] += completion_tokens
+        token_usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                       "total_tokens": prompt_tokens + completion_tokens}
+        completion_id, created = f"chatcmpl-{uuid.uuid4().hex}", int(time.time())
+
+        if body.get("stream"):
+            stats["streams"] += 1
+            return StreamingResponse(stream_events(completion_id, created, model, content, token_usage, delay()),
+                                     media_type="text/event-stream")
+
+        await asyncio.sleep(delay() + token_latency * completion_tokens)
+        return {
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "system_fingerprint": None,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "logprobs": None, "finish_reason": "stop"}],
+            "usage": token_usage,
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Deterministic chat-completions server for offline runs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency', type=float, default=LLM_STUB_LATENCY_SECONDS, help='seconds per request')
+    parser.add_argument('--token-latency', type=float, default=LLM_STUB_TOKEN_SECONDS,
+                        help='seconds per generated token')
+    parser.add_argument('--jitter', type=float, default=0.0, help='latency varies by +/- this fraction')
+    parser.add_argument('--error-rate', type=float, default=LLM_STUB_ERROR_RATE,
+                        help='fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=429, help='HTTP status of injected errors')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"[OK] Stub LLM on http://{args.host}:{args.port} (latency {args.latency}s +/- {args.jitter:.0%}, "
+          f"{args.token_latency}s/token, {args.error_rate:.0%} errors as {args.error_status})")
+    uvicorn.run(create_app(args.latency, args.token_latency, args.jitter, args.error_rate, args.error_status,
+                           args.seed),
+                host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# ====================
+# PIPELINE MANIFEST
+# ====================
+# Per-article content hashes recorded by each pipeline stage, so a rerun
+# processes only the articles that are new or changed since the stage last
+# ran and drops the ones that disappeared. Articles get stable ids from
+# their label, title and date (not from their row number), so rows added to
+# or removed from Fake.csv / True.csv do not renumber everything after them.
+# A changed title or date therefore makes a new article and tombstones the
+# old one; a changed text or subject updates the article in place.
+
+import hashlib
+import json
+import os
+import time
+
+from config import PIPELINE_MANIFEST_PATH
+
+SOURCE_COLUMNS = ['title', 'text', 'subject', 'date', 'label']
+SEPARATOR = '\x1f'
+
+
+def content_hash(*values):
+    text = SEPARATOR.join('' if v is None or v != v else str(v) for v in values)  # v != v: NaN
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def article_ids(df, seen=None):
+    """
+    Stable ids (news_<16 hex>) for raw labelled rows. Repeated label/title/date
+    rows get a _1, _2, ... suffix in order; pass the same `seen` dict for every
+    chunk of one corpus so the numbering carries across chunks.
+    """
+    seen = {} if seen is None else seen
+    ids = []
+    for values in zip(df['label'], df['title'], df['date']):
+        base = 'news_' + content_hash(*values)[:16]
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        ids.append(base if n == 0 else f"{base}_{n}")
+    return ids
+
+
+def row_hashes(df, columns=SOURCE_COLUMNS):
+    """Content hash of each raw row over the source columns."""
+    return [content_hash(*values) for values in zip(*(df[c] for c in columns))]
+
+
+class Manifest:
+    """
+    {"stages": {stage: {news_id: hash}}, "tombstones": {news_id: removed at}}
+    in one JSON file, written atomically.
+    """
+
+    def __init__(self, path=PIPELINE_MANIFEST_PATH):
+        self.path = path
+        data = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        self.stages = data.get('stages', {})
+        self.tombstones = data.get('tombstones', {})
+
+    def has(self, stage):
+        return bool(self.stages.get(stage))
+
+    def diff(self, stage, hashes):
+        """(changed, removed): ids of `hashes` that are new or differ from the record, and recorded ids not in `hashes`."""
+        record = self.stages.get(stage, {})
+        changed = [news_id for news_id, digest in hashes.items() if record.get(news_id) != digest]
+        removed = [news_id for news_id in record if news_id not in hashes]
+        return changed, removed
+
+    def commit(self, stage, hashes, removed=()):
+        """Record what the stage has processed; call after its output is written."""
+        record = self.stages.setdefault(stage, {})
+        record.update(hashes)
+        for news_id in removed:
+            record.pop(news_id, None)
+
+    def tombstone(self, removed, restored=()):
+        """Mark articles as removed from the corpus (and un-mark ones that came back)."""
+        now = time.strftime('%Y-%m-%dT%H:%M:%S')
+        for news_id in removed:
+            self.tombstones[news_id] = now
+        for news_id in restored:
+            self.tombstones.pop(news_id, None)
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"stages": self.stages, "tombstones": self.tombstones}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,138 @@
+# ====================
+# PIPELINE METRICS
+# ====================
+# In-process instrumentation for the detection pipeline: per-stage latency
+# samples in a ring buffer (p50/p95/p99 over the last METRICS_WINDOW calls),
+# call and error counts, and counters such as cache hits and Groq token
+# usage. One registry per process, shared by every Streamlit session, and
+# exportable in the Prometheus text exposition format.
+
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import METRICS_WINDOW
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Metrics:
+
+    def __init__(self, window=METRICS_WINDOW, prefix="guardianai"):
+        self.window = window
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.samples = {}   # stage -> deque of seconds
+        self.calls = {}     # stage -> total calls
+        self.errors = {}    # stage -> total failed calls
+        self.totals = {}    # stage -> total seconds
+        self.counters = {}  # name -> value
+
+    def observe(self, stage, seconds, error=False):
+        with self.lock:
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.window)
+            self.samples[stage].append(seconds)
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+            self.errors[stage] = self.errors.get(stage, 0) + int(error)
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def timer(self, stage):
+        """Time a block; an exception is recorded as an error and re-raised."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(stage, time.perf_counter() - start, error=True)
+            raise
+        self.observe(stage, time.perf_counter() - start)
+
+    def record_usage(self, usage):
+        """Token counts from a chat completion's `usage` object (or dict)."""
+        if usage is None:
+            return
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+            if value:
+                self.increment(f"groq_{field}", value)
+
+    def summary(self):
+        """{stage: {calls, errors, mean_ms, p50_ms, p95_ms, p99_ms}} over the ring buffer."""
+        # numpy only when a report is asked for: every page render records a sample
+        import numpy as np
+
+        with self.lock:
+            snapshot = {stage: np.array(samples) for stage, samples in self.samples.items()}
+            calls, errors = dict(self.calls), dict(self.errors)
+        result = {}
+        for stage, samples in sorted(snapshot.items()):
+            p50, p95, p99 = np.percentile(samples, [q * 100 for q in QUANTILES]) * 1000
+            result[stage] = {
+                "calls": calls[stage],
+                "errors": errors[stage],
+                "mean_ms": float(samples.mean() * 1000),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+            }
+        return result
+
+    def counter_values(self):
+        with self.lock:
+            return dict(self.counters)
+
+    def prometheus_text(self, gauges=None):
+        """Prometheus text format: a summary per stage, plus counters and optional gauges."""
+        import numpy as np
+
+        with self.lock:
+            snapshot = {stage: np.array(samples) for stage, samples in self.samples.items()}
+            calls, errors, totals = dict(self.calls), dict(self.errors), dict(self.totals)
+            counters = dict(self.counters)
+
+        name = f"{self.prefix}_stage_latency_seconds"
+        lines = [f"# HELP {name} Pipeline stage latency over the last {self.window} calls.",
+                 f"# TYPE {name} summary"]
+        for stage, samples in sorted(snapshot.items()):
+            for q, value in zip(QUANTILES, np.percentile(samples, [q * 100 for q in QUANTILES])):
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {totals[stage]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {calls[stage]}')
+
+        name = f"{self.prefix}_stage_errors_total"
+        lines += [f"# HELP {name} Failed calls per pipeline stage.", f"# TYPE {name} counter"]
+        lines += [f'{name}{{stage="{stage}"}} {count}' for stage, count in sorted(errors.items())]
+
+        for counter, value in sorted(counters.items()):
+            name = f"{self.prefix}_{counter}_total"
+            lines += [f"# TYPE {name} counter", f"{name} {value}"]
+        for gauge, value in sorted((gauges or {}).items()):
+            name = f"{self.prefix}_{gauge}"
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self.lock:
+            for store in (self.samples, self.calls, self.errors, self.totals, self.counters):
+                store.clear()
+
+
+METRICS = Metrics()
+
+
+def instrumented(stage):
+    """Decorator: time every call of the function under `stage`."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with METRICS.timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
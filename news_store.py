@@ -0,0 +1,183 @@
+# ====================
+# CLEANED NEWS STORAGE
+# ====================
+# The cleaning stage writes cleaned_news.parquet next to the CSV. Parquet is
+# columnar, so readers load only the columns they ask for, and `label` /
+# `subject` are stored dictionary-encoded (pandas categoricals).
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import CLEANED_NEWS_CSV, CLEANED_NEWS_PARQUET, DASHBOARD_AGGREGATES_PATH, NEWS_CLUSTERS_PATH
+
+CATEGORY_COLUMNS = ['label', 'subject']
+
+
+def as_categories(df):
+    """Convert the low-cardinality columns to categorical dtype."""
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and df[column].dtype != 'category':
+            df[column] = df[column].astype('category')
+    return df
+
+
+def write_parquet(df, path=CLEANED_NEWS_PARQUET):
+    as_categories(df.copy()).to_parquet(path, index=False)
+
+
+class ParquetChunkWriter:
+    """Append DataFrame chunks to one Parquet file (one row group per chunk)."""
+
+    def __init__(self, path=CLEANED_NEWS_PARQUET):
+        self.path = path
+        self.writer = None
+        self.schema = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        chunk = as_categories(chunk.copy())
+        if self.writer is None:
+            # Every chunk has different categories, so fix the schema from the
+            # first one and drop the pandas metadata that records them
+            self.schema = pa.Table.from_pandas(chunk, preserve_index=False).schema.remove_metadata()
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def news_columns(parquet_path=CLEANED_NEWS_PARQUET, csv_path=CLEANED_NEWS_CSV):
+    """Column names of the file read_news would read, without loading any rows."""
+    if os.path.exists(parquet_path):
+        import pyarrow.parquet as pq
+        return pq.read_schema(parquet_path).names
+    if os.path.exists(csv_path):
+        return list(pd.read_csv(csv_path, nrows=0).columns)
+    raise FileNotFoundError(f"{parquet_path} / {csv_path} not found. Run the cleaning stage first.")
+
+
+def read_news(columns=None, parquet_path=CLEANED_NEWS_PARQUET, csv_path=CLEANED_NEWS_CSV, canonical_only=False):
+    """
+    Load the cleaned dataset, only the requested columns.
+    Prefers the memory-mapped Parquet file and falls back to the CSV.
+    With canonical_only, near-duplicates found by scripts/deduplicate.py are
+    dropped (one article per cluster); without a cluster file nothing is.
+    """
+    if canonical_only and columns is not None and 'id' not in columns:
+        df = read_news(['id'] + list(columns), parquet_path, csv_path, canonical_only)
+        return df.drop(columns='id')
+
+    if os.path.exists(parquet_path):
+        df = pd.read_parquet(parquet_path, columns=columns, memory_map=True)
+    elif os.path.exists(csv_path):
+        df = pd.read_csv(csv_path, usecols=columns)
+    else:
+        raise FileNotFoundError(f"{parquet_path} / {csv_path} not found. Run the cleaning stage first.")
+
+    if canonical_only:
+        clusters = read_clusters()
+        if clusters is not None:
+            duplicates = clusters.loc[~clusters['is_canonical'], 'id']
+            df = df[~df['id'].isin(duplicates)].reset_index(drop=True)
+    return as_categories(df)
+
+
+def read_clusters(path=NEWS_CLUSTERS_PATH):
+    """Near-duplicate clusters (id, cluster_id, cluster_size, is_canonical), or None if not built."""
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path)
+
+
+# ====================
+# DASHBOARD AGGREGATES
+# ====================
+
+class DashboardAggregates:
+    """
+    Counts, length histograms and word-count statistics for the Dashboard,
+    accumulated chunk by chunk so the streaming pipeline can build them in
+    the same pass that writes the data.
+    """
+
+    COLUMNS = ['label', 'subject', 'clean_text']
+    LENGTH_BIN_EDGES = np.linspace(0, 20000, 51)  # same 20k-char window as data_analysis.py
+
+    def __init__(self):
+        self.total = 0
+        self.subject_label_counts = {}
+        self.length_counts = {}
+        self.word_sums = {}
+
+    def update(self, df):
+        self.total += len(df)
+
+        grouped = df.groupby(['subject', 'label'], observed=True).size()
+        for (subject, label), count in grouped.items():
+            by_label = self.subject_label_counts.setdefault(str(subject), {})
+            by_label[str(label)] = by_label.get(str(label), 0) + int(count)
+
+        text = df['clean_text'].fillna('').astype(str)
+        # Longer articles land in the last bin instead of being dropped
+        lengths = np.clip(text.str.len().to_numpy(), 0, self.LENGTH_BIN_EDGES[-1])
+        words = text.str.split().str.len().to_numpy(dtype=float)
+        labels = df['label'].astype(str).to_numpy()
+
+        for label in np.unique(labels):
+            mask = labels == label
+            hist, _ = np.histogram(lengths[mask], bins=self.LENGTH_BIN_EDGES)
+            self.length_counts[label] = self.length_counts.get(label, 0) + hist
+
+            sums = self.word_sums.setdefault(label, {"count": 0, "sum": 0.0, "sumsq": 0.0,
+                                                     "min": np.inf, "max": -np.inf})
+            label_words = words[mask]
+            sums["count"] += len(label_words)
+            sums["sum"] += float(label_words.sum())
+            sums["sumsq"] += float((label_words ** 2).sum())
+            sums["min"] = min(sums["min"], float(label_words.min()))
+            sums["max"] = max(sums["max"], float(label_words.max()))
+
+    def result(self):
+        label_counts, subject_counts = {}, {}
+        for subject, by_label in self.subject_label_counts.items():
+            subject_counts[subject] = sum(by_label.values())
+            for label, count in by_label.items():
+                label_counts[label] = label_counts.get(label, 0) + count
+
+        word_count_stats = {}
+        for label, sums in self.word_sums.items():
+            n = sums["count"]
+            mean = sums["sum"] / n
+            # Sample standard deviation, as in DataFrame.describe()
+            variance = (sums["sumsq"] - n * mean ** 2) / (n - 1) if n > 1 else 0.0
+            word_count_stats[label] = {"mean": mean, "std": float(np.sqrt(max(variance, 0.0))),
+                                       "min": sums["min"], "max": sums["max"]}
+
+        return {
+            "total": self.total,
+            "label_counts": label_counts,
+            "subject_counts": dict(sorted(subject_counts.items(), key=lambda item: -item[1])),
+            "subject_label_counts": self.subject_label_counts,
+            "length_histogram": {
+                "bin_edges": self.LENGTH_BIN_EDGES.tolist(),
+                "counts": {label: counts.tolist() for label, counts in self.length_counts.items()},
+            },
+            "word_count_stats": word_count_stats,
+        }
+
+
+def save_aggregates(aggregates, path=DASHBOARD_AGGREGATES_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(aggregates, f, indent=2)
+
+
+def load_aggregates(path=DASHBOARD_AGGREGATES_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,69 @@
+# ====================
+# PRE-SCREEN CLASSIFIER
+# ====================
+# TF-IDF + logistic regression trained on the cleaned dataset labels
+# (scripts/train_prescreen.py). It scores a query in about a millisecond;
+# only queries whose P(fake) falls inside the uncertainty band
+# [PRESCREEN_LOW, PRESCREEN_HIGH] are escalated to the LLM.
+
+import numpy as np
+
+from config import PRESCREEN_MODEL_PATH, PRESCREEN_LOW, PRESCREEN_HIGH
+from verdict import format_verdict
+
+
+def build_pipeline(max_features=200000, C=4.0):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline([
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), min_df=2, max_features=max_features,
+                                  sublinear_tf=True, dtype=np.float32)),
+        ("model", LogisticRegression(C=C, max_iter=1000)),
+    ])
+
+
+def prescreen_document(title, text=""):
+    """What the classifier sees: title and body, as for a pasted article."""
+    return f"{title} {text}".strip()
+
+
+class Prescreen:
+
+    def __init__(self, pipeline, low=PRESCREEN_LOW, high=PRESCREEN_HIGH):
+        self.pipeline = pipeline
+        self.low = low
+        self.high = high
+        self.fake_column = list(pipeline.classes_).index("FAKE")
+
+    @classmethod
+    def load(cls, path=PRESCREEN_MODEL_PATH, **kwargs):
+        import joblib
+        return cls(joblib.load(path), **kwargs)
+
+    def save(self, path=PRESCREEN_MODEL_PATH):
+        import joblib
+        joblib.dump(self.pipeline, path)
+
+    def scores(self, texts):
+        """P(fake) for each text."""
+        return self.pipeline.predict_proba(list(texts))[:, self.fake_column]
+
+    def score(self, text):
+        return float(self.scores([text])[0])
+
+    def decide(self, score):
+        """'FAKE' / 'REAL' when the score is outside the band, else None (ask the LLM)."""
+        if score >= self.high:
+            return "FAKE"
+        if score <= self.low:
+            return "REAL"
+        return None
+
+
+def prescreen_analysis(score, verdict):
+    """Analysis for a pre-screened query, in the LLM's structured output format."""
+    confidence = score if verdict == "FAKE" else 1 - score
+    return format_verdict(verdict, round(confidence * 100), [
+        f"Decided by the local TF-IDF pre-screen classifier (P(fake) = {score:.3f}); the LLM was not called."])
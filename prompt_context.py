@@ -0,0 +1,171 @@
+# ====================
+# PROMPT CONTEXT BUILDER
+# ====================
+# Assembles the analysis prompt from the retrieved evidence under a token
+# budget (PROMPT_TOKEN_BUDGET). The template is dedented, so no tokens go to
+# indentation. Articles are ranked by relevance and added until the budget
+# runs out, each truncated to PROMPT_ARTICLE_TOKENS, and repeated entities
+# are merged. Tokens are counted with tiktoken when it is installed
+# (PROMPT_TOKENIZER, close to the Llama 3 tokenizer); otherwise an estimate
+# from word pieces is used, which errs on the high side.
+
+import re
+import textwrap
+from functools import lru_cache
+
+from config import (PROMPT_TOKEN_BUDGET, PROMPT_ARTICLE_TOKENS, PROMPT_QUERY_TOKENS, PROMPT_MAX_ENTITIES,
+                    PROMPT_TOKENIZER, ANALYSIS_MODE)
+from verdict import VERDICT_ONLY, FULL_ANALYSIS
+
+PROMPT_TEMPLATE = textwrap.dedent("""\
+    FAKE NEWS ANALYSIS TASK
+
+    USER QUERY: "{query}"
+
+    SIMILAR PAST ARTICLES (most relevant first):
+    {articles}
+
+    RELATED ENTITIES:
+    {entities}
+
+    INSTRUCTIONS:
+    Decide whether the user's query/news is likely FAKE or REAL, based on the
+    similar articles and entities. If entities are frequently associated with
+    fake news, say so in the reasons.
+
+    {output_format}""")
+
+# Verdict first, so a streamed response can be acted on before it ends
+OUTPUT_FORMATS = {
+    VERDICT_ONLY: textwrap.dedent("""\
+        Reply with one JSON object and nothing else:
+        {"verdict": "FAKE" or "REAL", "confidence": 0-100, "reasons": [at most 3 short reasons]}"""),
+    FULL_ANALYSIS: textwrap.dedent("""\
+        Reply with one JSON object and nothing else:
+        {"verdict": "FAKE" or "REAL", "confidence": 0-100, "reasons": [specific reasons],
+         "analysis": "detailed analysis"}"""),
+}
+
+WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+MIN_ARTICLE_TOKENS = 8  # below this an article is left out rather than cut to a stub
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(PROMPT_TOKENIZER)
+    except Exception:  # not installed, or the encoding file cannot be fetched
+        return None
+
+
+def count_tokens(text):
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Roughly one token per short word or punctuation mark, more for long words
+    return sum(1 + (len(piece) - 1) // 5 for piece in WORD_PATTERN.findall(text))
+
+
+def truncate_tokens(text, max_tokens):
+    """The start of `text` within max_tokens (with "..." appended when cut)."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens - 1]).rstrip() + "..."
+
+    used = 0
+    for match in WORD_PATTERN.finditer(text):
+        used += 1 + (len(match.group()) - 1) // 5
+        if used > max_tokens - 1:
+            return text[:match.start()].rstrip() + "..."
+    return text
+
+
+def rank_articles(query, articles):
+    """
+    Most relevant first: by retrieval score when every article has one,
+    otherwise (keyword scan) by how many query words the article contains.
+    Articles with a title seen before are dropped.
+    """
+    if articles and all(a.get('score') is not None for a in articles):
+        ranked = sorted(articles, key=lambda a: -a['score'])
+    else:
+        words = set(WORD_PATTERN.findall(query.lower()))
+        ranked = sorted(articles, key=lambda a: -len(
+            words.intersection(WORD_PATTERN.findall(f"{a.get('title') or ''} {a.get('text') or ''}".lower()))))
+
+    seen, unique = set(), []
+    for article in ranked:
+        title = ' '.join((article.get('title') or '').lower().split())
+        if title and title in seen:
+            continue
+        seen.add(title)
+        unique.append(article)
+    return unique
+
+
+def merge_entities(entities, limit=PROMPT_MAX_ENTITIES):
+    """Entities whose names differ only in case or spacing merged (highest count kept), busiest first."""
+    merged = {}
+    for entity in entities:
+        key = ' '.join(str(entity['entity']).lower().split())
+        if key not in merged or entity['mention_count'] > merged[key]['mention_count']:
+            merged[key] = entity
+    return sorted(merged.values(), key=lambda e: -e['mention_count'])[:limit]
+
+
+def build_context(query, similar_articles, entities, mode=ANALYSIS_MODE, budget=PROMPT_TOKEN_BUDGET,
+                  article_tokens=PROMPT_ARTICLE_TOKENS, template=PROMPT_TEMPLATE):
+    """
+    {"prompt", "prompt_tokens", "articles", "entities", "truncated"}: the
+    filled template, its token count, how many articles and entities made it
+    in, and whether any evidence was cut or left out for the budget. `mode`
+    (verdict.VERDICT_ONLY or FULL_ANALYSIS) selects the requested output.
+    """
+    template = template.replace("{output_format}", OUTPUT_FORMATS[mode].replace("{", "{{").replace("}", "}}"))
+    query = truncate_tokens(query, PROMPT_QUERY_TOKENS)
+    remaining = budget - count_tokens(template.format(query=query, articles="", entities=""))
+    truncated = False
+
+    # Entity lines are short and informative: they are placed first, but get
+    # at most a quarter of what is left
+    entity_lines, entity_budget = [], remaining // 4
+    candidates = merge_entities(entities)
+    for entity in candidates:
+        line = f"- {entity['entity']} ({entity['type']}): mentioned in {entity['mention_count']} articles"
+        cost = count_tokens(line) + 1
+        if cost > entity_budget:
+            break
+        entity_lines.append(line)
+        entity_budget -= cost
+        remaining -= cost
+    truncated |= len(entity_lines) < len(candidates) or len(candidates) < len(entities)
+
+    article_lines = []
+    ranked = rank_articles(query, similar_articles)
+    for article in ranked:
+        header = f"Article {len(article_lines) + 1}: {article['title']} (Label: {article['label']})"
+        header_cost = count_tokens(header) + 2
+        text_budget = min(article_tokens, remaining - header_cost)
+        if text_budget < MIN_ARTICLE_TOKENS:
+            break
+        text = truncate_tokens(article.get('text') or '', text_budget)
+        truncated |= text != (article.get('text') or '')
+        article_lines.append(f"{header}\n{text}")
+        remaining -= header_cost + count_tokens(text)
+    truncated |= len(article_lines) < len(similar_articles)
+
+    prompt = template.format(query=query, articles="\n".join(article_lines) or "(none found)",
+                             entities="\n".join(entity_lines) or "(none found)")
+    return {
+        "prompt": prompt,
+        "prompt_tokens": count_tokens(prompt),
+        "articles": len(article_lines),
+        "entities": len(entity_lines),
+        "truncated": truncated,
+    }
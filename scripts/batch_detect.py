@@ -0,0 +1,120 @@
+# ====================
+# BATCH DETECTION
+# ====================
+# Scores a CSV/JSONL file of headlines through the RAG pipeline and streams
+# the results to a .jsonl or .csv file as they complete.
+#
+# Usage:
+#   python scripts/batch_detect.py headlines.csv --output results.jsonl
+#   python scripts/batch_detect.py headlines.jsonl --column text --workers 8 --rpm 60
+
+import argparse
+import os
+import sys
+import time
+
+from tqdm import tqdm
+
+sys.path.append('.')
+from config import *
+import detector
+from embedding_store import load_vector_index
+from llm_cache import LLMCache
+from verdict import FULL_ANALYSIS, VERDICT_ONLY
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch fake news detection')
+    parser.add_argument('input', help='CSV or JSONL file with one headline per row')
+    parser.add_argument('--output', help='results file (.jsonl or .csv)')
+    parser.add_argument('--column', help='column/field holding the text')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=BATCH_LLM_WORKERS)
+    parser.add_argument('--rpm', type=int, default=BATCH_LLM_REQUESTS_PER_MINUTE,
+                        help='max LLM requests per minute')
+    parser.add_argument('--retries', type=int, default=BATCH_MAX_RETRIES)
+    parser.add_argument('--no-cache', action='store_true', help='do not read or write the LLM cache')
+    parser.add_argument('--no-prescreen', action='store_true', help='send every headline to the LLM')
+    parser.add_argument('--full-analysis', action='store_true',
+                        help='ask for a detailed analysis, not only the verdict and reasons (slower)')
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.splitext(args.input)[0] + '_results.jsonl'
+
+    print("--- BATCH DETECTION ---")
+    print("=" * 50)
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        queries = detector.load_batch_queries(f.read(), args.input, args.column)
+    print(f"[OK] Loaded {len(queries):,} headlines from {args.input}")
+    if not queries:
+        return
+
+    try:
+        driver = detector.create_driver()
+    except Exception as e:
+        driver = None
+        print(f"[ERROR] Neo4j unavailable: {e}")
+    client = detector.create_llm_client()
+    cache = None if args.no_cache else LLMCache()
+
+    index = load_vector_index()
+    embedder = None
+    if index is not None:
+        from embeddings import load_embedder
+        embedder = load_embedder()
+        print(f"[OK] Vector index loaded ({len(index):,} articles)")
+    lexical = None
+    if os.path.exists(LEXICAL_INDEX_PATH):
+        from lexical_index import BM25Index
+        lexical = BM25Index.load(LEXICAL_INDEX_PATH)
+        print(f"[OK] BM25 index loaded ({len(lexical):,} articles)")
+    if driver is None:
+        if lexical is not None:
+            print("[INFO] Continuing without Neo4j: evidence from the BM25 index only, no entities")
+        else:
+            print("[WARN] Continuing without Neo4j or a BM25 index: the LLM gets no evidence")
+    elif index is None and lexical is None:
+        print("[INFO] No vector or BM25 index found, using keyword retrieval")
+
+    prescreen = None
+    if PRESCREEN_ENABLED and not args.no_prescreen and os.path.exists(PRESCREEN_MODEL_PATH):
+        from prescreen import Prescreen
+        prescreen = Prescreen.load()
+        print(f"[OK] Pre-screen loaded (LLM only for P(fake) in [{prescreen.low}, {prescreen.high}])")
+
+    start = time.perf_counter()
+    verdicts, errors, prescreened = {}, 0, 0
+    try:
+        # Every result is flushed as it is written, so an error mid-batch keeps what finished
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = detector.ResultWriter(f, output_path)
+            results = detector.detect_batch(
+                queries, driver, client, index=index, embedder=embedder, cache=cache,
+                lexical=lexical, prescreen=prescreen, batch_size=args.batch_size, workers=args.workers,
+                requests_per_minute=args.rpm, max_retries=args.retries,
+                mode=FULL_ANALYSIS if args.full_analysis else VERDICT_ONLY)
+            for result in tqdm(results, total=len(queries), unit='headline'):
+                writer.write(result)
+                verdicts[result['verdict']] = verdicts.get(result['verdict'], 0) + 1
+                errors += result['error'] is not None
+                prescreened += prescreen is not None and prescreen.decide(result['prescreen_score']) is not None
+    finally:
+        if driver is not None:
+            driver.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n[OK] Saved results to: {output_path}")
+    print(f"[OK] {len(queries):,} headlines in {elapsed:.1f}s ({len(queries) / elapsed:.1f}/s)")
+    for verdict, count in verdicts.items():
+        print(f"  {verdict}: {count:,}")
+    if errors:
+        print(f"[WARN] {errors} headlines failed after {args.retries} retries")
+    if prescreen is not None:
+        print(f"[INFO] Pre-screen decided {prescreened:,} headlines without an LLM call")
+    if cache is not None:
+        print(f"[INFO] Cache: {cache.summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# ====================
+# MODULE 2: EMBEDDING PRECOMPUTE
+# ====================
+# Embeds every article in data/graph_processed.json with the local
+# sentence-transformers model into the memory-mapped embedding store.
+# Work is committed chunk by chunk, so an interrupted run resumes where it
+# stopped, and articles whose text hash is unchanged are never re-embedded.
+#
+# Usage:
+#   python scripts/build_embeddings.py [--chunk-size 4096] [--full]
+
+import argparse
+import json
+import sys
+import time
+
+from tqdm import tqdm
+
+sys.path.append('.')
+from config import *
+from embeddings import load_embedder, embed_texts, news_document
+from embedding_store import EmbeddingStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute article embeddings')
+    parser.add_argument('--graph-file', default=GRAPH_FILE)
+    parser.add_argument('--chunk-size', type=int, default=EMBEDDING_CHUNK_SIZE)
+    parser.add_argument('--full', action='store_true', help='drop the store and embed everything again')
+    args = parser.parse_args()
+
+    print("--- PRECOMPUTING EMBEDDINGS ---")
+    print("=" * 50)
+
+    with open(args.graph_file, 'r', encoding='utf-8') as f:
+        news = json.load(f)['news']
+    documents = {n['id']: news_document(n) for n in news}
+    print(f"[OK] {len(documents):,} articles in {args.graph_file}")
+
+    model = load_embedder()
+    dimension = model.get_sentence_embedding_dimension()
+    if dimension != EMBEDDING_DIMENSION:
+        print(f"[ERROR] {EMBEDDING_MODEL} produces {dimension}-d vectors but EMBEDDING_DIMENSION "
+              f"is {EMBEDDING_DIMENSION}. Set EMBEDDING_DIMENSION={dimension} in .env")
+        sys.exit(1)
+
+    store = EmbeddingStore()
+    if args.full or not store.compatible(EMBEDDING_MODEL, dimension):
+        print(f"> Starting a new store ({EMBEDDING_MODEL}, {dimension}-d {EMBEDDING_DTYPE})")
+        store.reset(EMBEDDING_MODEL, dimension)
+
+    pending = store.plan(documents)
+    store.save_meta()  # persists tombstones for removed articles
+    print(f"[OK] {len(documents) - len(pending):,} unchanged, {len(pending):,} to embed")
+    if not pending:
+        print("[OK] Embedding store already up to date")
+        return
+
+    store.reserve(max(row for row, _, _, _ in pending) + 1)
+
+    start = time.perf_counter()
+    with tqdm(total=len(pending), unit='doc') as progress:
+        for offset in range(0, len(pending), args.chunk_size):
+            batch = pending[offset:offset + args.chunk_size]
+            store.write(batch, embed_texts([text for _, _, text, _ in batch], model))
+            progress.update(len(batch))
+    elapsed = time.perf_counter() - start
+
+    print(f"[OK] Embedded {len(pending):,} articles in {elapsed:.1f}s "
+          f"({len(pending) / max(elapsed, 1e-9):,.0f} docs/sec)")
+    print(f"[OK] Store: {len(store):,} vectors, {store.vectors.nbytes / 1e6:.1f} MB at {store.path}")
+
+    print("\n" + "=" * 50)
+    print("SUCCESS: EMBEDDINGS READY! Next: python scripts/build_vector_index.py")
+
+
+if __name__ == '__main__':
+    main()
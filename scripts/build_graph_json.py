@@ -0,0 +1,97 @@
+# ====================
+# MODULE 3: GRAPH FILE
+# ====================
+# Turns a cleaned dataset into data/graph_processed.json
+# (news / entities / sources / relationships) for load_graph.py.
+# When scripts/deduplicate.py has run, only the canonical article of each
+# near-duplicate cluster becomes a News node, with the number of copies it
+# stands for in `duplicates`; embeddings and NER follow the graph, so they
+# skip the copies too.
+#
+# Usage:
+#   python scripts/build_graph_json.py                              # full corpus
+#   python scripts/build_graph_json.py data/sample_news.csv         # 1000-row sample
+
+import json
+import os
+import sys
+
+sys.path.append('.')
+from config import GRAPH_FILE, CLEANED_NEWS_CSV, CLEANED_NEWS_PARQUET
+from news_store import news_columns, read_clusters, read_news
+
+# The cleaned dataset by default (Parquet when the cleaning stage wrote it), or the given CSV/Parquet file
+if len(sys.argv) > 1:
+    input_path = sys.argv[1]
+    parquet_path = input_path if input_path.endswith('.parquet') else os.path.splitext(input_path)[0] + '.parquet'
+    sources = dict(parquet_path=parquet_path, csv_path=input_path)
+else:
+    input_path = CLEANED_NEWS_PARQUET if os.path.exists(CLEANED_NEWS_PARQUET) else CLEANED_NEWS_CSV
+    sources = dict(parquet_path=CLEANED_NEWS_PARQUET, csv_path=CLEANED_NEWS_CSV)
+
+print("--- BUILDING GRAPH FILE ---")
+print("=" * 50)
+
+print(f"> Loading {input_path}...")
+try:
+    available = news_columns(**sources)
+    # Only what the graph needs; `id` and `clean_date` are written by the newer cleaning stage
+    columns = ['clean_title', 'clean_text', 'label', 'subject']
+    columns += [c for c in ('id', 'clean_date' if 'clean_date' in available else 'date') if c in available]
+    df = read_news(columns, **sources)
+    print(f"[OK] Loaded {len(df)} articles ({', '.join(columns)})")
+except FileNotFoundError:
+    print("[ERROR] Run data_cleaning.py first!")
+    exit()
+
+# Stable ids: use the id column when the cleaning stage wrote one
+if 'id' not in df.columns:
+    df['id'] = 'news_' + df.index.astype(str)
+
+clusters = read_clusters()
+if clusters is not None:
+    df = df.merge(clusters[['id', 'cluster_size', 'is_canonical']], on='id', how='left')
+    # Articles missing from the cluster file (built from another dataset) are kept
+    df['cluster_size'] = df['cluster_size'].fillna(1).astype(int)
+    df['is_canonical'] = df['is_canonical'].fillna(True).astype(bool)
+    dropped = int((~df['is_canonical']).sum())
+    df = df[df['is_canonical']].reset_index(drop=True)
+    print(f"[OK] Dropped {dropped} near-duplicates, {len(df)} canonical articles left")
+else:
+    df['cluster_size'] = 1
+
+df['clean_title'] = df['clean_title'].fillna('')
+df['clean_text'] = df['clean_text'].fillna('')
+# read_news returns label/subject as categoricals: back to plain values for JSON and value counts
+df['label'] = df['label'].astype(object)
+df['subject'] = df['subject'].astype(object).fillna('Unknown')
+date_column = 'clean_date' if 'clean_date' in df.columns else 'date'
+
+news = [
+    {
+        "id": row.id,
+        "title": row.clean_title,
+        "label": row.label,
+        "subject": row.subject,
+        "date": getattr(row, date_column),
+        "text_preview": row.clean_text[:200],
+        "duplicates": int(row.cluster_size) - 1,
+    }
+    for row in df.itertuples(index=False)
+]
+
+graph = {
+    "news": news,
+    "entities": {},
+    "sources": {k: int(v) for k, v in df['subject'].value_counts(sort=False).items()},
+    "relationships": [
+        {"from": n['id'], "to": n['subject'], "type": "PUBLISHED_BY"} for n in news
+    ],
+}
+
+with open(GRAPH_FILE, 'w', encoding='utf-8') as f:
+    json.dump(graph, f, indent=2)
+
+print(f"[OK] {len(news)} news, {len(graph['sources'])} sources, "
+      f"{len(graph['relationships'])} relationships")
+print(f"[OK] Saved to: {GRAPH_FILE}")
@@ -0,0 +1,43 @@
+# ====================
+# MODULE 5: GRAPH EXPLORER LAYOUT
+# ====================
+# Precomputes what the Graph View explorer needs to draw the full corpus:
+# CSR adjacency, degrees, label-propagation communities and fixed node
+# positions (communities on a spiral, hubs at their centres).
+#
+# Usage:
+#   python scripts/build_graph_layout.py
+
+import json
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('.')
+from config import GRAPH_FILE, GRAPH_LAYOUT_PATH
+from graph_view import GraphLayout, build_layout
+
+print("--- BUILDING GRAPH LAYOUT ---")
+print("=" * 50)
+
+print(f"> Reading {GRAPH_FILE}...")
+try:
+    with open(GRAPH_FILE, 'r', encoding='utf-8') as f:
+        graph = json.load(f)
+except FileNotFoundError:
+    print(f"[ERROR] {GRAPH_FILE} not found!")
+    exit()
+
+start = time.perf_counter()
+layout = GraphLayout(build_layout(graph))
+print(f"[OK] {len(layout):,} nodes, {len(layout.targets) // 2:,} edges, "
+      f"{layout.n_communities:,} communities in {time.perf_counter() - start:.1f}s")
+sizes = np.bincount(layout.community)
+print(f"[OK] Largest communities: {', '.join(f'{s:,}' for s in sizes[:5])}")
+
+layout.save(GRAPH_LAYOUT_PATH)
+print(f"[OK] Saved to: {GRAPH_LAYOUT_PATH}")
+
+print("\n" + "=" * 50)
+print("SUCCESS: GRAPH LAYOUT READY!")
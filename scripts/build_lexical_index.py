@@ -0,0 +1,63 @@
+# ====================
+# MODULE 2: LEXICAL INDEX
+# ====================
+# Builds the BM25 inverted index over clean_title + clean_text of the
+# cleaned dataset (canonical articles only once deduplicate.py has run, so
+# a syndicated story does not fill every result slot). The Detector uses it when Neo4j or the vector index is
+# unavailable, and for hybrid (reciprocal rank fusion) retrieval.
+#
+# Usage:
+#   python scripts/build_lexical_index.py [--queries 200]
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('.')
+from config import *
+from news_store import read_news
+from lexical_index import BM25Index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the BM25 lexical index')
+    parser.add_argument('--queries', type=int, default=200, help='headlines to time after building')
+    args = parser.parse_args()
+
+    print("--- BUILDING LEXICAL INDEX ---")
+    print("=" * 50)
+
+    df = read_news(['id', 'clean_title', 'clean_text', 'label', 'subject'], canonical_only=True)
+    titles = df['clean_title'].fillna('').astype(str).tolist()
+    print(f"[OK] Loaded {len(df):,} articles")
+
+    start = time.perf_counter()
+    index = BM25Index.build(df['id'].astype(str).tolist(), titles,
+                            df['clean_text'].fillna('').astype(str).tolist(),
+                            df['label'].astype(str).tolist(), df['subject'].astype(str).tolist())
+    print(f"[OK] {len(index.terms):,} terms, {len(index.postings):,} postings "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    index.save(LEXICAL_INDEX_PATH)
+    print(f"[OK] Saved to: {LEXICAL_INDEX_PATH}")
+
+    # Quick latency check with real headlines as queries
+    rng = np.random.default_rng(42)
+    picked = rng.choice(len(titles), min(args.queries, len(titles)), replace=False)
+    latencies = []
+    for i in picked:
+        query_start = time.perf_counter()
+        index.search(titles[i], k=5)
+        latencies.append((time.perf_counter() - query_start) * 1000)
+    if latencies:
+        print(f"[OK] BM25 top-5: p50 {np.percentile(latencies, 50):.2f} ms, "
+              f"p95 {np.percentile(latencies, 95):.2f} ms")
+
+    print("\n" + "=" * 50)
+    print("SUCCESS: LEXICAL INDEX READY!")
+
+
+if __name__ == '__main__':
+    main()
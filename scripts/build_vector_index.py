@@ -0,0 +1,36 @@
+# ====================
+# MODULE 2: VECTOR INDEX
+# ====================
+
+import sys
+import time
+
+sys.path.append('.')
+from config import EMBEDDING_STORE_PATH, VECTOR_INDEX_PATH
+from embedding_store import EmbeddingStore
+from vector_index import IVFIndex
+
+print("--- BUILDING VECTOR INDEX ---")
+print("=" * 50)
+
+# 1. Open the precomputed embeddings (memory-mapped, nothing is copied)
+print("> Opening embedding store...")
+store = EmbeddingStore()
+if store.vectors is None or not len(store):
+    print(f"[ERROR] {EMBEDDING_STORE_PATH} not found! Run build_embeddings.py first.")
+    exit()
+rows, ids = store.live_rows()
+print(f"[OK] {len(rows)} vectors of dimension {store.dimension} ({store.model})")
+
+# 2. Build the IVF index over the stored rows
+print("\n> Building IVF index...")
+start = time.perf_counter()
+index = IVFIndex.build(store.vectors, ids, rows=rows)
+print(f"[OK] {index.n_lists} lists built in {time.perf_counter() - start:.1f}s")
+
+# 3. Save to disk (centroids and row numbers only; vectors stay in the store)
+index.save(VECTOR_INDEX_PATH)
+print(f"[OK] Saved to: {VECTOR_INDEX_PATH}")
+
+print("\n" + "=" * 50)
+print("SUCCESS: VECTOR INDEX READY!")
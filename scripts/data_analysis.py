@@ -2,15 +2,19 @@
 # DATA ANALYSIS VISUALIZATION
 # ====================
 
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.append('.')
+from news_store import read_news
+
 # Set style for pretty graphs
 plt.style.use('seaborn-v0_8-darkgrid')
 
-# Load cleaned data
-df = pd.read_csv('data/cleaned_news.csv')
+# Load cleaned data (only the columns used below)
+df = read_news(['label', 'subject', 'clean_title', 'clean_text'])
 
 print("--- DATA ANALYSIS DASHBOARD ---")
 print("=" * 50)
@@ -4,54 +4,28 @@
 
 import pandas as pd
 import re  # Regular expressions for text cleaning
-import numpy as np
-from datetime import datetime
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
-print("--- STARTING DATA CLEANING PROCESS ---")
-print("=" * 50)
+sys.path.append('.')
+from config import CLEAN_WORKERS, CLEAN_CHUNK_SIZE, CLEANED_NEWS_PARQUET, DASHBOARD_AGGREGATES_PATH
+from news_store import write_parquet, DashboardAggregates, save_aggregates
+from manifest import article_ids
 
-# 1. Load our combined data
-print("> Loading combined data...")
-try:
-    df = pd.read_csv('data/all_news.csv')
-    print(f"[OK] Loaded {len(df)} articles")
-except:
-    print("[ERROR] Run data_preparation.py first!")
-    exit()
+# Patterns are compiled once instead of on every row
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+')
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s.,!?]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
 
-# 2. Let's see what we're working with
-print("\n> INITIAL DATA INSPECTION:")
-print(f"Data shape: {df.shape}")  # (rows, columns)
-print(f"\nColumns: {list(df.columns)}")
-print(f"\nMissing values per column:")
-print(df.isnull().sum())
+# Common date patterns in the dataset
+DATE_FORMATS = [
+    '%Y-%m-%d',  # 2020-01-15
+    '%d-%m-%Y',  # 15-01-2020
+    '%m/%d/%Y',  # 01/15/2020
+    '%B %d, %Y', # January 15, 2020
+    '%b %d, %Y', # Jan 15, 2020
+]
 
-# 3. Check data types
-print("[INFO] Data types:")
-print(df.dtypes)
-
-# 4. Handle missing values
-print("\n> HANDLING MISSING VALUES...")
-
-# Count missing values before cleaning
-missing_before = df.isnull().sum().sum()
-print(f"Total missing values before: {missing_before}")
-
-# Fill missing text with empty string
-df['text'] = df['text'].fillna('')
-df['title'] = df['title'].fillna('')
-
-# For subject, fill with 'Unknown'
-df['subject'] = df['subject'].fillna('Unknown')
-
-# For date, we'll handle specially
-df['date'] = df['date'].fillna('Unknown')
-
-missing_after = df.isnull().sum().sum()
-print(f"Total missing values after: {missing_after}")
-
-# 5. TEXT CLEANING FUNCTION
-print("\n> CLEANING TEXT DATA...")
 
 def clean_text(text):
     """
@@ -63,103 +37,161 @@ def clean_text(text):
     """
     if not isinstance(text, str):
         return ""
-    
-    # Convert to lowercase
+
     text = text.lower()
-    
-    # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-    
-    # Remove special characters but keep letters, numbers, and basic punctuation
-    text = re.sub(r'[^\w\s.,!?]', ' ', text)
-    
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
-
-# Apply cleaning to title and text columns
-print("Cleaning titles...")
-df['clean_title'] = df['title'].apply(clean_text)
-
-print("Cleaning article text...")
-df['clean_text'] = df['text'].apply(clean_text)
-
-# 6. DATE CLEANING
-print("\n> CLEANING DATE COLUMN...")
-
-def clean_date(date_str):
+    text = URL_PATTERN.sub('', text)
+    text = SPECIAL_CHARS_PATTERN.sub(' ', text)
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def _as_text(series):
+    """Non-string values (NaN, numbers) become empty strings, like clean_text."""
+    return series.where(series.map(lambda value: isinstance(value, str)), '')
+
+
+def clean_text_series(series):
+    """Same result as clean_text, applied to a whole column with .str operations"""
+    return (
+        _as_text(series).str.lower()
+        .str.replace(URL_PATTERN, '', regex=True)
+        .str.replace(SPECIAL_CHARS_PATTERN, ' ', regex=True)
+        .str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+        .str.strip()
+    )
+
+
+def clean_date_series(series):
     """
-    Try to parse various date formats
+    Parse a date column with one vectorised pd.to_datetime call per format.
+    Rows that match no format become 'Unknown'.
     """
-    if not isinstance(date_str, str) or date_str == 'Unknown':
-        return 'Unknown'
-    
-    # Remove any HTML tags or weird characters
-    date_str = str(date_str).split()[0]  # Take first part only
-    
-    # Common date patterns in the dataset
-    patterns = [
-        '%Y-%m-%d',  # 2020-01-15
-        '%d-%m-%Y',  # 15-01-2020
-        '%m/%d/%Y',  # 01/15/2020
-        '%B %d, %Y', # January 15, 2020
-        '%b %d, %Y', # Jan 15, 2020
-    ]
-    
-    for pattern in patterns:
-        try:
-            return datetime.strptime(date_str, pattern).strftime('%Y-%m-%d')
-        except:
-            continue
-    
-    return 'Unknown'
-
-df['clean_date'] = df['date'].apply(clean_date)
-
-# 7. Check cleaning results
-print("\n[OK] CLEANING COMPLETED!")
-print("\n[INFO] SAMPLE RESULTS:")
-
-print("\nBefore cleaning (title):")
-print(df['title'].iloc[0][:100] + "...")
-
-print("\nAfter cleaning (clean_title):")
-print(df['clean_title'].iloc[0][:100] + "...")
-
-print("\n" + "=" * 50)
-print("\n> STATISTICS AFTER CLEANING:")
-
-# Count empty articles after cleaning
-empty_articles = df[df['clean_text'].str.len() < 50].shape[0]
-print(f"Articles with very short text (<50 chars): {empty_articles}")
-
-# Average article length
-df['text_length'] = df['clean_text'].str.len()
-print(f"\nAverage article length: {df['text_length'].mean():.0f} characters")
-print(f"Shortest article: {df['text_length'].min()} characters")
-print(f"Longest article: {df['text_length'].max()} characters")
-
-# Distribution by label
-print(f"\n[INFO] DISTRIBUTION BY LABEL:")
-print(df['label'].value_counts())
-
-# 8. Save cleaned data
-print("\n> SAVING CLEANED DATA...")
-df.to_csv('data/cleaned_news.csv', index=False)
-print("[OK] Saved to: data/cleaned_news.csv")
-
-# 9. Save a smaller sample for testing (optional)
-print("\n> Creating sample dataset for testing...")
-sample_df = df.sample(n=1000, random_state=42)  # Random 1000 articles
-sample_df.to_csv('data/sample_news.csv', index=False)
-print("[OK] Saved sample to: data/sample_news.csv")
-
-print("\n" + "=" * 50)
-print("SUCCESS: DATA CLEANING COMPLETED SUCCESSFULLY!")
-print("\nNext steps:")
-print("1. [OK] Data loaded and combined")
-print("2. [OK] Missing values handled")
-print("3. [OK] Text cleaned and standardized")
-print("4. [OK] Dates formatted")
-print("5. [OK] Saved cleaned dataset")
+    text = _as_text(series).str.strip()
+    parsed = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+
+    for pattern in DATE_FORMATS:
+        missing = parsed.isna() & (text != '')
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(text[missing], format=pattern, errors='coerce')
+
+    return parsed.dt.strftime('%Y-%m-%d').fillna('Unknown')
+
+
+def clean_frame(df):
+    """Fill missing values and add clean_title, clean_text and clean_date."""
+    df = df.copy()
+    df['text'] = df['text'].fillna('')
+    df['title'] = df['title'].fillna('')
+    df['subject'] = df['subject'].fillna('Unknown')
+    df['date'] = df['date'].fillna('Unknown')
+
+    df['clean_title'] = clean_text_series(df['title'])
+    df['clean_text'] = clean_text_series(df['text'])
+    df['clean_date'] = clean_date_series(df['date'])
+    return df
+
+
+def clean_frame_parallel(df, workers=CLEAN_WORKERS, chunk_size=CLEAN_CHUNK_SIZE):
+    """Run clean_frame over chunks of the frame in a process pool."""
+    if workers <= 1 or len(df) <= chunk_size:
+        return clean_frame(df)
+
+    chunks = [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return pd.concat(pool.map(clean_frame, chunks))
+
+
+def main():
+    print("--- STARTING DATA CLEANING PROCESS ---")
+    print("=" * 50)
+
+    # 1. Load our combined data
+    print("> Loading combined data...")
+    try:
+        df = pd.read_csv('data/all_news.csv')
+        df.insert(0, 'id', article_ids(df))  # stable ids for the graph stages
+        print(f"[OK] Loaded {len(df)} articles")
+    except FileNotFoundError:
+        print("[ERROR] Run data_preparation.py first!")
+        return
+
+    # 2. Let's see what we're working with
+    print("\n> INITIAL DATA INSPECTION:")
+    print(f"Data shape: {df.shape}")  # (rows, columns)
+    print(f"\nColumns: {list(df.columns)}")
+    print(f"\nMissing values per column:")
+    print(df.isnull().sum())
+
+    # 3. Check data types
+    print("[INFO] Data types:")
+    print(df.dtypes)
+
+    # 4. Handle missing values (filled inside clean_frame)
+    print("\n> HANDLING MISSING VALUES...")
+    missing_before = df.isnull().sum().sum()
+    print(f"Total missing values before: {missing_before}")
+
+    # 5 & 6. Clean text and dates in parallel chunks
+    print(f"\n> CLEANING TEXT AND DATES ({CLEAN_WORKERS} workers)...")
+    df = clean_frame_parallel(df)
+
+    missing_after = df.isnull().sum().sum()
+    print(f"Total missing values after: {missing_after}")
+
+    # 7. Check cleaning results
+    print("\n[OK] CLEANING COMPLETED!")
+    print("\n[INFO] SAMPLE RESULTS:")
+
+    print("\nBefore cleaning (title):")
+    print(df['title'].iloc[0][:100] + "...")
+
+    print("\nAfter cleaning (clean_title):")
+    print(df['clean_title'].iloc[0][:100] + "...")
+
+    print("\n" + "=" * 50)
+    print("\n> STATISTICS AFTER CLEANING:")
+
+    # Count empty articles after cleaning
+    empty_articles = df[df['clean_text'].str.len() < 50].shape[0]
+    print(f"Articles with very short text (<50 chars): {empty_articles}")
+
+    # Average article length
+    df['text_length'] = df['clean_text'].str.len()
+    print(f"\nAverage article length: {df['text_length'].mean():.0f} characters")
+    print(f"Shortest article: {df['text_length'].min()} characters")
+    print(f"Longest article: {df['text_length'].max()} characters")
+
+    # Distribution by label
+    print(f"\n[INFO] DISTRIBUTION BY LABEL:")
+    print(df['label'].value_counts())
+
+    # 8. Save cleaned data
+    print("\n> SAVING CLEANED DATA...")
+    df.to_csv('data/cleaned_news.csv', index=False)
+    print("[OK] Saved to: data/cleaned_news.csv")
+    write_parquet(df)
+    print(f"[OK] Saved columnar copy to: {CLEANED_NEWS_PARQUET}")
+
+    aggregates = DashboardAggregates()
+    aggregates.update(df)
+    save_aggregates(aggregates.result())
+    print(f"[OK] Saved dashboard aggregates to: {DASHBOARD_AGGREGATES_PATH}")
+
+    # 9. Save a smaller sample for testing (optional)
+    print("\n> Creating sample dataset for testing...")
+    sample_df = df.sample(n=1000, random_state=42)  # Random 1000 articles
+    sample_df.to_csv('data/sample_news.csv', index=False)
+    print("[OK] Saved sample to: data/sample_news.csv")
+
+    print("\n" + "=" * 50)
+    print("SUCCESS: DATA CLEANING COMPLETED SUCCESSFULLY!")
+    print("\nNext steps:")
+    print("1. [OK] Data loaded and combined")
+    print("2. [OK] Missing values handled")
+    print("3. [OK] Text cleaned and standardized")
+    print("4. [OK] Dates formatted")
+    print("5. [OK] Saved cleaned dataset")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# ====================
+# MODULE 2.2: NEAR-DUPLICATE CLUSTERING
+# ====================
+# Clusters near-duplicate and syndicated articles (MinHash + LSH over
+# clean_text, see dedup.py) and writes data/news_clusters.csv with one row
+# per article: id, cluster_id, cluster_size, is_canonical. The canonical
+# article of a cluster is its longest one. Downstream stages keep only
+# canonical articles: build_graph_json.py (and through the graph, the
+# embeddings and NER), build_lexical_index.py and train_prescreen.py.
+# Articles with different labels are never put in the same cluster.
+#
+# Usage:
+#   python scripts/deduplicate.py [--threshold 0.8] [--bands 16]
+
+import argparse
+import json
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append('.')
+from config import *
+from news_store import read_news
+from dedup import deduplicate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate articles')
+    parser.add_argument('--shingle-size', type=int, default=DEDUP_SHINGLE_SIZE)
+    parser.add_argument('--num-perm', type=int, default=DEDUP_NUM_PERM)
+    parser.add_argument('--bands', type=int, default=DEDUP_BANDS)
+    parser.add_argument('--threshold', type=float, default=DEDUP_THRESHOLD)
+    args = parser.parse_args()
+    if args.num_perm % args.bands:
+        parser.error('--num-perm must be a multiple of --bands')
+
+    print("--- CLUSTERING NEAR-DUPLICATES ---")
+    print("=" * 50)
+
+    df = read_news(['id', 'clean_title', 'label', 'clean_text'])
+    texts = df['clean_text'].fillna('').astype(str).tolist()
+    print(f"[OK] Loaded {len(df):,} articles")
+
+    start = time.perf_counter()
+    cluster_id, cluster_size, canonical = deduplicate(
+        texts, groups=df['label'].astype(str).to_numpy(), shingle_size=args.shingle_size,
+        num_perm=args.num_perm, bands=args.bands, threshold=args.threshold)
+    elapsed = time.perf_counter() - start
+    print(f"[OK] Clustered in {elapsed:.1f}s ({len(df) / max(elapsed, 1e-9):,.0f} docs/sec)")
+
+    clusters = pd.DataFrame({"id": df['id'], "cluster_id": cluster_id,
+                             "cluster_size": cluster_size, "is_canonical": canonical})
+    clusters.to_csv(NEWS_CLUSTERS_PATH, index=False)
+    print(f"[OK] Saved to: {NEWS_CLUSTERS_PATH}")
+
+    duplicated = clusters[clusters['cluster_size'] > 1]
+    largest = duplicated[duplicated['is_canonical']].nlargest(10, 'cluster_size')
+    report = {
+        "articles": int(len(df)),
+        "clusters": int(canonical.sum()),
+        "duplicates_removed": int(len(df) - canonical.sum()),
+        "clusters_with_duplicates": int(duplicated['cluster_id'].nunique()),
+        "duplicates_by_label": {str(label): int(count) for label, count in
+                                df.loc[~canonical, 'label'].astype(str).value_counts().items()},
+        "settings": {"shingle_size": args.shingle_size, "num_perm": args.num_perm,
+                     "bands": args.bands, "threshold": args.threshold},
+        "elapsed_seconds": elapsed,
+        "largest_clusters": [
+            {"cluster_id": int(row.cluster_id), "size": int(row.cluster_size),
+             "title": str(df['clean_title'].iloc[index])}
+            for index, row in zip(largest.index, largest.itertuples(index=False))
+        ],
+    }
+    with open(DEDUP_REPORT_PATH, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"[OK] {report['clusters']:,} clusters, {report['duplicates_removed']:,} near-duplicates "
+          f"({report['duplicates_removed'] / max(len(df), 1):.1%}) in "
+          f"{report['clusters_with_duplicates']:,} clusters")
+    for cluster in report['largest_clusters'][:5]:
+        print(f"   {cluster['size']:>5} x {cluster['title'][:70]}")
+    print(f"[OK] Report: {DEDUP_REPORT_PATH}")
+
+    print("\n" + "=" * 50)
+    print("SUCCESS: CLUSTERS READY!")
+
+
+if __name__ == '__main__':
+    main()
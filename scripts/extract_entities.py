@@ -0,0 +1,218 @@
+# ====================
+# MODULE 2.5: ENTITY EXTRACTION
+# ====================
+# Runs spaCy NER over the articles with nlp.pipe (batched, multi-process,
+# only the components NER needs) and writes the entities plus MENTIONS
+# relationships (with per-article counts) into data/graph_processed.json.
+# Each article's entities are kept in data/ner_mentions.json and its text
+# hash in the pipeline manifest, so a rerun tags only new or changed
+# articles and rebuilds the entity graph from the cached ones.
+#
+# Usage:
+#   python scripts/extract_entities.py [--processes 8] [--batch-size 128] [--limit 1000] [--full]
+#
+# Needs the spaCy model once: python -m spacy download en_core_web_sm
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+
+from tqdm import tqdm
+
+sys.path.append('.')
+from config import *
+from news_store import read_news
+from manifest import Manifest, content_hash
+
+# Everything except the entity recognizer is switched off
+UNUSED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+POSSESSIVE_PATTERN = re.compile(r"['’]s$")
+
+
+def load_ner_pipeline(model=SPACY_MODEL):
+    import spacy
+    nlp = spacy.load(model, disable=UNUSED_COMPONENTS)
+    # In the small English model NER has its own tok2vec; the shared one
+    # only feeds the tagger/parser, so skip it unless NER listens to it
+    if 'tok2vec' in nlp.pipe_names and 'ner' not in nlp.get_pipe('tok2vec').listening_components:
+        nlp.disable_pipe('tok2vec')
+    return nlp
+
+
+def normalize_entity(text):
+    """Return (key, surface form); key is used to merge spelling variants."""
+    surface = WHITESPACE_PATTERN.sub(' ', text).strip(" .,;:'\"()[]")
+    surface = POSSESSIVE_PATTERN.sub('', surface)
+    if surface.lower().startswith('the '):
+        surface = surface[4:]
+    return surface.lower(), surface
+
+
+def tag_articles(nlp, records, batch_size=NER_BATCH_SIZE, processes=NER_PROCESSES,
+                 max_chars=NER_MAX_CHARS, entity_types=NER_ENTITY_TYPES, progress=True):
+    """
+    records: iterable of (news_id, text).
+    Yields (news_id, Counter((key, surface, label))) per article.
+    """
+    allowed = set(entity_types)
+    docs = nlp.pipe(((text[:max_chars], news_id) for news_id, text in records),
+                    as_tuples=True, batch_size=batch_size, n_process=processes)
+    for doc, news_id in tqdm(docs, unit='doc', disable=not progress):
+        counts = Counter()
+        for ent in doc.ents:
+            if ent.label_ not in allowed:
+                continue
+            key, surface = normalize_entity(ent.text)
+            if len(key) < 2:
+                continue
+            counts[(key, surface, ent.label_)] += 1
+        yield news_id, counts
+
+
+def aggregate_mentions(tagged):
+    """
+    tagged: iterable of (news_id, Counter((key, surface, label))).
+    Returns {news_id: Counter(key)}, {key: Counter(surface)}, {key: Counter(label)}.
+    """
+    mentions = {}
+    surfaces = defaultdict(Counter)
+    types = defaultdict(Counter)
+    for news_id, tagged_counts in tagged:
+        counts = Counter()
+        for (key, surface, label), count in tagged_counts.items():
+            counts[key] += count
+            surfaces[key][surface] += count
+            types[key][label] += count
+        mentions[news_id] = counts
+    return mentions, surfaces, types
+
+
+def extract_mentions(nlp, records, batch_size=NER_BATCH_SIZE, processes=NER_PROCESSES,
+                     max_chars=NER_MAX_CHARS, entity_types=NER_ENTITY_TYPES, progress=True):
+    """
+    records: iterable of (news_id, text).
+    Returns {news_id: Counter(key)}, {key: Counter(surface)}, {key: Counter(label)}.
+    """
+    return aggregate_mentions(tag_articles(nlp, records, batch_size, processes, max_chars, entity_types, progress))
+
+
+def ner_hash(text):
+    """What an article's entities depend on: its text and the NER settings."""
+    return content_hash(SPACY_MODEL, NER_MAX_CHARS, ','.join(NER_ENTITY_TYPES), text)
+
+
+def load_ner_cache(path=NER_CACHE_PATH):
+    """{news_id: Counter((key, surface, label))} from earlier runs."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        cached = json.load(f)
+    return {news_id: Counter({(key, surface, label): count for key, surface, label, count in rows})
+            for news_id, rows in cached.items()}
+
+
+def save_ner_cache(cache, path=NER_CACHE_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({news_id: [[*entity, count] for entity, count in counts.items()]
+                   for news_id, counts in cache.items()}, f)
+    os.replace(tmp_path, path)
+
+
+def build_entity_graph(mentions, surfaces, types, min_articles=NER_MIN_ARTICLES):
+    """Entities map and MENTIONS relationships in the graph_processed.json format."""
+    article_counts = Counter()
+    for counts in mentions.values():
+        article_counts.update(counts.keys())
+
+    names = {}
+    entities = {}
+    for key, n_articles in article_counts.items():
+        if n_articles < min_articles:
+            continue
+        # Display the most common spelling, typed by the most common label
+        name = surfaces[key].most_common(1)[0][0]
+        names[key] = name
+        entities[name] = {"type": types[key].most_common(1)[0][0], "count": n_articles}
+
+    relationships = [
+        {"from": news_id, "to": names[key], "type": "MENTIONS", "count": count}
+        for news_id, counts in mentions.items()
+        for key, count in counts.items()
+        if key in names
+    ]
+    return entities, relationships
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract entities with spaCy')
+    parser.add_argument('--processes', type=int, default=NER_PROCESSES)
+    parser.add_argument('--batch-size', type=int, default=NER_BATCH_SIZE)
+    parser.add_argument('--limit', type=int, help='only process the first N articles')
+    parser.add_argument('--full', action='store_true', help='ignore cached entities and tag every article again')
+    args = parser.parse_args()
+
+    print("--- EXTRACTING ENTITIES ---")
+    print("=" * 50)
+
+    with open(GRAPH_FILE, 'r', encoding='utf-8') as f:
+        graph = json.load(f)
+    graph_ids = {n['id'] for n in graph['news']}
+
+    # NER runs on the original text: clean_text is lowercased, and spaCy's
+    # recognizer relies heavily on capitalisation
+    df = read_news(['id', 'text'])
+    df = df[df['id'].isin(graph_ids)]
+    if args.limit:
+        df = df.head(args.limit)
+    records = list(zip(df['id'], df['text'].fillna('').astype(str)))
+
+    manifest = Manifest()
+    cache = {} if args.full else load_ner_cache()
+    hashes = {news_id: ner_hash(text) for news_id, text in records}
+    changed, _ = manifest.diff('ner', hashes)
+    changed = set(changed)
+    pending = [(news_id, text) for news_id, text in records if news_id in changed or news_id not in cache]
+    removed = [news_id for news_id in set(cache) | set(manifest.stages.get('ner', {})) if news_id not in graph_ids]
+    print(f"[OK] {len(records):,} articles (graph has {len(graph_ids):,}): {len(pending):,} to tag, "
+          f"{len(records) - len(pending):,} cached, {len(removed):,} removed")
+
+    if pending:
+        nlp = load_ner_pipeline()
+        print(f"[OK] Loaded {SPACY_MODEL} with components: {nlp.pipe_names}")
+
+        start = time.perf_counter()
+        cache.update(tag_articles(nlp, pending, args.batch_size, args.processes))
+        elapsed = time.perf_counter() - start
+        print(f"[OK] Tagged {len(pending):,} articles in {elapsed:.1f}s "
+              f"({len(pending) / max(elapsed, 1e-9):,.0f} docs/sec, {args.processes} processes)")
+
+    for news_id in removed:
+        cache.pop(news_id, None)
+    save_ner_cache(cache)
+    manifest.commit('ner', {news_id: hashes[news_id] for news_id, _ in pending}, removed)
+    manifest.save()
+
+    mentions, surfaces, types = aggregate_mentions((news_id, cache[news_id]) for news_id, _ in records)
+    entities, relationships = build_entity_graph(mentions, surfaces, types)
+    graph['entities'] = entities
+    graph['relationships'] = [r for r in graph['relationships'] if r['type'] != 'MENTIONS'] + relationships
+    with open(GRAPH_FILE, 'w', encoding='utf-8') as f:
+        json.dump(graph, f, indent=2)
+
+    print(f"[OK] {len(entities):,} entities (in >= {NER_MIN_ARTICLES} articles), "
+          f"{len(relationships):,} MENTIONS relationships")
+    print(f"[OK] Saved to: {GRAPH_FILE}")
+
+    print("\n" + "=" * 50)
+    print("SUCCESS: ENTITIES EXTRACTED! Next: python scripts/load_graph.py")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+# ====================
+# MODULE 4: NEO4J GRAPH LOADER
+# ====================
+# Loads data/graph_processed.json into Neo4j with batched UNWIND
+# transactions. Every record's content hash is checkpointed after its batch
+# commits, so an interrupted load resumes where it stopped and a rerun only
+# upserts records that are new or changed. Per batch only its own records
+# are appended to a log next to the checkpoint; the log is folded into the
+# checkpoint file once, when the load ends. Records in the checkpoint that
+# are no longer in the graph file (removed articles, entities that fell
+# below NER_MIN_ARTICLES, dropped mentions) are deleted from Neo4j.
+#
+# Usage:
+#   python scripts/load_graph.py [--batch-size 2000] [--full]
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+sys.path.append('.')
+from config import *
+
+SCHEMA = [
+    "CREATE CONSTRAINT news_id IF NOT EXISTS FOR (n:News) REQUIRE n.id IS UNIQUE",
+    "CREATE CONSTRAINT entity_name IF NOT EXISTS FOR (e:Entity) REQUIRE e.name IS UNIQUE",
+    "CREATE CONSTRAINT source_name IF NOT EXISTS FOR (s:Source) REQUIRE s.name IS UNIQUE",
+    "CREATE INDEX news_label IF NOT EXISTS FOR (n:News) ON (n.label)",
+]
+
+UPSERT_QUERIES = {
+    "sources": """
+        UNWIND $rows AS row
+        MERGE (s:Source {name: row.name})
+        SET s.article_count = row.count
+    """,
+    "entities": """
+        UNWIND $rows AS row
+        MERGE (e:Entity {name: row.name})
+        SET e.type = row.type, e.mention_count = row.count
+    """,
+    "news": """
+        UNWIND $rows AS row
+        MERGE (n:News {id: row.id})
+        SET n.title = row.title, n.label = row.label, n.subject = row.subject,
+            n.date = row.date, n.text_preview = row.text_preview, n.duplicates = row.duplicates
+    """,
+    "PUBLISHED_BY": """
+        UNWIND $rows AS row
+        MATCH (n:News {id: row.from})
+        MATCH (s:Source {name: row.to})
+        MERGE (n)-[:PUBLISHED_BY]->(s)
+    """,
+    "MENTIONS": """
+        UNWIND $rows AS row
+        MATCH (n:News {id: row.from})
+        MATCH (e:Entity {name: row.to})
+        MERGE (n)-[r:MENTIONS]->(e)
+        SET r.count = row.count
+    """,
+}
+
+
+# Relationships first, so nodes are deleted after the edges that point at them
+DELETE_QUERIES = {
+    "MENTIONS": """
+        UNWIND $rows AS row
+        MATCH (:News {id: row.from})-[r:MENTIONS]->(:Entity {name: row.to})
+        DELETE r
+    """,
+    "PUBLISHED_BY": """
+        UNWIND $rows AS row
+        MATCH (:News {id: row.from})-[r:PUBLISHED_BY]->(:Source {name: row.to})
+        DELETE r
+    """,
+    "news": """
+        UNWIND $rows AS row
+        MATCH (n:News {id: row.key})
+        DETACH DELETE n
+    """,
+    "entities": """
+        UNWIND $rows AS row
+        MATCH (e:Entity {name: row.key})
+        DETACH DELETE e
+    """,
+    "sources": """
+        UNWIND $rows AS row
+        MATCH (s:Source {name: row.key})
+        DETACH DELETE s
+    """,
+}
+
+
+def record_hash(record):
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def graph_sections(graph):
+    """Yield (section, key, row) in load order: nodes before relationships."""
+    for name, count in graph.get('sources', {}).items():
+        yield "sources", name, {"name": name, "count": count}
+    for name, info in graph.get('entities', {}).items():
+        info = info if isinstance(info, dict) else {"count": info}
+        yield "entities", name, {"name": name, "type": info.get('type'), "count": info.get('count')}
+    for news in graph.get('news', []):
+        yield "news", news['id'], news
+    for rel in graph.get('relationships', []):
+        key = f"{rel['type']}:{rel['from']}->{rel['to']}"
+        yield rel['type'], key, {"from": rel['from'], "to": rel['to'], "count": rel.get('count')}
+
+
+def load_checkpoint(path):
+    """The checkpoint file plus every batch logged after it was last written."""
+    checkpoint = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    if os.path.exists(path + '.log'):
+        with open(path + '.log', 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    section, key, digest = json.loads(line)
+                except ValueError:
+                    break  # cut short by a crash mid-write: that batch is redone
+                if digest is None:
+                    checkpoint.get(section, {}).pop(key, None)
+                else:
+                    checkpoint.setdefault(section, {})[key] = digest
+    return checkpoint
+
+
+def log_checkpoint(log, section, entries):
+    """Append [(key, digest or None for deleted)] of one committed batch."""
+    log.write(''.join(json.dumps([section, key, digest]) + '\n' for key, digest in entries))
+    log.flush()
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)  # atomic, so a crash never leaves half a file
+    if os.path.exists(path + '.log'):
+        os.remove(path + '.log')  # now folded into the file
+
+
+def pending_batches(graph, checkpoint, batch_size):
+    """Group new/changed rows into batches of one section each."""
+    batch, batch_section = [], None
+    for section, key, row in graph_sections(graph):
+        digest = record_hash(row)
+        if checkpoint.get(section, {}).get(key) == digest:
+            continue
+        if batch and (section != batch_section or len(batch) == batch_size):
+            yield batch_section, batch
+            batch = []
+        batch_section = section
+        batch.append((key, digest, row))
+    if batch:
+        yield batch_section, batch
+
+
+def removed_batches(graph, checkpoint, batch_size):
+    """Group checkpointed records that are gone from the graph file into batches, in DELETE_QUERIES order."""
+    present = {}
+    for section, key, _ in graph_sections(graph):
+        present.setdefault(section, set()).add(key)
+    for section in DELETE_QUERIES:
+        keys = [key for key in checkpoint.get(section, {}) if key not in present.get(section, ())]
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            if section in ("news", "entities", "sources"):
+                rows = [{"key": key} for key in batch]
+            else:
+                # Relationship keys are "TYPE:from->to"; news ids contain no "->"
+                rows = [dict(zip(("from", "to"), key[len(section) + 1:].split('->', 1))) for key in batch]
+            yield section, batch, rows
+
+
+def write_batch(tx, query, rows):
+    tx.run(query, rows=rows).consume()
+
+
+def main():
+    # Imported here so benchmarks can reuse the batching without the driver
+    from neo4j import GraphDatabase
+
+    parser = argparse.ArgumentParser(description='Load graph_processed.json into Neo4j')
+    parser.add_argument('--graph-file', default=GRAPH_FILE)
+    parser.add_argument('--batch-size', type=int, default=GRAPH_BATCH_SIZE)
+    parser.add_argument('--checkpoint', default=GRAPH_CHECKPOINT_PATH)
+    parser.add_argument('--full', action='store_true', help='ignore the checkpoint and reload everything')
+    args = parser.parse_args()
+
+    print("--- LOADING KNOWLEDGE GRAPH ---")
+    print("=" * 50)
+
+    print(f"> Reading {args.graph_file}...")
+    with open(args.graph_file, 'r', encoding='utf-8') as f:
+        graph = json.load(f)
+    print(f"[OK] {len(graph['news'])} news, {len(graph['entities'])} entities, "
+          f"{len(graph['sources'])} sources, {len(graph['relationships'])} relationships")
+
+    if args.full:
+        save_checkpoint(args.checkpoint, {})
+    checkpoint = load_checkpoint(args.checkpoint)
+
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), **NEO4J_DRIVER_OPTIONS)
+    log = open(args.checkpoint + '.log', 'a', encoding='utf-8')
+    written, deleted = {}, {}
+    try:
+        driver.verify_connectivity()
+
+        print("\n> Creating constraints and indexes...")
+        with driver.session() as session:
+            for statement in SCHEMA:
+                session.run(statement).consume()
+        print("[OK] Schema ready")
+
+        print(f"\n> Upserting changed records (batch size {args.batch_size})...")
+        start = time.perf_counter()
+        with driver.session() as session:
+            for section, keys, rows in removed_batches(graph, checkpoint, args.batch_size):
+                session.execute_write(write_batch, DELETE_QUERIES[section], rows)
+                for key in keys:
+                    del checkpoint[section][key]
+                log_checkpoint(log, section, [(key, None) for key in keys])
+                deleted[section] = deleted.get(section, 0) + len(keys)
+
+            for section, batch in pending_batches(graph, checkpoint, args.batch_size):
+                query = UPSERT_QUERIES.get(section)
+                if query is None:
+                    print(f"[WARN] Skipping unknown relationship type: {section}")
+                    continue
+                session.execute_write(write_batch, query, [row for _, _, row in batch])
+
+                # Checkpoint only after the transaction has committed
+                checkpoint.setdefault(section, {}).update({key: digest for key, digest, _ in batch})
+                log_checkpoint(log, section, [(key, digest) for key, digest, _ in batch])
+                written[section] = written.get(section, 0) + len(batch)
+    finally:
+        # Also after an interruption: the committed batches are kept either way
+        log.close()
+        save_checkpoint(args.checkpoint, checkpoint)
+        driver.close()
+
+    elapsed = time.perf_counter() - start
+    if not written and not deleted:
+        print("[OK] Graph already up to date")
+    for section, count in written.items():
+        print(f"[OK] {section}: {count:,} upserted")
+    for section, count in deleted.items():
+        print(f"[OK] {section}: {count:,} deleted")
+    print(f"[OK] Finished in {elapsed:.1f}s")
+
+    print("\n" + "=" * 50)
+    print("SUCCESS: GRAPH LOADED!")
+
+
+if __name__ == '__main__':
+    main()
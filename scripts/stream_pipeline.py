@@ -0,0 +1,252 @@
+# ====================
+# MODULE 1 + 1.5: STREAMING PREPARATION & CLEANING
+# ====================
+# Reads Fake.csv / True.csv in chunks, labels and cleans each chunk and
+# appends it to cleaned_news.csv straight away, so peak memory depends on
+# CLEAN_CHUNK_SIZE rather than on the size of the corpus. A Parquet copy is
+# written alongside (one row group per chunk) and sample_news.csv is drawn
+# in the same pass with reservoir sampling.
+#
+# Reruns are incremental: every raw row's content hash is recorded in the
+# pipeline manifest, and only rows that are new or changed since the last
+# run are cleaned. Unchanged articles are copied over from the previous
+# cleaned Parquet file and removed ones are dropped and tombstoned. Nothing
+# is rewritten when the inputs have not changed.
+#
+# Usage:
+#   python scripts/stream_pipeline.py [--full]
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from config import (SAMPLE_SIZE, CLEAN_WORKERS, CLEAN_CHUNK_SIZE, CLEANED_NEWS_PARQUET, DASHBOARD_AGGREGATES_PATH,
+                    PIPELINE_MANIFEST_PATH)
+from data_cleaning import clean_frame
+from news_store import ParquetChunkWriter, DashboardAggregates, save_aggregates
+from manifest import Manifest, article_ids, row_hashes
+
+INPUTS = [
+    ('data/Fake.csv', 'FAKE'),
+    ('data/True.csv', 'REAL'),
+]
+OUTPUT_PATH = 'data/cleaned_news.csv'
+SAMPLE_PATH = 'data/sample_news.csv'
+
+
+class ReservoirSample:
+    """
+    Uniform sample of `size` rows from a stream of DataFrame chunks
+    (Algorithm R, vectorised per chunk).
+    """
+
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+        self.rows = None
+
+    def update(self, chunk):
+        positions = self.seen + np.arange(len(chunk))
+        # Row t fills slot t while the reservoir is filling up, afterwards it
+        # replaces a random slot with probability size / (t + 1)
+        slots = np.where(positions < self.size, positions,
+                         self.rng.integers(0, positions + 1))
+        self.seen += len(chunk)
+
+        keep = slots < self.size
+        picked = chunk[keep].copy()
+        picked.index = slots[keep]
+        # Within one chunk a later row overwrites an earlier one, as in the sequential algorithm
+        picked = picked[~picked.index.duplicated(keep='last')]
+
+        if self.rows is None:
+            self.rows = picked
+        else:
+            self.rows = pd.concat([self.rows.drop(picked.index, errors='ignore'), picked])
+
+    def result(self):
+        return self.rows.sort_index().reset_index(drop=True)
+
+
+def read_labelled_chunks(chunk_size, hashes=None, inputs=INPUTS):
+    """Yield labelled chunks with stable ids; each row's content hash is added to `hashes`."""
+    seen = {}
+    for path, label in inputs:
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            chunk['label'] = label
+            chunk.insert(0, 'id', article_ids(chunk, seen))
+            if hashes is not None:
+                hashes.update(zip(chunk['id'], row_hashes(chunk)))
+            yield chunk
+
+
+def read_delta(chunk_size, previous):
+    """
+    (hashes, delta): content hashes of every input row, and the raw rows that
+    are new or changed compared with `previous` ({id: hash}).
+    """
+    hashes, delta = {}, []
+    for chunk in read_labelled_chunks(chunk_size, hashes):
+        changed = np.array([previous.get(news_id) != hashes[news_id] for news_id in chunk['id']], dtype=bool)
+        if changed.any():
+            delta.append(chunk[changed])
+    return hashes, delta
+
+
+def kept_chunks(path, keep, chunk_size):
+    """Previously cleaned rows whose id is in `keep`, read back from the Parquet file chunk by chunk."""
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        chunk = batch.to_pandas()
+        chunk = chunk[chunk['id'].isin(keep)]
+        if len(chunk):
+            yield chunk
+
+
+def clean_chunks(chunks, workers):
+    """Clean chunks in order, keeping at most 2 * workers chunks in flight."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield clean_frame(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(clean_frame, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_cleaned(chunks, csv_path, parquet_path, sample=None, aggregates=None, verbose=True):
+    """
+    Append cleaned chunks to csv_path and parquet_path, feeding the sample
+    and the dashboard aggregates on the way. Returns running statistics:
+    {"total", "short_articles", "length_sum", "length_min", "length_max", "labels"}.
+    """
+    stats = {"total": 0, "short_articles": 0, "length_sum": 0, "length_min": None, "length_max": 0, "labels": {}}
+    if os.path.exists(csv_path):
+        os.remove(csv_path)
+    parquet = ParquetChunkWriter(parquet_path)
+    try:
+        for chunk in chunks:
+            if 'text_length' not in chunk.columns:
+                chunk['text_length'] = chunk['clean_text'].str.len()
+            chunk.to_csv(csv_path, mode='a', header=(stats["total"] == 0), index=False)
+            parquet.write(chunk)
+            if sample is not None:
+                sample.update(chunk)
+            if aggregates is not None:
+                aggregates.update(chunk)
+
+            # Running statistics instead of a second pass over the file
+            stats["total"] += len(chunk)
+            stats["short_articles"] += int((chunk['text_length'] < 50).sum())
+            stats["length_sum"] += int(chunk['text_length'].sum())
+            chunk_min = int(chunk['text_length'].min())
+            stats["length_min"] = chunk_min if stats["length_min"] is None else min(stats["length_min"], chunk_min)
+            stats["length_max"] = max(stats["length_max"], int(chunk['text_length'].max()))
+            for label, count in chunk['label'].value_counts().items():
+                stats["labels"][label] = stats["labels"].get(label, 0) + int(count)
+            if verbose:
+                print(f"  {stats['total']:,} rows written")
+    finally:
+        parquet.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Label and clean Fake.csv / True.csv in chunks')
+    parser.add_argument('--full', action='store_true', help='ignore the manifest and clean every article again')
+    args = parser.parse_args()
+
+    print("--- STARTING STREAMING PIPELINE ---")
+    print("=" * 50)
+
+    print("> Checking for data files...")
+    for path, _ in INPUTS:
+        if not os.path.exists(path):
+            print(f"[ERROR] {path} not found!")
+            print("Please download from Kaggle and place in data/ folder")
+            return
+        print(f"[OK] Found {path}")
+
+    manifest = Manifest()
+    incremental = not args.full and manifest.has('clean') and os.path.exists(CLEANED_NEWS_PARQUET)
+    if incremental:
+        print("\n> Comparing content hashes with the manifest...")
+        hashes, delta = read_delta(CLEAN_CHUNK_SIZE, manifest.stages['clean'])
+        changed, removed = manifest.diff('clean', hashes)
+        print(f"[OK] {len(hashes) - len(changed):,} unchanged, {len(changed):,} new or changed, "
+              f"{len(removed):,} removed")
+        if not changed and not removed:
+            print("[OK] Cleaned dataset already up to date")
+            return
+        keep = set(hashes).difference(changed)
+        chunks = itertools.chain(kept_chunks(CLEANED_NEWS_PARQUET, keep, CLEAN_CHUNK_SIZE),
+                                 clean_chunks(iter(delta), CLEAN_WORKERS))
+    else:
+        hashes = {}
+        chunks = clean_chunks(read_labelled_chunks(CLEAN_CHUNK_SIZE, hashes), CLEAN_WORKERS)
+
+    print(f"\n> Cleaning in chunks of {CLEAN_CHUNK_SIZE:,} rows ({CLEAN_WORKERS} workers)...")
+    start = time.perf_counter()
+    sample = ReservoirSample(SAMPLE_SIZE)
+    aggregates = DashboardAggregates()
+
+    # Written next to the old files and swapped in at the end: the
+    # incremental run reads the previous Parquet file while writing
+    csv_tmp, parquet_tmp = OUTPUT_PATH + '.tmp', CLEANED_NEWS_PARQUET + '.tmp'
+    stats = write_cleaned(chunks, csv_tmp, parquet_tmp, sample, aggregates)
+    total = stats["total"]
+
+    if not total:
+        print("[ERROR] Input files are empty!")
+        return
+    os.replace(csv_tmp, OUTPUT_PATH)
+    os.replace(parquet_tmp, CLEANED_NEWS_PARQUET)
+
+    # Only now that the cleaned files are in place
+    _, removed = manifest.diff('clean', hashes)
+    manifest.commit('clean', hashes, removed)
+    manifest.tombstone(removed, restored=hashes)
+    manifest.save()
+    print(f"[OK] Manifest updated: {PIPELINE_MANIFEST_PATH}")
+
+    elapsed = time.perf_counter() - start
+    print(f"[OK] Saved {total:,} articles to: {OUTPUT_PATH} and {CLEANED_NEWS_PARQUET} "
+          f"({elapsed:.1f}s, {total / elapsed:,.0f} rows/sec)")
+
+    sample.result().to_csv(SAMPLE_PATH, index=False)
+    print(f"[OK] Saved sample of {min(SAMPLE_SIZE, total):,} to: {SAMPLE_PATH}")
+
+    save_aggregates(aggregates.result())
+    print(f"[OK] Saved dashboard aggregates to: {DASHBOARD_AGGREGATES_PATH}")
+
+    print("\n> STATISTICS AFTER CLEANING:")
+    print(f"Articles with very short text (<50 chars): {stats['short_articles']}")
+    print(f"Average article length: {stats['length_sum'] / total:.0f} characters")
+    print(f"Shortest article: {stats['length_min']} characters")
+    print(f"Longest article: {stats['length_max']} characters")
+    print(f"\n[INFO] DISTRIBUTION BY LABEL:")
+    for label, count in stats["labels"].items():
+        print(f"{label}: {count:,}")
+
+    print("\n" + "=" * 50)
+    print("SUCCESS: STREAMING PIPELINE COMPLETED!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# ====================
+# MODULE 2: PRE-SCREEN CLASSIFIER
+# ====================
+# Trains the TF-IDF + logistic regression pre-screen on the cleaned dataset,
+# saves it to data/prescreen.joblib and reports, on a held-out split, how
+# many LLM calls the uncertainty band saves and how accurate the skipped
+# (auto-decided) verdicts are. Inputs are evaluated both as full articles
+# and as headlines only, since users mostly paste headlines.
+#
+# Usage:
+#   python scripts/train_prescreen.py [--test-size 0.2] [--low 0.1 --high 0.9]
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('.')
+from config import *
+from news_store import read_news
+from prescreen import Prescreen, build_pipeline, prescreen_document
+
+# Bands reported next to the configured one, to help pick PRESCREEN_LOW/HIGH
+REPORT_BANDS = [(0.02, 0.98), (0.05, 0.95), (0.1, 0.9), (0.2, 0.8), (0.3, 0.7)]
+
+
+def band_report(scores, labels, low, high):
+    decided = (scores <= low) | (scores >= high)
+    predicted = np.where(scores >= 0.5, "FAKE", "REAL")
+    correct = predicted == labels
+    return {
+        "low": low,
+        "high": high,
+        "llm_calls_saved": int(decided.sum()),
+        "llm_calls_saved_pct": float(decided.mean() * 100),
+        "accuracy_decided": float(correct[decided].mean()) if decided.any() else None,
+        "accuracy_escalated_if_classifier": float(correct[~decided].mean()) if (~decided).any() else None,
+    }
+
+
+def evaluate(prescreen, texts, labels, low, high):
+    scores = prescreen.scores(texts)
+    predicted = np.where(scores >= 0.5, "FAKE", "REAL")
+    return {
+        "n": len(labels),
+        "accuracy_classifier_only": float((predicted == labels).mean()),
+        "configured_band": band_report(scores, labels, low, high),
+        "bands": [band_report(scores, labels, l, h) for l, h in REPORT_BANDS],
+    }
+
+
+def single_query_latency(prescreen, texts, n=200):
+    latencies = []
+    for text in texts[:n]:
+        start = time.perf_counter()
+        prescreen.score(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": float(np.percentile(latencies, 50)), "p95_ms": float(np.percentile(latencies, 95))}
+
+
+def main():
+    from sklearn.model_selection import train_test_split
+
+    parser = argparse.ArgumentParser(description='Train the TF-IDF pre-screen classifier')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--low', type=float, default=PRESCREEN_LOW)
+    parser.add_argument('--high', type=float, default=PRESCREEN_HIGH)
+    args = parser.parse_args()
+
+    print("--- TRAINING PRE-SCREEN CLASSIFIER ---")
+    print("=" * 50)
+
+    # One article per near-duplicate cluster: copies of a story on both sides
+    # of the split would inflate the held-out accuracy
+    df = read_news(['label', 'clean_title', 'clean_text'], canonical_only=True)
+    df = df[df['label'].isin(['FAKE', 'REAL'])]
+    titles = df['clean_title'].fillna('').astype(str).to_numpy()
+    documents = np.array([prescreen_document(t, x) for t, x in zip(titles, df['clean_text'].fillna('').astype(str))])
+    labels = df['label'].astype(str).to_numpy()
+    print(f"[OK] Loaded {len(df):,} labelled articles")
+
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=args.test_size,
+                                           stratify=labels, random_state=42)
+
+    start = time.perf_counter()
+    pipeline = build_pipeline().fit(documents[train_idx], labels[train_idx])
+    prescreen = Prescreen(pipeline, low=args.low, high=args.high)
+    print(f"[OK] Trained on {len(train_idx):,} articles in {time.perf_counter() - start:.1f}s")
+
+    prescreen.save(PRESCREEN_MODEL_PATH)
+    print(f"[OK] Saved to: {PRESCREEN_MODEL_PATH}")
+
+    report = {
+        "train_size": int(len(train_idx)),
+        "test_size": int(len(test_idx)),
+        "articles": evaluate(prescreen, documents[test_idx], labels[test_idx], args.low, args.high),
+        "headlines": evaluate(prescreen, titles[test_idx], labels[test_idx], args.low, args.high),
+        "latency": single_query_latency(prescreen, list(titles[test_idx])),
+    }
+    with open(PRESCREEN_REPORT_PATH, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nHeld-out split ({len(test_idx):,} articles), band [{args.low}, {args.high}]:")
+    print(f"{'input':<12}{'accuracy':>10}{'LLM calls saved':>18}{'acc. decided':>14}")
+    for name in ("articles", "headlines"):
+        result = report[name]
+        band = result["configured_band"]
+        accuracy_decided = band["accuracy_decided"]
+        print(f"{name:<12}{result['accuracy_classifier_only']:>10.3f}"
+              f"{band['llm_calls_saved_pct']:>17.1f}%"
+              f"{accuracy_decided if accuracy_decided is not None else float('nan'):>14.3f}")
+    print(f"Single-query latency: p50 {report['latency']['p50_ms']:.2f} ms, "
+          f"p95 {report['latency']['p95_ms']:.2f} ms")
+    print(f"[OK] Full report (all bands): {PRESCREEN_REPORT_PATH}")
+
+    print("\n" + "=" * 50)
+    print("SUCCESS: PRE-SCREEN READY!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+# ====================
+# DETECTION SERVICE
+# ====================
+# Everything one process needs to answer detection requests: the pooled
+# Neo4j driver, the Groq client, the vector and BM25 indexes, the embedder,
+# the LLM cache and the pre-screen. The HTTP API (api.py) and the Streamlit
+# app both run the pipeline through one shared instance. The Neo4j driver and
+# the Groq client pool their connections and the indexes are read-only, so
+# any number of threads may call the same service concurrently.
+
+import functools
+import os
+
+from config import *
+import detector
+from connections import connect_clients
+from async_detector import StageTimer
+from embedding_store import load_vector_index
+from lexical_index import BM25Index
+from llm_cache import LLMCache
+from metrics import METRICS
+from prescreen import Prescreen, prescreen_analysis
+
+QUERY_EMBEDDING_CACHE_SIZE = 256
+
+
+class DetectionService:
+
+    def __init__(self, driver=None, client=None, index=None, embedder=None, lexical=None, prescreen=None,
+                 cache=None, errors=None):
+        self.driver = driver
+        self.client = client
+        self.index = index
+        self.embedder = embedder
+        self.lexical = lexical
+        self.prescreen = prescreen
+        self.cache = cache
+        self.errors = errors or {}  # component -> why it is unavailable
+        # One LLM rate for the process, however many batches run at once
+        self.limiter = detector.RateLimiter(BATCH_LLM_REQUESTS_PER_MINUTE)
+        self._embed = functools.lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(self._embed_uncached)
+
+    @classmethod
+    def from_config(cls, connections=None, cache=None):
+        """
+        Load every component that is configured and built. A missing or
+        failing one is left as None with the reason in `errors`, so the
+        pipeline degrades (BM25 without Neo4j, keyword scan without indexes)
+        instead of refusing to start. With a running ConnectionCheck the
+        local files load while it is still connecting.
+        """
+        errors = {}
+
+        def attempt(name, load):
+            try:
+                return load()
+            except Exception as e:
+                errors[name] = str(e)
+                return None
+
+        # Vectors stay in the memory-mapped embedding store; the index holds row numbers
+        index = attempt("vector_index", load_vector_index)
+        lexical = attempt("lexical_index", lambda: BM25Index.load(LEXICAL_INDEX_PATH)) \
+            if os.path.exists(LEXICAL_INDEX_PATH) else None
+        prescreen = attempt("prescreen", Prescreen.load) \
+            if PRESCREEN_ENABLED and os.path.exists(PRESCREEN_MODEL_PATH) else None
+        cache = cache if cache is not None else LLMCache()
+
+        embedder = None
+        if index is not None or cache.near_duplicates:
+            from embeddings import load_embedder
+            embedder = attempt("embedder", load_embedder)
+
+        driver, client, connection_errors = connections.clients() if connections is not None else connect_clients()
+        errors.update(connection_errors)
+        return cls(driver, client, index, embedder, lexical, prescreen, cache, errors)
+
+    def status(self):
+        """{component: available} plus the reasons for the missing ones."""
+        components = {
+            "neo4j": self.driver is not None,
+            "groq": self.client is not None,
+            "vector_index": self.index is not None,
+            "lexical_index": self.lexical is not None,
+            "embedder": self.embedder is not None,
+            "prescreen": self.prescreen is not None,
+            "llm_cache": self.cache is not None,
+        }
+        return {"components": components, "errors": dict(self.errors)}
+
+    # ============================================
+    # PIPELINE
+    # ============================================
+
+    def _embed_uncached(self, query_text):
+        from embeddings import embed_texts
+        return embed_texts([query_text], self.embedder)[0]
+
+    def embed_query(self, query_text):
+        """Query embedding (LRU-cached per process), or None without an embedder."""
+        return self._embed(query_text) if self.embedder is not None else None
+
+    def retrieve(self, query_text, limit=5):
+        """(similar, entities, neighbours) in one Neo4j round trip; BM25 articles only without Neo4j."""
+        query_vector = self.embed_query(query_text) if self.index is not None else None
+        return detector.retrieve_context(self.driver, query_text, limit, index=self.index,
+                                         query_vector=query_vector, lexical=self.lexical)
+
+    def analyze(self, query, similar, entities, stats=None, mode=ANALYSIS_MODE):
+        query_vector = self.embed_query(query) if self.cache is not None and self.cache.near_duplicates else None
+        return detector.analyze_with_groq(self.client, query, similar, entities,
+                                          cache=self.cache, query_vector=query_vector, stats=stats, mode=mode)
+
+    def events(self, query, limit=5, analyze=True, mode=ANALYSIS_MODE):
+        """
+        Blocking counterpart of async_detector.detect_stream, with the same
+        events (no token stream: the analysis arrives in "done", with the
+        prompt's token count when the LLM was called). With
+        analyze=False it stops after the evidence and never calls the LLM;
+        mode picks a short JSON verdict or the full analysis.
+        """
+        timer = StageTimer()
+        stats = {"prompt_tokens": None}
+        decided = None
+        if self.prescreen is not None:
+            with METRICS.timer("prescreen"):
+                score = self.prescreen.score(query)
+            decided = self.prescreen.decide(score)
+            METRICS.increment("prescreen_decided" if decided is not None else "prescreen_escalated")
+            timer.mark("prescreen")
+            yield {"type": "prescreen", "score": score}
+
+        similar, entities, neighbours = self.retrieve(query, limit)
+        timer.mark("retrieval")
+        yield {"type": "evidence", "similar": similar, "entities": entities, "neighbours": neighbours}
+
+        if decided is not None:
+            analysis = prescreen_analysis(score, decided)
+        elif analyze:
+            analysis = self.analyze(query, similar, entities, stats, mode)
+            timer.mark("llm")
+        else:
+            analysis = ""
+        fields = detector.verdict_fields(analysis)
+        if fields["verdict"] != "UNKNOWN":
+            yield {"type": "verdict", "verdict": fields["verdict"]}
+        yield {"type": "done", "analysis": analysis, "timings": timer.timings,
+               "prompt_tokens": stats["prompt_tokens"], **fields}
+
+    def detect(self, query, limit=5, analyze=True, mode=ANALYSIS_MODE):
+        """One query, all events folded into a single result dict."""
+        result = {"query": query, "verdict": "UNKNOWN", "confidence": None, "reasons": [], "analysis": "",
+                  "prescreen_score": None, "prompt_tokens": None, "similar": [], "entities": [], "neighbours": [],
+                  "timings": {}}
+        for event in self.events(query, limit, analyze, mode):
+            if event["type"] == "prescreen":
+                result["prescreen_score"] = event["score"]
+            elif event["type"] == "evidence":
+                result.update(similar=event["similar"], entities=event["entities"],
+                              neighbours=event["neighbours"])
+            elif event["type"] == "done":
+                result.update({key: event[key] for key in ("analysis", "verdict", "confidence", "reasons",
+                                                           "timings", "prompt_tokens")})
+        return result
+
+    def detect_batch(self, queries, limit=5, **options):
+        """
+        detector.detect_batch over this service's clients and its shared rate
+        limiter; yields results as they finish.
+        """
+        return detector.detect_batch(queries, self.driver, self.client, index=self.index,
+                                     embedder=self.embedder,
+                                     cache=self.cache, limit=limit, lexical=self.lexical,
+                                     prescreen=self.prescreen, limiter=self.limiter, **options)
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.close()
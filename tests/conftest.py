@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules live at the project root, as for the scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,130 @@
+import numpy as np
+
+from embedding_store import EmbeddingStore
+
+MODEL, DIMENSION, DTYPE = "test-model", 4, "float32"
+
+
+def embed(batch):
+    """One recognisable vector per document: every component is the text's length."""
+    return np.array([[len(text)] * DIMENSION for _, _, text, _ in batch], dtype=np.float32)
+
+
+def test_resume_after_interrupt_before_first_write(tmp_path):
+    path = str(tmp_path / "embeddings.npy")
+    documents = {"a": "alpha", "b": "bravo!", "c": "charlie"}
+
+    store = EmbeddingStore(path)
+    store.reset(MODEL, DIMENSION, DTYPE)
+    pending = store.plan(documents)
+    store.save_meta()
+    store.reserve(max(row for row, _, _, _ in pending) + 1)
+    del store  # interrupted: the file has grown, the sidecar has no rows
+
+    store = EmbeddingStore(path)
+    assert store.compatible(MODEL, DIMENSION, DTYPE)
+    pending = store.plan(documents)
+    store.reserve(max(row for row, _, _, _ in pending) + 1)
+    store.write(pending, embed(pending))
+
+    reopened = EmbeddingStore(path)
+    assert len(reopened) == 3
+    assert [v[0] for v in reopened.get(["a", "b", "c"])] == [5, 6, 7]
+
+
+def run(path, documents, chunk_size=2, stop_after=None):
+    """scripts/build_embeddings.py's flow; stop_after=n simulates a crash after n chunks."""
+    store = EmbeddingStore(path)
+    if not store.compatible(MODEL, DIMENSION, DTYPE):
+        store.reset(MODEL, DIMENSION, DTYPE)
+    pending = store.plan(documents)
+    store.save_meta()
+    if pending:
+        store.reserve(max(row for row, _, _, _ in pending) + 1)
+    for chunk, offset in enumerate(range(0, len(pending), chunk_size)):
+        if chunk == stop_after:
+            break
+        batch = pending[offset:offset + chunk_size]
+        store.write(batch, embed(batch))
+    return pending
+
+
+def test_resume_after_interrupt_between_chunks(tmp_path):
+    path = str(tmp_path / "embeddings.npy")
+    documents = {f"id{i}": "x" * (i + 1) for i in range(5)}
+
+    assert len(run(path, documents, stop_after=1)) == 5
+    assert len(EmbeddingStore(path)) == 2
+
+    # Only the articles the interrupted run did not reach are embedded again
+    pending = run(path, documents)
+    assert sorted(news_id for _, news_id, _, _ in pending) == ["id2", "id3", "id4"]
+    store = EmbeddingStore(path)
+    assert [v[0] for v in store.get(list(documents))] == [1, 2, 3, 4, 5]
+
+
+def test_incremental_add_modify_remove(tmp_path):
+    path = str(tmp_path / "embeddings.npy")
+    run(path, {"a": "a", "b": "bb", "c": "ccc"})
+    before = EmbeddingStore(path)
+    row_a, row_c = before.rows["a"], before.rows["c"]
+
+    pending = run(path, {"a": "a", "c": "cccc", "d": "ddddd"})  # b removed, c changed, d added
+    assert sorted(news_id for _, news_id, _, _ in pending) == ["c", "d"]
+
+    store = EmbeddingStore(path)
+    assert len(store) == 3
+    assert store.get(["b"]) == [None]
+    assert [v[0] for v in store.get(["a", "c", "d"])] == [1, 4, 5]
+    # Changed articles keep their row; new ones never take a tombstoned row
+    assert store.rows["a"] == row_a and store.rows["c"] == row_c
+    assert store.rows["d"] == 3 and store.ids[before.rows["b"]] is None
+
+    rows, ids = store.live_rows()
+    assert sorted(ids.tolist()) == ["a", "c", "d"]
+    assert [store.ids[row] for row in rows] == ids.tolist()
+
+    assert run(path, {"a": "a", "c": "cccc", "d": "ddddd"}) == []
+
+
+def test_index_built_before_an_add_never_returns_another_article(tmp_path):
+    from vector_index import IVFIndex
+
+    path = str(tmp_path / "embeddings.npy")
+    run(path, {"a": "a", "b": "bb"})
+    store = EmbeddingStore(path)
+    rows, ids = store.live_rows()
+    index = IVFIndex.build(store.vectors, ids, rows=rows, n_lists=1)
+
+    run(path, {"a": "a", "c": "ccc"})  # b removed, c added after it
+    store = EmbeddingStore(path)
+    index.vectors = store.vectors
+    # Every row the old index holds is still its article's, or a tombstone
+    for row, news_id in zip(index.rows.tolist(), index.ids.tolist()):
+        assert store.ids[row] in (news_id, None)
+    assert store.rows["c"] not in index.rows.tolist()
+    assert {news_id for news_id, _ in index.search(np.ones(DIMENSION), k=2)} == {"a", "b"}
+
+
+def test_compatible_rejects_model_dimension_and_dtype_changes(tmp_path):
+    path = str(tmp_path / "embeddings.npy")
+    assert not EmbeddingStore(path).compatible(MODEL, DIMENSION, DTYPE)  # nothing stored yet
+
+    run(path, {"a": "a"})
+    store = EmbeddingStore(path)
+    assert store.compatible(MODEL, DIMENSION, DTYPE)
+    assert store.compatible(MODEL, None, DTYPE)
+    assert not store.compatible("other-model", DIMENSION, DTYPE)
+    assert not store.compatible(MODEL, DIMENSION + 1, DTYPE)
+    assert not store.compatible(MODEL, DIMENSION, "float16")
+
+
+def test_reset_drops_every_row(tmp_path):
+    path = str(tmp_path / "embeddings.npy")
+    run(path, {"a": "a", "b": "bb"})
+    store = EmbeddingStore(path)
+    store.reset("other-model", DIMENSION, DTYPE)
+
+    store = EmbeddingStore(path)
+    assert len(store) == 0 and store.vectors is None
+    assert store.model == "other-model"
@@ -0,0 +1,31 @@
+import numpy as np
+
+from llm_cache import LLMCache
+
+
+def cache(tmp_path, **options):
+    return LLMCache(str(tmp_path / "cache.sqlite"), ttl=3600, max_entries=3, max_bytes=1 << 20,
+                    near_duplicates=True, similarity_threshold=0.95, **options)
+
+
+def test_near_duplicate_lookup_follows_stores_and_evictions(tmp_path):
+    llm = cache(tmp_path)
+    x, y = np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0])
+    llm.store("first", ["a"], "model", "A", embedding=x)
+    assert llm.lookup("other words", ["b"], "model", embedding=x * 2) == "A"  # loads the matrix
+    assert llm.lookup("other words", ["b"], "model", embedding=y) is None
+    assert llm.lookup("other words", ["b"], "other-model", embedding=x) is None
+
+    llm.store("second", ["a"], "model", "B", embedding=y)  # added to the loaded matrix
+    assert llm.lookup("more words", ["c"], "model", embedding=y + 0.01) == "B"
+
+    for i in range(3):  # max_entries=3: "first" is the least recently used and goes
+        llm.store(f"filler {i}", ["z"], "model", "F", embedding=np.array([0.0, 0.0, 1.0]))
+    assert llm.lookup("again", ["d"], "model", embedding=x) is None
+
+
+def test_near_duplicates_written_before_opening_are_found(tmp_path):
+    cache(tmp_path).store("first", ["a"], "model", "A", embedding=np.array([0.6, 0.8]))
+    reopened = cache(tmp_path)
+    assert reopened.lookup("other", ["b"], "model", embedding=np.array([0.6, 0.8])) == "A"
+    assert reopened.lookup("other", ["b"], "model", embedding=np.array([0.6, 0.8, 0.0])) is None
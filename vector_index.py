@@ -0,0 +1,126 @@
+# ====================
+# IVF VECTOR INDEX
+# ====================
+# Inverted-file index over normalised embeddings: k-means centroids split
+# the corpus into lists, and a query only scans the `nprobe` closest lists
+# instead of every article. The index keeps row numbers, not vectors: it
+# reads them from the matrix it was built over, normally the memory-mapped
+# embedding store, so loading it copies nothing.
+
+import numpy as np
+
+
+def _kmeans(vectors, n_lists, n_iter=20, seed=42):
+    """Spherical k-means (cosine) returning unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = vectors[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                # Re-seed empty lists so every centroid stays useful
+                centroids[c] = vectors[rng.integers(len(vectors))]
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors, rows, centroids, chunk_size=65536):
+    """Closest centroid for each of `rows`, in chunks so a memmap is never read whole."""
+    assign = np.empty(len(rows), dtype=np.int64)
+    for start in range(0, len(rows), chunk_size):
+        chunk = np.asarray(vectors[rows[start:start + chunk_size]], dtype=np.float32)
+        assign[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+    return assign
+
+
+class IVFIndex:
+    """
+    Entries are grouped by list (CSR layout): list `c` owns entries
+    offsets[c]:offsets[c + 1] of `rows` / `ids`, and rows[i] is the row of
+    `vectors` holding entry i.
+    """
+
+    def __init__(self, centroids, offsets, rows, ids, vectors):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.ids = ids
+        self.vectors = vectors
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, ids, rows=None, n_lists=None, n_iter=20, max_train=50000, seed=42):
+        """
+        Index rows `rows` of `vectors` (all of them by default) under `ids`.
+        `vectors` is only referenced, never copied, so it can be a memmap.
+        """
+        rows = np.arange(len(vectors)) if rows is None else np.asarray(rows, dtype=np.int64)
+        ids = np.asarray(ids).astype(str)
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(rows)))
+        n_lists = max(1, min(n_lists, len(rows)))
+
+        # Train the quantizer on a subsample; assignment is one matmul anyway
+        rng = np.random.default_rng(seed)
+        train = rows
+        if len(rows) > max_train:
+            train = np.sort(rng.choice(rows, max_train, replace=False))
+        centroids = _kmeans(np.asarray(vectors[train], dtype=np.float32), n_lists, n_iter=n_iter, seed=seed)
+
+        assign = _assign(vectors, rows, centroids)
+        order = np.argsort(assign, kind='stable')  # keeps rows ascending within a list
+        counts = np.bincount(assign, minlength=n_lists)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        return cls(centroids, offsets, rows[order], ids[order], vectors)
+
+    def search(self, query, k=5, nprobe=8):
+        """Return [(id, cosine score), ...] for the k best matches."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        nprobe = max(1, min(nprobe, self.n_lists))
+
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        entries = np.concatenate([
+            np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe
+        ])
+        if not len(entries):
+            return []
+
+        scores = np.asarray(self.vectors[self.rows[entries]], dtype=np.float32) @ query
+        k = min(k, len(entries))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(str(self.ids[entries[i]]), float(scores[i])) for i in top]
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, offsets=self.offsets, rows=self.rows, ids=self.ids)
+
+    @classmethod
+    def load(cls, path, vectors):
+        """`vectors` must be the matrix the index was built over."""
+        data = np.load(path, allow_pickle=False)
+        rows = data['rows']
+        if vectors.shape[1] != data['centroids'].shape[1] or (len(rows) and rows.max() >= len(vectors)):
+            raise ValueError(f"{path} does not match the embedding store, rebuild the vector index")
+        return cls(data['centroids'], data['offsets'], rows, data['ids'], vectors)
+
+
+def exact_search(vectors, ids, query, k=5):
+    """Brute-force cosine top-k, used as ground truth for recall."""
+    scores = vectors @ np.asarray(query, dtype=np.float32).ravel()
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [(str(ids[i]), float(scores[i])) for i in top]
@@ -0,0 +1,106 @@
+# ====================
+# STRUCTURED VERDICTS
+# ====================
+# The LLM answers with one JSON object, verdict first so a stream can report
+# it as soon as it is generated:
+#   {"verdict": "FAKE", "confidence": 85, "reasons": ["..."], "analysis": "..."}
+# "analysis" is only requested in full mode. parse_analysis reads the object
+# strictly and falls back to pattern matching for malformed JSON, partial
+# streams and responses cached in the older "Verdict: FAKE" text format.
+
+import json
+import re
+
+VERDICTS = ("FAKE", "REAL")
+VERDICT_ONLY, FULL_ANALYSIS = "verdict", "full"
+MODES = (VERDICT_ONLY, FULL_ANALYSIS)
+
+VERDICT_PATTERN = re.compile(r'verdict"?\s*[:=]\s*"?\[?\s*(FAKE|REAL)\b', re.IGNORECASE)
+CONFIDENCE_PATTERN = re.compile(r'confidence"?\s*[:=]\s*"?\[?\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+REASON_PATTERN = re.compile(r'^\s*(?:\d+[.)]|[-*])\s+(.+?)\s*$')
+
+
+def _confidence(value):
+    """0-100 or None; fractions (0.85) are scaled to percent."""
+    if isinstance(value, str):
+        value = value.strip().rstrip('%')
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if 0 < value <= 1 and not float(value).is_integer():
+        value *= 100
+    return min(max(value, 0.0), 100.0)
+
+
+def _parse_json(text):
+    """The JSON object in `text` (code fences and surrounding prose ignored), or None."""
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _parse_text(text):
+    """Pattern-based reading of free text or a truncated JSON object."""
+    verdict = VERDICT_PATTERN.search(text)
+    confidence = CONFIDENCE_PATTERN.search(text)
+    reasons, analysis, section = [], "", None
+    for line in text.splitlines():
+        heading = line.strip().lower()
+        if heading.startswith('reasons'):
+            section = 'reasons'
+        elif heading.startswith('analysis:'):
+            section = 'analysis'
+            analysis = line.split(':', 1)[1].strip()
+        elif section == 'reasons' and (match := REASON_PATTERN.match(line)):
+            reasons.append(match.group(1))
+        elif section == 'analysis':
+            analysis = f"{analysis}\n{line}" if analysis else line
+    return {
+        "verdict": verdict.group(1).upper() if verdict else "UNKNOWN",
+        "confidence": _confidence(confidence.group(1)) if confidence else None,
+        "reasons": reasons,
+        "analysis": analysis.strip(),
+        "structured": False,
+    }
+
+
+def parse_analysis(text):
+    """
+    {"verdict": FAKE/REAL/UNKNOWN, "confidence": 0-100 or None, "reasons": [...],
+     "analysis": str, "structured": True if the response was valid JSON}.
+    """
+    text = text or ""
+    data = _parse_json(text)
+    verdict = str(data.get('verdict', '')).strip().upper() if data else ""
+    if verdict not in VERDICTS:
+        return _parse_text(text)
+
+    reasons = data.get('reasons') or []
+    if isinstance(reasons, str):
+        reasons = [reasons]
+    return {
+        "verdict": verdict,
+        "confidence": _confidence(data.get('confidence')),
+        "reasons": [str(reason).strip() for reason in reasons if str(reason).strip()],
+        "analysis": str(data.get('analysis') or '').strip(),
+        "structured": True,
+    }
+
+
+def parse_verdict(text):
+    """FAKE, REAL or UNKNOWN; works on partial streamed output too."""
+    return parse_analysis(text)["verdict"]
+
+
+def format_verdict(verdict, confidence=None, reasons=(), analysis=None):
+    """A response in the structured format, e.g. for verdicts not made by the LLM."""
+    result = {"verdict": verdict, "confidence": confidence, "reasons": list(reasons)}
+    if analysis:
+        result["analysis"] = analysis
+    return json.dumps(result)